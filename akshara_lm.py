@@ -0,0 +1,328 @@
+"""
+Akshara-level n-gram language model with stupid-backoff smoothing.
+
+Lines are segmented with the same akshara splitter as analyze_morphology,
+with <s>, </s> and a word-boundary token around them. Every n-gram is
+reduced to a 64-bit rolling hash, so each order's counts are just two flat
+arrays (sorted uint64 keys, uint32 counts). Training consumes lines in chunks
+and merges each chunk's counts into the running arrays; scoring looks up a
+whole batch of lines with np.searchsorted, one order at a time.
+
+    lm = AksharaLM(order=4).train(lines)
+    lm.save("akshara_lm.npz")
+    lm = AksharaLM.load("akshara_lm.npz")
+    lm.perplexity(["ನುಡಿದರೆ ಮುತ್ತಿನ ಹಾರದಂತಿರಬೇಕು"])
+
+Stupid backoff (Brants et al. 2007) scores are not normalized
+probabilities, so the "perplexities" are for ranking candidates against
+each other (OCR post-correction, generator filtering), not for comparing
+models.
+
+    python akshara_lm.py train corpus.txt --order 4 --model akshara_lm.npz
+    python akshara_lm.py score candidates.txt --model akshara_lm.npz
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import nlp_utils
+
+BOS, EOS, SPACE, UNK = 0, 1, 2, 3
+SPECIAL_TOKENS = ["<s>", "</s>", "<sp>", "<unk>"]
+DEFAULT_MODEL = "akshara_lm.npz"
+BACKOFF = 0.4
+FORMAT_VERSION = 1
+
+_MULT = np.uint64(0x9E3779B97F4A7C15)  # 64-bit golden-ratio multiplier
+
+def _ngram_hashes(ids, order):
+    """
+    hashes[k - 1][i] is the hash of the k-gram ending at ids[i]
+    (positions with fewer than k tokens before them hold garbage and are
+    masked by the callers).
+    """
+    ids = ids.astype(np.uint64) + np.uint64(1)
+    out = [ids.copy()]
+    with np.errstate(over="ignore"):
+        for _ in range(1, order):
+            prev = np.zeros_like(ids)
+            prev[1:] = out[-1][:-1]
+            out.append(prev * _MULT + ids)
+    return out
+
+def _codes_and_bounds(strings):
+    # Codepoints of the strings laid end to end, with each one's [start, end)
+    codes = np.frombuffer("".join(strings).encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    ends = np.cumsum([len(s) for s in strings], dtype=np.int64)
+    return codes, ends - np.array([len(s) for s in strings], dtype=np.int64), ends
+
+def _span_hashes(codes, starts, ends):
+    """64-bit polynomial hash of every codes[start:end] span, vectorized."""
+    lengths = ends - starts
+    h = lengths.astype(np.uint64)
+    if not len(lengths):
+        return h
+    cps = np.append(codes, 0).astype(np.uint64) + np.uint64(1)
+    with np.errstate(over="ignore"):
+        for j in range(int(lengths.max())):
+            # Aksharas are short, so this loops a handful of times
+            live = lengths > j
+            h[live] = h[live] * _MULT + cps[starts[live] + j]
+    return h
+
+def _merge_counts(keys_a, counts_a, keys_b, counts_b):
+    keys = np.concatenate((keys_a, keys_b))
+    counts = np.concatenate((counts_a, counts_b))
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    return uniq, np.bincount(inverse, weights=counts, minlength=len(uniq)).astype(np.uint32)
+
+class AksharaLM:
+    def __init__(self, order=4):
+        if not 1 <= order <= 8:
+            raise ValueError("order must be between 1 and 8")
+        self.order = order
+        self.vocab = {tok: i for i, tok in enumerate(SPECIAL_TOKENS)}
+        self._hash_keys = np.zeros(0, dtype=np.uint64)  # sorted akshara hashes
+        self._hash_ids = np.zeros(0, dtype=np.int64)    # vocab id of each hash
+        self.keys = [np.zeros(0, dtype=np.uint64) for _ in range(order)]
+        self.counts = [np.zeros(0, dtype=np.uint32) for _ in range(order)]
+        self.n_lines = 0
+        self.n_tokens = 0  # scored tokens seen in training (everything but <s>)
+
+    # --- Encoding ---
+
+    def _lookup_ids(self, hashes):
+        ids = np.full(len(hashes), UNK, dtype=np.int64)
+        if len(self._hash_keys):
+            idx = np.minimum(np.searchsorted(self._hash_keys, hashes), len(self._hash_keys) - 1)
+            hit = self._hash_keys[idx] == hashes
+            ids[hit] = self._hash_ids[idx[hit]]
+        return ids
+
+    def _add_tokens(self, tokens):
+        """Gives new aksharas the next ids and keeps the hash -> id arrays sorted."""
+        fresh = [tok for tok in dict.fromkeys(tokens) if tok not in self.vocab]
+        if not fresh:
+            return
+        for tok in fresh:
+            self.vocab[tok] = len(self.vocab)
+        codes, starts, ends = _codes_and_bounds(fresh)
+        keys = np.concatenate((self._hash_keys, _span_hashes(codes, starts, ends)))
+        ids = np.concatenate((self._hash_ids, np.array([self.vocab[t] for t in fresh], dtype=np.int64)))
+        order = np.argsort(keys, kind="stable")
+        self._hash_keys, self._hash_ids = keys[order], ids[order]
+
+    def _encode(self, lines, grow):
+        """
+        Flat id array with <s> ... </s> per line (and <sp> between words),
+        plus each line's start offset. Segmentation, hashing and layout are
+        all vectorized over the whole batch.
+        """
+        if not lines:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        cleaned = [nlp_utils.normalize_kannada(line) for line in lines]
+        text = "\n".join(cleaned)  # newline is a delimiter, so lines never merge
+        codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        starts, ends = nlp_utils.segment_spans_vectorized(codes)
+        hashes = _span_hashes(codes, starts, ends)
+
+        ids = self._lookup_ids(hashes)
+        if grow and (ids == UNK).any():
+            missing = np.flatnonzero(ids == UNK)
+            _, first = np.unique(hashes[missing], return_index=True)
+            self._add_tokens([text[starts[i]:ends[i]] for i in missing[np.sort(first)].tolist()])
+            ids = self._lookup_ids(hashes)
+
+        # Which line each akshara belongs to, and whether a word gap precedes it
+        line_offsets = np.cumsum([0] + [len(c) + 1 for c in cleaned])
+        line_of = np.searchsorted(line_offsets, starts, side="right") - 1
+        gap = np.zeros(len(starts), dtype=bool)
+        if len(starts) > 1:
+            gap[1:] = (line_of[1:] == line_of[:-1]) & (starts[1:] != ends[:-1])
+
+        # Output position of every akshara: the <s>/</s> of earlier lines,
+        # its own line's <s>, earlier aksharas and the <sp> tokens so far
+        n_lines = len(cleaned)
+        akshara_pos = 2 * line_of + 1 + np.arange(len(starts)) + np.cumsum(gap)
+        per_line = np.bincount(line_of, minlength=n_lines) + np.bincount(line_of, weights=gap, minlength=n_lines).astype(np.int64)
+        line_starts = np.concatenate(([0], np.cumsum(per_line + 2)[:-1])).astype(np.int64)
+        total = int(per_line.sum()) + 2 * n_lines
+
+        out = np.empty(total, dtype=np.int64)
+        out[line_starts] = BOS
+        out[line_starts + per_line + 1] = EOS
+        out[akshara_pos[gap] - 1] = SPACE
+        out[akshara_pos] = ids
+        return out, line_starts[:n_lines]
+
+    @staticmethod
+    def _history(ids, line_starts):
+        # How many tokens of the same line sit at or before each position
+        owner = np.repeat(np.arange(len(line_starts)), np.diff(np.append(line_starts, len(ids))))
+        return np.arange(len(ids)) - line_starts[owner] + 1, owner
+
+    # --- Training ---
+
+    def train(self, lines, chunk_lines=50_000):
+        """Streams an iterable of lines into the counts, chunk by chunk."""
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) >= chunk_lines:
+                self._train_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._train_chunk(chunk)
+        return self
+
+    def train_file(self, path, encoding="utf-8", chunk_lines=50_000):
+        with open(path, encoding=encoding) as f:
+            return self.train((line.rstrip("\n") for line in f), chunk_lines)
+
+    def _train_chunk(self, lines):
+        ids, line_starts = self._encode(lines, grow=True)
+        history, _ = self._history(ids, line_starts)
+        for k, hashes in enumerate(_ngram_hashes(ids, self.order), start=1):
+            valid = history >= k
+            uniq, counts = np.unique(hashes[valid], return_counts=True)
+            self.keys[k - 1], self.counts[k - 1] = _merge_counts(self.keys[k - 1], self.counts[k - 1], uniq, counts)
+        self.n_lines += len(lines)
+        self.n_tokens += len(ids) - len(lines)
+
+    def prune(self, min_count=2):
+        """Drops n-grams (order >= 2) seen fewer than min_count times."""
+        for k in range(1, self.order):
+            keep = self.counts[k] >= min_count
+            self.keys[k], self.counts[k] = self.keys[k][keep], self.counts[k][keep]
+        return self
+
+    # --- Scoring ---
+
+    def _lookup(self, k, hashes):
+        keys, counts = self.keys[k - 1], self.counts[k - 1]
+        if not len(keys):
+            return np.zeros(len(hashes), dtype=np.float64)
+        # Searching in sorted order keeps the probes cache-friendly (~5x faster)
+        order = np.argsort(hashes)
+        idx = np.empty(len(hashes), dtype=np.intp)
+        idx[order] = np.searchsorted(keys, hashes[order])
+        np.minimum(idx, len(keys) - 1, out=idx)
+        return np.where(keys[idx] == hashes, counts[idx], 0).astype(np.float64)
+
+    def token_logprobs(self, lines):
+        """Natural-log stupid-backoff score of every token, plus the owning line of each."""
+        ids, line_starts = self._encode(lines, grow=False)
+        history, owner = self._history(ids, line_starts)
+        hashes = _ngram_hashes(ids, self.order)
+
+        # Unigram floor: add-one over the vocabulary so unseen aksharas stay finite
+        unigram = (self._lookup(1, hashes[0]) + 1) / (self.n_tokens + len(self.vocab))
+        score = np.log(unigram)
+        # Backing off only costs when a longer context existed to begin with
+        top = np.log(BACKOFF) * np.minimum(history, self.order)
+        found = np.zeros(len(ids), dtype=bool)
+        result = np.zeros(len(ids))
+        for k in range(self.order, 1, -1):
+            usable = (history >= k) & ~found
+            if not usable.any():
+                continue
+            num = self._lookup(k, hashes[k - 1][usable])
+            den = self._lookup(k - 1, hashes[k - 2][np.flatnonzero(usable) - 1])
+            hit = (num > 0) & (den > 0)
+            pos = np.flatnonzero(usable)[hit]
+            result[pos] = np.log(num[hit] / den[hit]) + top[pos] - k * np.log(BACKOFF)
+            found[pos] = True
+        rest = ~found
+        result[rest] = score[rest] + top[rest] - np.log(BACKOFF)
+
+        scored = ids != BOS
+        return result[scored], owner[scored]
+
+    def score(self, lines):
+        """Total natural-log score per line (np.ndarray)."""
+        lines = list(lines)
+        logp, owner = self.token_logprobs(lines)
+        return np.bincount(owner, weights=logp, minlength=len(lines))
+
+    def perplexity(self, lines):
+        """Per-line perplexity (np.ndarray); lower is more Kannada-like."""
+        lines = list(lines)
+        logp, owner = self.token_logprobs(lines)
+        totals = np.bincount(owner, weights=logp, minlength=len(lines))
+        lengths = np.bincount(owner, minlength=len(lines))
+        return np.exp(-totals / np.maximum(lengths, 1))
+
+    def score_batches(self, lines, batch_size=20_000):
+        """Yields score arrays for an arbitrarily long iterable of lines."""
+        batch = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) >= batch_size:
+                yield self.score(batch)
+                batch = []
+        if batch:
+            yield self.score(batch)
+
+    # --- Persistence ---
+
+    def save(self, path=DEFAULT_MODEL):
+        """Uncompressed npz: loading is a handful of array reads."""
+        vocab = sorted(self.vocab, key=self.vocab.get)
+        arrays = {f"keys{k}": self.keys[k] for k in range(self.order)}
+        arrays.update({f"counts{k}": self.counts[k] for k in range(self.order)})
+        np.savez(
+            path,
+            meta=np.array([FORMAT_VERSION, self.order, self.n_lines, self.n_tokens], dtype=np.int64),
+            vocab=np.frombuffer("\n".join(vocab).encode("utf-8"), dtype=np.uint8),
+            **arrays,
+        )
+        return path
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL):
+        with np.load(path) as data:
+            version, order, n_lines, n_tokens = data["meta"].tolist()
+            if version != FORMAT_VERSION:
+                raise ValueError(f"unsupported model format in {path}")
+            lm = cls(order)
+            lm.n_lines, lm.n_tokens = n_lines, n_tokens
+            tokens = data["vocab"].tobytes().decode("utf-8").split("\n")
+            lm._add_tokens(tokens[len(SPECIAL_TOKENS):])
+            lm.keys = [data[f"keys{k}"] for k in range(order)]
+            lm.counts = [data[f"counts{k}"] for k in range(order)]
+        return lm
+
+    def __repr__(self):
+        sizes = ", ".join(str(len(k)) for k in self.keys)
+        return f"AksharaLM(order={self.order}, vocab={len(self.vocab)}, ngrams=[{sizes}])"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Akshara n-gram language model.")
+    parser.add_argument("command", choices=["train", "score"])
+    parser.add_argument("path", help="UTF-8 text file, one line per sentence/candidate.")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--order", type=int, default=4)
+    parser.add_argument("--min-count", type=int, default=1, help="Prune higher-order n-grams below this count.")
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        t0 = time.perf_counter()
+        lm = AksharaLM(args.order).train_file(args.path)
+        if args.min_count > 1:
+            lm.prune(args.min_count)
+        lm.save(args.model)
+        print(f"{lm} trained on {lm.n_lines} lines in {time.perf_counter() - t0:.2f}s -> {args.model}")
+        return 0
+
+    lm = AksharaLM.load(args.model)
+    with open(args.path, encoding="utf-8") as f:
+        lines = [line.rstrip("\n") for line in f]
+    for line, ppl in zip(lines, lm.perplexity(lines)):
+        print(f"{ppl:.2f}\t{line}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
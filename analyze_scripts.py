@@ -1,4 +1,6 @@
 
+import re
+import unicodedata
 import pandas as pd
 import datetime
 
@@ -58,6 +60,122 @@ def compare_kannada_latency(df):
     # Sort by date
     return df_indic.sort_values('Date')[['English Name', 'Date', 'Days Difference']]
 
+# --- Script Search & Autocomplete ---
+
+SEARCH_FIELDS = ['Code', 'English Name', 'Nom français', 'Alias']
+# Field weights: a hit on the code beats a hit on a name, which beats an alias
+FIELD_WEIGHTS = {'Code': 40, 'English Name': 30, 'Nom français': 20, 'Alias': 20}
+WHOLE_FIELD_BONUS = 10
+
+def fold_text(text):
+    """Accent- and case-insensitive form used for search ('Nepāla' -> 'nepala')."""
+    text = unicodedata.normalize('NFKD', str(text))
+    return ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class ScriptSearchIndex:
+    """
+    In-memory prefix + trigram index over the ISO 15924 table.
+
+    Every prefix of every field (and of every word inside a field) is
+    precomputed at build time into a dict of ranked row ids, so a keystroke
+    is one dict lookup plus a slice. Trigrams back it up for infix and
+    slightly misspelt queries.
+    """
+
+    def __init__(self, df, max_prefix=24):
+        self.df = df[df['Code'] != 'Code'].reset_index(drop=True)  # the TSV repeats its header
+        self.max_prefix = max_prefix
+        self._code_list = self.df['Code'].tolist()
+        self._name_list = self.df['English Name'].fillna('').tolist()
+        self._codes = {fold_text(c): i for i, c in enumerate(self._code_list)}
+        names = self._name_list
+        self._prefix = {}
+        self._trigrams = {}
+
+        scores = {}  # prefix -> {row: best score}
+        for row, record in enumerate(self.df[SEARCH_FIELDS].itertuples(index=False)):
+            for field, value in zip(SEARCH_FIELDS, record):
+                if not isinstance(value, str) or not value:
+                    continue
+                folded = fold_text(value)
+                weight = FIELD_WEIGHTS[field]
+                self._add_prefixes(scores, folded, row, weight + WHOLE_FIELD_BONUS)
+                for word in re.split(r'[^\w]+', folded):
+                    if word:
+                        self._add_prefixes(scores, word, row, weight)
+                for tri in _trigrams(folded):
+                    self._trigrams.setdefault(tri, set()).add(row)
+
+        # Freeze each posting into a ranked tuple of (row, score)
+        for prefix, rows in scores.items():
+            ranked = sorted(rows.items(), key=lambda rs: (-rs[1], names[rs[0]]))
+            self._prefix[prefix] = tuple(ranked)
+
+    def _add_prefixes(self, scores, term, row, score):
+        for end in range(1, min(len(term), self.max_prefix) + 1):
+            bucket = scores.setdefault(term[:end], {})
+            if bucket.get(row, 0) < score:
+                bucket[row] = score
+
+    def _match_rows(self, query):
+        words = [w for w in re.split(r'[^\w]+', query) if w]
+        if not words:
+            return []
+        if len(words) == 1 or query in self._prefix:
+            key = query if query in self._prefix else words[0]
+            ranked = list(self._prefix.get(key[:self.max_prefix], ()))
+        else:
+            # Every word must match some field; rank by total score
+            total = None
+            for word in words:
+                hits = dict(self._prefix.get(word[:self.max_prefix], ()))
+                if total is None:
+                    total = hits
+                else:
+                    total = {r: s + hits[r] for r, s in total.items() if r in hits}
+                if not total:
+                    break
+            ranked = sorted((total or {}).items(), key=lambda rs: -rs[1])
+        code_row = self._codes.get(query)
+        if code_row is not None:
+            ranked = [(code_row, 1000)] + [rs for rs in ranked if rs[0] != code_row]
+        return ranked
+
+    def _fuzzy_rows(self, query, min_overlap=0.5):
+        grams = _trigrams(query)
+        counts = {}
+        for tri in grams:
+            for row in self._trigrams.get(tri, ()):
+                counts[row] = counts.get(row, 0) + 1
+        needed = max(1, int(len(grams) * min_overlap))
+        return sorted(((r, c) for r, c in counts.items() if c >= needed), key=lambda rc: -rc[1])
+
+    def search(self, query, limit=10, fuzzy=True):
+        """Returns matching rows as a DataFrame, best match first."""
+        rows = self.search_rows(query, limit, fuzzy)
+        return self.df.iloc[rows]
+
+    def search_rows(self, query, limit=10, fuzzy=True):
+        query = fold_text(query).strip()
+        if not query:
+            return []
+        ranked = self._match_rows(query)
+        if not ranked and fuzzy and len(query) >= 3:
+            ranked = self._fuzzy_rows(query)
+        return [row for row, _ in ranked[:limit]]
+
+    def autocomplete(self, query, limit=8):
+        """[(code, English name)] suggestions for a partially typed query."""
+        return [(self._code_list[r], self._name_list[r]) for r in self.search_rows(query, limit)]
+
+def build_script_index(df):
+    """Builds the search index once for a loaded dataset."""
+    return ScriptSearchIndex(df)
+
 if __name__ == "__main__":
     # Test the functions
     df = load_dataset()
@@ -10,89 +10,147 @@ import analyze_scripts
 import nlp_utils
 from gtts import gTTS
 from io import BytesIO
+from transliterate import get_transliteration_map, IncrementalTransliterator
+import perf_monitor
+import corpus_stats
+import json
+import os
+import topic_model
+import script_detect
+import retrieval
+import corpus_store
+import completion
+import session_memory
+import kn_validate
 
 # --- Helper Functions (copied/adapted from individual scripts) ---
 
+# Heavy immutable resources are built once per server process and shared
+# read-only by every session (copy a DataFrame before changing it). Per-session
+# caches go through session_memory, which keeps each session under a budget.
+
+@st.cache_resource
 def load_data():
+    return analyze_scripts.load_dataset()
+
+@st.cache_resource
+def get_script_index():
+    df = load_data()
+    return analyze_scripts.build_script_index(df) if df is not None else None
+
+@st.cache_resource
+def get_evolution_views():
+    # (growth, latency) frames for the Script Evolution tab
+    df = load_data()
+    return analyze_scripts.get_indic_script_growth(df), analyze_scripts.compare_kannada_latency(df)
+
+def _figure_png(fig):
+    buf = BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    plt.close(fig)  # pyplot keeps every open figure alive otherwise
+    return buf.getvalue()
+
+@st.cache_resource
+def get_timeline_png():
+    df = load_data()
+    df_indic = df[df['Code'].isin(analyze_scripts.get_indic_scripts_list())].copy()
+    df_indic['Date'] = pd.to_datetime(df_indic['Date'])
+    df_indic = df_indic.sort_values('Date')
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    # Dynamic colors
+    colors = ['red' if name == 'Kannada' else 'teal' for name in df_indic['English Name']]
+    sizes = [250 if name == 'Kannada' else 100 for name in df_indic['English Name']]
+
+    ax.scatter(df_indic['Date'], df_indic['English Name'], color=colors, s=sizes, zorder=3)
+    ax.hlines(y=df_indic['English Name'], xmin=df_indic['Date'].min(), xmax=df_indic['Date'], color='skyblue', alpha=0.5, zorder=2)
+
+    # Annotate
+    k_row = df_indic[df_indic['English Name'] == 'Kannada']
+    if not k_row.empty:
+         k_date = k_row.iloc[0]['Date']
+         ax.annotate('Kannada', (k_date, 'Kannada'), xytext=(10, 5), textcoords='offset points', color='red', weight='bold')
+
+    ax.grid(axis='x', linestyle='--', alpha=0.7)
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
+    fig.autofmt_xdate()
+    return _figure_png(fig)
+
+@st.cache_resource
+def get_confusion_png():
+    topic_eval = get_topic_eval()
+    conf_matrix = topic_eval['matrix']
+    short_labels = [c.split(' /')[0] for c in topic_eval['categories']]
+    fig_eval, ax_eval = plt.subplots(figsize=(4, 4)) # Smaller size
+    ax_eval.imshow(conf_matrix, cmap='Blues')
+    ax_eval.set_title("Confusion Matrix")
+    ax_eval.set_xticks(range(len(short_labels)), short_labels, rotation=45, ha='right', fontsize=8)
+    ax_eval.set_yticks(range(len(short_labels)), short_labels, fontsize=8)
+    ax_eval.set_xlabel("Predicted"); ax_eval.set_ylabel("True")
+    for (i, j), v in pd.DataFrame(conf_matrix).stack().items():
+        ax_eval.text(j, i, v, ha='center', va='center', fontsize=7)
+    return _figure_png(fig_eval)
+
+def get_artifacts():
+    # This session's analyzers, audio etc., kept under KANNADA_SESSION_BUDGET_MB
+    return session_memory.session_artifacts(st.session_state)
+
+def speak(text):
+    """Plays text as Kannada speech (the MP3 is kept with the session's artifacts). Returns the error, if any."""
     try:
-        df = pd.read_csv("df_iso15924_scripts.tsv", sep="\t")
-        return df
-    except FileNotFoundError:
-        st.error("Data file 'df_iso15924_scripts.tsv' not found.")
-        return None
-
-def get_transliteration_map():
-    # Same map as transliterate.py
-    vowels = {
-        'aa': 'ಆ', 'a': 'ಅ', 'ii': 'ಈ', 'i': 'ಇ', 'uu': 'ಊ', 'u': 'ಉ',
-        'e': 'ಎ', 'ee': 'ಏ', 'ai': 'ಐ', 'o': 'ಒ', 'oo': 'ಓ', 'au': 'ಔ',
-        'am': 'ಅಂ', 'ah': 'ಅಃ'
-    }
-    consonants = {
-        'k': 'ಕ್', 'kh': 'ಖ್', 'g': 'ಗ್', 'gh': 'ಘ್', 'ng': 'ಙ್',
-        'ch': 'ಚ್', 'chh': 'ಛ್', 'j': 'ಜ್', 'jh': 'ಝ್', 'ny': 'ಞ್',
-        't': 'ಟ್', 'th': 'ಠ್', 'd': 'ಡ್', 'dh': 'ಢ್', 'n': 'ಣ್',
-        'th': 'ತ್', 'd': 'ದ್', 'dh': 'ಧ್', 'n': 'ನ್', 
-        'p': 'ಪ್', 'ph': 'ಫ್', 'b': 'ಬ್', 'bh': 'ಭ್', 'm': 'ಮ್',
-        'y': 'ಯ್', 'r': 'ರ್', 'l': 'ಲ್', 'v': 'ವ್', 'w': 'ವ್',
-        'sh': 'ಶ್', 'shh': 'ಷ್', 's': 'ಸ್', 'h': 'ಹ್', 'l': 'ಳ್'
-    }
-    matras = {
-        'a': '', 'aa': 'ಾ', 'i': 'ಿ', 'ii': 'ೀ', 'u': 'ು', 'uu': 'ೂ', 'ru': 'ೃ',
-        'e': 'ೆ', 'ee': 'ೇ', 'ai': 'ೈ', 'o': 'ೊ', 'oo': 'ೋ', 'au': 'ೌ',
-    }
-    return vowels, consonants, matras
-
-def transliterate(text):
-    if not text: return ""
-    vowels, consonants, matras = get_transliteration_map()
-    result = ""
-    i = 0
-    n = len(text)
-    
-    while i < n:
-        match_c = None
-        len_c = 0
-        for width in [3, 2, 1]:
-            chunk = text[i:i+width].lower()
-            if chunk in consonants:
-                match_c = chunk
-                len_c = width
-                break
-        
-        if match_c:
-            base_char = consonants[match_c][0]
-            i += len_c
-            match_v = None
-            len_v = 0
-            for width in [2, 1]:
-                if i + width <= n:
-                    v_chunk = text[i:i+width].lower()
-                    if v_chunk in matras:
-                        match_v = v_chunk
-                        len_v = width
-                        break
-            if match_v:
-                result += base_char + matras[match_v]
-                i += len_v
-            else:
-                result += consonants[match_c]
-        else:
-            match_ind_v = None
-            len_ind_v = 0
-            for width in [2, 1]:
-                chunk = text[i:i+width].lower()
-                if chunk in vowels:
-                    match_ind_v = chunk
-                    len_ind_v = width
-                    break
-            if match_ind_v:
-                result += vowels[match_ind_v]
-                i += len_ind_v
-            else:
-                result += text[i]
-                i += 1
-    return result
+        audio = get_artifacts().get(("tts", text))
+        if audio is None:
+            buf = BytesIO()
+            gTTS(text=text, lang='kn').write_to_fp(buf)
+            audio = get_artifacts().put(("tts", text), buf.getvalue())
+        st.audio(audio, format='audio/mp3')
+    except Exception as e:
+        return e
+
+@st.cache_resource
+def get_topic_model():
+    # Trained model from `python topic_model.py train/evaluate`, else a quick synthetic one
+    if os.path.exists(topic_model.DEFAULT_MODEL):
+        return topic_model.NaiveBayesTopicModel.load(topic_model.DEFAULT_MODEL)
+    texts, labels = topic_model.make_synthetic_corpus(3000)
+    return topic_model.NaiveBayesTopicModel().fit(texts, labels)
+
+@st.cache_data
+def get_topic_eval():
+    # Report written by `python topic_model.py evaluate`, else a small held-out run
+    if os.path.exists(topic_model.DEFAULT_EVAL):
+        with open(topic_model.DEFAULT_EVAL, encoding="utf-8") as f:
+            return json.load(f)
+    return topic_model.evaluate(n_docs=2000)
+
+@st.cache_resource
+def get_completer():
+    # completions.bin from `python completion.py build corpus.txt`, else the built-in vocabulary
+    return completion.load_or_build()
+
+@st.cache_resource
+def get_wisdom_store():
+    # corpora/wisdom_quotes.tsv, memory-mapped with a persisted line index
+    return corpus_store.wisdom_quotes()
+
+@st.cache_resource
+def get_chat_index():
+    # A persisted index from `python retrieval.py index ...` if there is one,
+    # else vachanas + wisdom quotes + ISO 15924 reference rows, indexed in memory
+    if os.path.isdir(retrieval.DEFAULT_INDEX):
+        return retrieval.RetrievalIndex(retrieval.DEFAULT_INDEX)
+    index = retrieval.RetrievalIndex()
+    index.add((line, "Vachana") for line in nlp_utils.LEXICONS["vachana_corpus"])
+    quotes = map(corpus_store.parse_quote, get_wisdom_store())
+    index.add((f"{q['text']} — {q['meaning']}", q["author"]) for q in quotes)
+    df = load_data()
+    if df is not None:
+        rows = df[df["Code"] != "Code"].fillna("").to_dict("records")  # the TSV repeats its header
+        index.add((f"{r['English Name']} script: ISO 15924 code {r['Code']}, number {r['N°']}"
+                   + (f", added to Unicode {r['Age']}" if r["Age"] else "") + f" ({r['Date']}).", "ISO 15924")
+                  for r in rows)
+    index.commit()
+    return index
 
 def get_kannada_char():
     return chr(random.randint(0x0C85, 0x0CB9))
@@ -101,6 +159,11 @@ def get_kannada_char():
 
 st.set_page_config(page_title="Kannada Script Dashboard", layout="wide", page_icon="🏹")
 
+# Opt-in instrumentation: KANNADA_PERF=1 in the server's environment turns it
+# on for the process; a session sees the panel only when opened with ?perf=1
+perf_monitor.enable_from_env()
+show_perf_panel = perf_monitor.is_enabled() and st.query_params.get("perf") == "1"
+
 # --- Custom CSS for Premium UI ---
 st.markdown("""
 <style>
@@ -219,16 +282,30 @@ tabs = st.tabs(["🔬 Research", "🔡 Transliterate", "🎨 Creative", "🤖 AI
 with tabs[0]:
     st.header("🔬 Deep Research & Analysis")
     
-    res_tabs = st.tabs(["📜 Script Evolution", "🧩 Morphological Analysis", "🎼 Chandassu (Meter)", "⚔️ Script Similarity"])
+    res_tabs = st.tabs(["📜 Script Evolution", "🧩 Morphological Analysis", "🎼 Chandassu (Meter)", "⚔️ Script Similarity", "📈 Corpus Statistics"])
     
     # Subtab 1: Evolution
     with res_tabs[0]:
         st.subheader("Evolution of Indic Scripts")
         df = load_data()
-        
-        if df is not None:
+        if df is None:
+            st.error("Data file 'df_iso15924_scripts.tsv' not found.")
+        else:
+            # 0. Script Search
+            script_index = get_script_index()
+            if script_index is not None:
+                script_query = st.text_input("🔎 Search all ISO 15924 scripts (code, English/French name, alias):",
+                                             key="script_search", placeholder="e.g. knda, nagari, télougou")
+                if script_query:
+                    matches = script_index.search(script_query, limit=15)
+                    if matches.empty:
+                        st.caption("No matching scripts.")
+                    else:
+                        st.dataframe(matches[['Code', 'English Name', 'Nom français', 'Alias', 'Age', 'Date']].set_index('Code'))
+                st.divider()
+
             # 1. Growth Chart
-            growth_df = analyze_scripts.get_indic_script_growth(df)
+            growth_df, latency_df = get_evolution_views()
             
             c1, c2 = st.columns([2, 1])
             with c1:
@@ -238,7 +315,6 @@ with tabs[0]:
                 
             with c2:
                 st.markdown("#### 🗓️ Latency Analysis")
-                latency_df = analyze_scripts.compare_kannada_latency(df)
                 if latency_df is not None:
                      # Filter for display
                      st.dataframe(latency_df[['English Name', 'Days Difference']].set_index('English Name'), height=300)
@@ -249,39 +325,21 @@ with tabs[0]:
             # 2. Original Timeline (Enhanced)
             st.markdown("#### ⏳ Graphical Timeline")
             
-            df_indic = df[df['Code'].isin(analyze_scripts.get_indic_scripts_list())].copy()
-            df_indic['Date'] = pd.to_datetime(df_indic['Date'])
-            df_indic = df_indic.sort_values('Date')
-            
-            fig, ax = plt.subplots(figsize=(10, 5))
-            # Dynamic colors
-            colors = ['red' if name == 'Kannada' else 'teal' for name in df_indic['English Name']]
-            sizes = [250 if name == 'Kannada' else 100 for name in df_indic['English Name']]
-            
-            ax.scatter(df_indic['Date'], df_indic['English Name'], color=colors, s=sizes, zorder=3)
-            ax.hlines(y=df_indic['English Name'], xmin=df_indic['Date'].min(), xmax=df_indic['Date'], color='skyblue', alpha=0.5, zorder=2)
-            
-            # Annotate
-            k_row = df_indic[df_indic['English Name'] == 'Kannada']
-            if not k_row.empty:
-                 k_date = k_row.iloc[0]['Date']
-                 ax.annotate('Kannada', (k_date, 'Kannada'), xytext=(10, 5), textcoords='offset points', color='red', weight='bold')
-
-            ax.grid(axis='x', linestyle='--', alpha=0.7)
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
-            fig.autofmt_xdate()
-            st.pyplot(fig)
+            st.image(get_timeline_png())
 
     # Subtab 2: Morphology
     with res_tabs[1]:
         st.subheader("🧩 Morphological Analyzer (Akshara Analysis)")
-        st.markdown("Analyze the composition of Kannada text: **Swaras, Vyanjanas, and Ottaksharas**.")
+        st.markdown("Analyze the composition of Kannada (or Telugu, Devanagari, ...) text: **Swaras, Vyanjanas, and Ottaksharas**.")
         
         morph_text = st.text_area("Enter Text for Analysis:", "ನಮಸ್ಕಾರ ಕನ್ನಡ", height=70, key="morph_input")
         
         if st.button("Analyze Morphology", key="btn_morph"):
             if hasattr(nlp_utils, 'analyze_morphology'):
-                result = nlp_utils.analyze_morphology(morph_text)
+                # Keeps the previous analysis so edits only re-segment the changed region
+                analyzer = get_artifacts().get_or_create("morph_analyzer", nlp_utils.IncrementalMorphology)
+                result = analyzer.update(morph_text)
+                get_artifacts().refresh("morph_analyzer")
                 
                 # Metrics Row
                 m1, m2, m3, m4 = st.columns(4)
@@ -290,6 +348,19 @@ with tabs[0]:
                 m3.metric("Ottaksharas (Conjuncts)", result['stats']['Ottaksharas'])
                 m4.metric("Total Aksharas", len(result['aksharas']))
                 
+                # The analyzer reads every Brahmic script; say what it skipped
+                other_scripts = {}
+                for run in script_detect.split_by_script(morph_text):
+                    if run.script not in nlp_utils.SCRIPT_CLASSES and run.script not in (script_detect.COMMON, script_detect.INHERITED):
+                        other_scripts[run.script] = other_scripts.get(run.script, 0) + len(run.text)
+                if other_scripts:
+                    names = script_detect.script_names(other_scripts)
+                    st.info("Skipped non-Indic text: " + ", ".join(f"{names[c]} ({n} chars)" for c, n in other_scripts.items()))
+                issues = kn_validate.validate(morph_text)
+                if issues:
+                    st.warning(f"{len(issues)} malformed sequence(s), segmentation may be off: "
+                               + ", ".join(f"{v.kind} at {v.offset}" for v in issues[:8]))
+                
                 st.divider()
                 st.markdown("#### 🔍 Akshara Breakdown")
                 st.warning(" | ".join(result['aksharas']))
@@ -303,13 +374,7 @@ with tabs[0]:
                     st.bar_chart(clean_stats)
                     
             if st.button("🔊 Play Original Text", key="tts_morph"):
-                 try:
-                    tts = gTTS(text=morph_text, lang='kn')
-                    audio_bytes = BytesIO()
-                    tts.write_to_fp(audio_bytes)
-                    st.audio(audio_bytes, format='audio/mp3')
-                 except Exception as e:
-                    # Fallback or error
+                 if speak(morph_text) is not None:
                     st.warning("Could not generate audio (Check internet/libraries).")
             else:
                 st.error("nlp_utils.analyze_morphology not found. Please reload.")
@@ -323,10 +388,12 @@ with tabs[0]:
         
         if st.button("Calculate Meter", key="btn_chand"):
             if hasattr(nlp_utils, 'get_chandassu_meter'):
-                # 1. Get meter
-                meter = nlp_utils.get_chandassu_meter(chand_text)
-                # 2. Get aksharas for alignment
-                aksharas = nlp_utils.analyze_morphology(chand_text)['aksharas']
+                analyzer = get_artifacts().get_or_create("chand_analyzer", nlp_utils.IncrementalMorphology)
+                # 1. Get aksharas for alignment (only the edited part is re-analyzed)
+                aksharas = analyzer.update(chand_text)['aksharas']
+                get_artifacts().refresh("chand_analyzer")
+                # 2. Get meter
+                meter = analyzer.meter()
                 
                 st.divider()
                 st.markdown("#### Result")
@@ -378,6 +445,54 @@ with tabs[0]:
             st.metric("Visual Match Score", f"{sim_res['score']*100}%", "High Compatibility")
             st.success("These scripts share a near-identical structure with a unicode offset of 0x80.")
 
+    # Subtab 5: Corpus Statistics
+    with res_tabs[4]:
+        st.subheader("📈 Corpus Frequency Statistics")
+        st.markdown("Stream a UTF-8 text corpus to get **word, stem, akshara and n-gram** frequencies. The file is read line by line, never held in memory.")
+
+        c_corp_1, c_corp_2 = st.columns(2)
+        with c_corp_1:
+            corpus_file = st.file_uploader("Corpus (.txt)", type=['txt'], key="corpus_upload")
+        with c_corp_2:
+            partial_files = st.file_uploader("Merge saved statistics (.json)", type=['json'], accept_multiple_files=True, key="corpus_merge")
+
+        if st.button("Compute Statistics", key="btn_corpus"):
+            stats = corpus_stats.CorpusStats()
+            if corpus_file is not None:
+                stats.consume_stream(corpus_file)
+            elif not partial_files:
+                stats.consume(nlp_utils.markov_gen.corpus)
+                st.caption("No corpus uploaded - using the built-in Vachana corpus.")
+            for pf in partial_files or []:
+                stats.merge(corpus_stats.CorpusStats.from_dict(json.load(pf)))
+
+            summary = stats.summary()
+            s1, s2, s3 = st.columns(3)
+            s1.metric("Lines", summary['lines'])
+            s2.metric("Word Tokens", summary['words']['total'])
+            s3.metric("Akshara Tokens", summary['aksharas']['total'])
+
+            t1, t2, t3 = st.columns(3)
+            for col, kind, title in [(t1, 'words', "Top Words"), (t2, 'stems', "Top Stems"), (t3, 'aksharas', "Top Aksharas")]:
+                with col:
+                    st.markdown(f"#### {title}")
+                    st.dataframe(stats.top_k_frame(kind, 15)[['Item', 'Count']], height=300)
+
+            t4, t5 = st.columns(2)
+            with t4:
+                st.markdown("#### Top Word Bigrams")
+                st.dataframe(stats.top_k_frame('word_bigrams', 10)[['Item', 'Count']])
+            with t5:
+                st.markdown("#### Top Akshara Trigrams")
+                st.dataframe(stats.top_k_frame('akshara_trigrams', 10)[['Item', 'Count']])
+
+            fig_zipf = stats.zipf_plot()
+            st.pyplot(fig_zipf)
+            plt.close(fig_zipf)
+
+            st.download_button("💾 Save Partial Statistics", json.dumps(stats.to_dict(), ensure_ascii=False),
+                               file_name="corpus_stats.json", mime="application/json")
+
 # --- Tab 2: Transliteration ---
 with tabs[1]:
     st.header("English -> Kannada Transliteration")
@@ -386,18 +501,21 @@ with tabs[1]:
     input_text = st.text_input("Enter text:", "namaskara")
     
     if input_text:
-        out = transliterate(input_text)
+        # Reuses the previous parse, so long documents typed live only redo the tail
+        out = get_artifacts().get_or_create("typer", IncrementalTransliterator).update(input_text)
+        get_artifacts().refresh("typer")
+        words = input_text.split()
+        if words and not input_text.endswith(" "):
+            suggestions = get_completer().complete(words[-1], k=5)
+            if suggestions:
+                st.caption("Suggestions: " + " · ".join(f"{c.word} (*{c.romanized}*)" for c in suggestions))
         st.markdown(f"### Output: `{out}`")
         st.markdown(f"# {out}") # Large display
         
         if st.button("🔊 Play Audio", key="tts_trans"):
-            try:
-                tts = gTTS(text=out, lang='kn')
-                audio_bytes = BytesIO()
-                tts.write_to_fp(audio_bytes)
-                st.audio(audio_bytes, format='audio/mp3')
-            except Exception as e:
-                st.error(f"TTS Error: {e}")
+            error = speak(out)
+            if error is not None:
+                st.error(f"TTS Error: {error}")
 
 
 # --- Tab 3: Creative Zone ---
@@ -449,17 +567,9 @@ with tabs[2]:
     with col_creative_2:
         st.subheader("📜 Kannada Wisdom (Nudimuthu)")
         
-        quotes = [
-            {"text": "ಕಾಯಕವೇ ಕೈಲಾಸ (Kayakave Kailasa)", "meaning": "Work is Worship", "author": "Basavanna"},
-            {"text": "ದೇಶ ಸುತ್ತು ಕೋಶ ಓದು (Desha sutthu, Kosha odhu)", "meaning": "Travel the world, or read the books (to gain wisdom)", "author": "Proverb"},
-            {"text": "ಮಾತು ಬೆಳ್ಳಿ, ಮೌನ ಬಂಗಾರ (Maatu belli, Mouna bangara)", "meaning": "Speech is silver, silence is golden", "author": "Proverb"},
-            {"text": "ಕುಂಬಾರನಿಗೆ ವರುಷ, ದೊಣ್ಣೆಗೆ ನಿಮಿಷ (Kumbaranige varusha, donnege nimisha)", "meaning": "A potter takes a year to make a pot, a stick takes a minute to break it (Creation is hard, destruction is easy)", "author": "Proverb"},
-            {"text": "ಹನಿ ಹನಿ ಕೂಡಿದರೆ ಹಳ್ಳ (Hani hani koodidare halla)", "meaning": "Many drops make a stream (Unity/Savings is strength)", "author": "Proverb"},
-             {"text": "ಮಂಕುತಿಮ್ಮನ ಕಗ್ಗ (Mankuthimmana Kagga)", "meaning": "Life is a complex balance...", "author": "D.V. Gundappa"}
-        ]
         
         if st.button("✨ Pearl of Wisdom"):
-             q = random.choice(quotes)
+             q = corpus_store.parse_quote(get_wisdom_store().sample(1)[0])
              
              # Custom Card UI
              card_html = f"""
@@ -558,7 +668,9 @@ with tabs[3]:
             if st.button("Classify"):
                 if nlp_utils:
                     category = nlp_utils.classify_text(cls_text)
-                    st.metric("Predicted Topic", category)
+                    c_rule, c_nb = st.columns(2)
+                    c_rule.metric("Predicted Topic (Keywords)", category)
+                    c_nb.metric("Naive Bayes", get_topic_model().predict([cls_text])[0])
                     
         with col_model_2:
             st.markdown("### 😃 Sentiment Analysis")
@@ -586,20 +698,31 @@ with tabs[3]:
         start_word = st.selectbox("Start Word:", ["ನುಡಿದರೆ", "ಇವ", "ದಯವಿಲ್ಲದ", "ಮಾನವ", "ಆಚಾರವಿಲ್ಲದ"])
         gen_len = st.slider("Length (words):", 5, 20, 8)
         
+        metered = st.checkbox("Match a meter (Laghu U / Guru -)", key="gen_metered")
+        if metered and nlp_utils:
+            meter_source = st.selectbox("Meter of:", list(nlp_utils.markov_gen.corpus), key="gen_meter_source")
+            gen_meter = st.text_input("Target meter:", "".join(nlp_utils.get_chandassu_meter(meter_source)))
+        
         if st.button("✨ Generate Vachana"):
             if nlp_utils:
-                gen_text = nlp_utils.markov_gen.generate(start_word, gen_len)
+                if metered:
+                    try:
+                        lines = nlp_utils.markov_gen.generate_metered(gen_meter, count=3)
+                    except ValueError as e:
+                        st.error(str(e))
+                        lines = []
+                    if not lines:
+                        st.warning("No line in the model's vocabulary fits that meter.")
+                    gen_text = "\n".join(lines)
+                else:
+                    gen_text = nlp_utils.markov_gen.generate(start_word, gen_len)
                 st.markdown(f"**Generated:**")
-                st.markdown(f"> *{gen_text}*" )
+                for gen_line in gen_text.splitlines():
+                    st.markdown(f"> *{gen_line}*" )
                 
                 # Audio for fun
                 if st.button("🔊 Read Aloud", key="tts_gen"):
-                     try:
-                        tts = gTTS(text=gen_text, lang='kn')
-                        audio_bytes = BytesIO()
-                        tts.write_to_fp(audio_bytes)
-                        st.audio(audio_bytes, format='audio/mp3')
-                     except: pass
+                     speak(gen_text)
             else:
                 st.error("Model Loading Failed")
 
@@ -616,8 +739,14 @@ with tabs[3]:
             with st.chat_message("user"):
                 st.write(user_query)
             with st.chat_message("assistant"):
-                st.write(f"ನೀವು ಕೇಳಿದ್ದು: '{user_query}'. ಇದು ತುಂಬಾ ಸ್ವಾರಸ್ಯಕರ ಪ್ರಶ್ನೆ! (You asked: ... which is interesting!)")
-                st.caption("Simulated Response")
+                hits = get_chat_index().search(user_query, k=3, phonetic=True)
+                if hits:
+                    st.write(hits[0].text)
+                    st.caption(f"Source: {hits[0].source} · BM25 {hits[0].score:.2f}")
+                    for hit in hits[1:]:
+                        st.markdown(f"- {hit.text} _({hit.source})_")
+                else:
+                    st.write(f"ಕ್ಷಮಿಸಿ, '{user_query}' ಬಗ್ಗೆ ನನಗೆ ಏನೂ ಸಿಗಲಿಲ್ಲ. (Sorry, I found nothing about that.)")
         
         st.divider()
         
@@ -642,14 +771,39 @@ with tabs[3]:
     # --- Eval Section ---
     st.divider()
     with st.expander("📊 Model Evaluation & Metrics"):
-        st.write("Confusion Matrix for Classification Model (Simulated Data)")
-        import numpy as np
-        conf_matrix = np.random.rand(5, 5)
+        topic_eval = get_topic_eval()
+        st.write(f"Confusion Matrix for the Naive Bayes Topic Classifier ({topic_eval['source']} held-out set)")
         
         c_eval_1, c_eval_2 = st.columns([1, 2])
         with c_eval_1:
-             fig_eval, ax_eval = plt.subplots(figsize=(4, 4)) # Smaller size
-             im = ax_eval.imshow(conf_matrix, cmap='Blues')
-             ax_eval.set_title("Confusion Matrix")
-             ax_eval.axis('off')
-             st.pyplot(fig_eval)
+             st.image(get_confusion_png())
+        with c_eval_2:
+             st.metric("Accuracy", f"{topic_eval['accuracy']:.1%}", help=f"{topic_eval['test_docs']} held-out documents")
+             st.dataframe(pd.DataFrame({"Precision": topic_eval['precision'], "Recall": topic_eval['recall']}, index=topic_eval['categories']))
+             st.caption(f"Prediction throughput: {topic_eval['predict_docs_per_sec']:.0f} docs/s · regenerate with `python topic_model.py evaluate`")
+
+# --- Hidden Performance Panel (only when instrumentation is on) ---
+if show_perf_panel:
+    with st.sidebar:
+        with st.expander("⏱️ Performance"):
+            perf_snapshot = perf_monitor.snapshot()
+            if perf_snapshot:
+                perf_df = pd.DataFrame.from_dict(perf_snapshot, orient='index')
+                perf_cols = [c for c in ['calls', 'p50_ms', 'p95_ms', 'p99_ms', 'mean_input_size', 'cache_hit_rate'] if c in perf_df.columns]
+                st.dataframe(perf_df[perf_cols].sort_values('calls', ascending=False))
+            else:
+                st.caption("No instrumented calls yet.")
+            st.download_button("⬇️ Download JSON", perf_monitor.dump_json(), file_name="perf_snapshot.json", mime="application/json")
+            if st.button("Reset Stats", key="perf_reset"):
+                perf_monitor.reset()
+            st.markdown("**Session memory**")
+            session_info = get_artifacts().info()
+            process_info = session_memory.process_report()
+            st.caption(f"This session: {session_info['nbytes'] / 1e6:.2f} / {session_info['budget'] / 1e6:.0f} MB "
+                       f"in {session_info['entries']} artifacts, {session_info['evictions']} evicted, "
+                       f"{session_info['oversized']} over budget · "
+                       f"{process_info['sessions']} sessions hold {process_info['nbytes'] / 1e6:.2f} MB")
+            st.markdown("**Memo caches**")
+            st.dataframe(pd.DataFrame.from_dict(nlp_utils.cache_stats(), orient='index')[['hits', 'misses', 'evictions', 'currsize', 'nbytes']])
+            if st.button("Clear Memo Caches", key="memo_clear"):
+                nlp_utils.invalidate_caches()
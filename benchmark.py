@@ -0,0 +1,234 @@
+"""
+Reproducible performance benchmarks for nlp_utils, transliterate and
+analyze_scripts.
+
+Usage:
+    python benchmark.py                         # run, write bench_results.json
+    python benchmark.py --update-baseline       # store current timings as the baseline
+    python benchmark.py --baseline bench_baseline.json --tolerance 0.25
+
+The run exits with status 1 when any case is slower than its baseline by more
+than the tolerance, so it can gate CI, and with status 2 when there is no
+baseline to compare against (timings are machine-specific, so none is
+committed: record one with --update-baseline on the machine that gates).
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+import analyze_scripts
+import nlp_utils
+from synthetic_corpus import DEFAULT_SEED, KannadaCorpusGenerator, generate_romanized_text
+from transliterate import transliterate
+
+DEFAULT_SIZES = [100, 1000, 10000]   # words per synthetic document
+DEFAULT_RESULTS = "bench_results.json"
+DEFAULT_BASELINE = "bench_baseline.json"
+
+# --- Benchmark Cases ---
+
+def _per_word(func):
+    def run(payload):
+        for w in payload['words']:
+            func(w)
+    return run
+
+def _per_sentence(func):
+    def run(payload):
+        for s in payload['sentences']:
+            func(s)
+    return run
+
+def get_text_cases():
+    """Benchmarks over the synthetic corpus, name -> callable(payload)."""
+    return {
+        'normalize_kannada': lambda p: nlp_utils.normalize_kannada(p['text']),
+        'preprocess_text': lambda p: nlp_utils.preprocess_text(p['text'], remove_stopwords=True),
+        'analyze_morphology': lambda p: nlp_utils.analyze_morphology(p['text']),
+        'morphology_stats_vectorized': lambda p: nlp_utils.morphology_stats_vectorized(p['text']),
+        'get_chandassu_meter': _per_sentence(nlp_utils.get_chandassu_meter),
+        'simple_kannada_stemmer': _per_word(nlp_utils.simple_kannada_stemmer),
+        'kannada_phonetic_hash': _per_word(nlp_utils.kannada_phonetic_hash),
+        'classify_text': lambda p: nlp_utils.classify_text(p['text']),
+        'analyze_sentiment': lambda p: nlp_utils.analyze_sentiment(p['text']),
+        'simplify_kannada': lambda p: nlp_utils.simplify_kannada(p['text']),
+        'calculate_script_similarity': lambda p: nlp_utils.calculate_script_similarity(p['text'], ""),
+        'transliterate': lambda p: transliterate(p['roman']),
+        # The translator's own lru_cache isn't switched off by set_memoization, so
+        # time the uncached lookup or every loop after the warm-up is a cache hit
+        'basic_translate_en_kn': _per_sentence(lambda s: nlp_utils.en_kn_translator._translate(s)),
+        'markov_generate': lambda p: [nlp_utils.markov_gen.generate(length=20, rng=p['rng']) for _ in range(len(p['sentences']))],
+        'markov_generate_metered': lambda p: [nlp_utils.markov_gen.generate_metered("UUUU-UU-U-UU-U", rng=p['rng']) for _ in range(len(p['sentences']))],
+    }
+
+def get_dataset_cases(df):
+    return {
+        'load_dataset': lambda: analyze_scripts.load_dataset(),
+        'get_indic_script_growth': lambda: analyze_scripts.get_indic_script_growth(df),
+        'compare_kannada_latency': lambda: analyze_scripts.compare_kannada_latency(df),
+    }
+
+def build_payload(n_words, seed=DEFAULT_SEED):
+    gen = KannadaCorpusGenerator(seed=seed)
+    words = gen.words(n_words)
+    sentences = [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+    return {
+        'words': words,
+        'sentences': sentences,
+        'text': ". ".join(sentences),
+        'roman': generate_romanized_text(n_words, seed=seed),
+        'rng': random.Random(seed),  # for the randomized cases (Markov generation)
+    }
+
+def time_call(func, repeat=5, min_time=0.05):
+    """
+    Best-of-`repeat` timing. Fast calls are looped until each sample takes at
+    least `min_time` seconds so timer resolution doesn't dominate.
+    """
+    func() # warm up caches / lazy imports
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+    samples = [elapsed / loops]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - t0) / loops)
+    return {'best': min(samples), 'median': statistics.median(samples), 'loops': loops}
+
+def run_benchmarks(sizes=None, seed=DEFAULT_SEED, repeat=5, only=None, memo=False):
+    sizes = sizes or DEFAULT_SIZES
+    results = {}
+    # Timing loops repeat the same input, so memo hits would hide the real cost
+    memo_was = nlp_utils.set_memoization(memo)
+    try:
+        _run_cases(results, sizes, seed, repeat, only)
+    finally:
+        nlp_utils.set_memoization(memo_was)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'sizes': sizes,
+            'repeat': repeat,
+            'memo': memo,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+def _run_cases(results, sizes, seed, repeat, only):
+    """Times every wanted case into `results` (case -> size -> stats)."""
+
+    def wanted(name):
+        return not only or any(o in name for o in only)
+
+    for n_words in sizes:
+        # A fresh payload (and its RNG) per size, so every run sees identical inputs
+        payload = build_payload(n_words, seed=seed)
+        for name, case in get_text_cases().items():
+            if not wanted(name):
+                continue
+            stats = time_call(lambda: case(payload), repeat=repeat)
+            stats['chars'] = len(payload['roman'] if name == 'transliterate' else payload['text'])
+            stats['chars_per_sec'] = stats['chars'] / stats['best'] if stats['best'] else None
+            results.setdefault(name, {})[str(n_words)] = stats
+
+    df = analyze_scripts.load_dataset()
+    if df is not None:
+        for name, case in get_dataset_cases(df).items():
+            if wanted(name):
+                results.setdefault(name, {})['dataset'] = time_call(case, repeat=repeat)
+
+def compare_to_baseline(report, baseline, tolerance=0.25):
+    """
+    Returns a list of (case, size, baseline_s, current_s, ratio) for every
+    measurement slower than baseline * (1 + tolerance).
+    """
+    regressions = []
+    for name, per_size in report['results'].items():
+        for size, stats in per_size.items():
+            base = baseline.get('results', {}).get(name, {}).get(size)
+            if not base or not base.get('best'):
+                continue
+            ratio = stats['best'] / base['best']
+            if ratio > 1 + tolerance:
+                regressions.append((name, size, base['best'], stats['best'], ratio))
+    return regressions
+
+def missing_from_baseline(report, baseline):
+    """(case, size) pairs measured in this run that the baseline has no timing for."""
+    return [(name, size) for name, per_size in report['results'].items() for size in per_size
+            if not baseline.get('results', {}).get(name, {}).get(size, {}).get('best')]
+
+def print_report(report):
+    print(f"{'case':<28} {'size':>8} {'best (ms)':>12} {'median (ms)':>12}")
+    for name, per_size in report['results'].items():
+        for size, stats in per_size.items():
+            print(f"{name:<28} {size:>8} {stats['best'] * 1e3:>12.3f} {stats['median'] * 1e3:>12.3f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Kannada NLP toolkit.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Words per synthetic document.")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", help="Run only cases whose name contains one of these strings.")
+    parser.add_argument("--output", default=DEFAULT_RESULTS, help="Where to write the JSON results.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Stored baseline to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%).")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with this run.")
+    parser.add_argument("--memo", action="store_true", help="Leave nlp_utils memoization on (measures cache hits).")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, seed=args.seed, repeat=args.repeat, only=args.only, memo=args.memo)
+    print_report(report)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"\n[WARN] No baseline at {args.baseline}, nothing was compared; "
+              f"run with --update-baseline to create one.", file=sys.stderr)
+        return 2
+
+    missing = missing_from_baseline(report, baseline)
+    if missing:
+        print(f"\n[WARN] {len(missing)} measurement(s) not in the baseline, not compared "
+              f"(run with --update-baseline to add them):", file=sys.stderr)
+        for name, size in missing:
+            print(f"  {name} @ {size}", file=sys.stderr)
+    regressions = compare_to_baseline(report, baseline, args.tolerance)
+    if regressions:
+        print(f"\n[FAIL] {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for name, size, base, cur, ratio in regressions:
+            print(f"  {name} @ {size}: {base * 1e3:.3f} ms -> {cur * 1e3:.3f} ms (x{ratio:.2f})")
+        return 1
+    print("\n[PASS] No regressions against baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
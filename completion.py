@@ -0,0 +1,348 @@
+"""
+Frequency-ranked word completion for romanized and Kannada prefixes.
+
+Every vocabulary word is indexed three ways: by its romanization under the
+transliteration scheme ("ನಮಸ್ಕಾರ" -> "namaskaara"), by a loose romanization
+with long vowels collapsed ("namaskara", for people who don't double vowels)
+and by its Kannada spelling. Each index is a sorted array of UTF-8 keys, so
+the words under a prefix are one contiguous range found by two binary
+searches -- a trie flattened into arrays. Ranges larger than HEAVY_RANGE
+(short prefixes) have their top words precomputed; smaller ones are ranked on
+the fly with argpartition.
+
+All arrays live in one binary file that is memory-mapped on load, so opening
+a prebuilt index is effectively instant:
+
+    python completion.py build corpus.txt more.txt     # -> completions.bin
+    python completion.py complete namas
+
+    index = CompletionIndex.load()   # or CompletionIndex.from_counts(counter)
+    index.complete("namas", k=5)     # [Completion("ನಮಸ್ಕಾರ", "namaskaara", 12), ...]
+"""
+
+import argparse
+import bisect
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from collections import Counter, namedtuple
+
+import numpy as np
+
+import nlp_utils
+from file_utils import atomic_write
+from transliterate import get_transliteration_map
+
+MAGIC = b"KNCOMP\0\0"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sII")
+DEFAULT_INDEX = os.path.join(os.path.dirname(os.path.abspath(__file__)), "completions.bin")
+
+HEAVY_RANGE = 512  # prefixes matching more keys than this get a precomputed top list
+MAX_K = 16         # longest precomputed top list (and the largest k served from it)
+_NO_WORD = np.iinfo(np.uint32).max
+
+INDEXES = ("roman", "loose", "kannada")
+
+Completion = namedtuple("Completion", "word romanized count")
+
+_WORD_RE = re.compile(r"[ಀ-೿]+")
+
+# --- Romanization ---
+
+def _reverse_scheme():
+    # Kannada -> the shortest key that types it under the current scheme
+    vowels, consonants, matras = get_transliteration_map()
+    consonant_keys, matra_keys, vowel_keys = {}, {}, {}
+    for table, out, strip in ((consonants, consonant_keys, True), (matras, matra_keys, False), (vowels, vowel_keys, False)):
+        for key in sorted(table, key=lambda k: (len(k), k)):
+            value = table[key][0] if strip else table[key]
+            out.setdefault(value, key)
+    # Letters the scheme can't produce (its duplicate keys shadow them): use
+    # what people type for them anyway
+    for char, key in {"ಟ": "t", "ಠ": "th", "ಡ": "d", "ಢ": "dh", "ಣ": "n", "ಲ": "l", "ಷ": "shh"}.items():
+        consonant_keys.setdefault(char, key)
+    vowel_keys.setdefault("ಋ", "ru")
+    return consonant_keys, matra_keys, vowel_keys
+
+_CONSONANT_KEYS, _MATRA_KEYS, _VOWEL_KEYS = _reverse_scheme()
+_VIRAMA = "್"
+_LOOSE_RE = re.compile(r"([aeiou])\1")
+
+def romanize(word):
+    """Kannada word -> how it is typed under the transliteration scheme."""
+    out = []
+    n = len(word)
+    i = 0
+    while i < n:
+        ch = word[i]
+        if ch in _CONSONANT_KEYS:
+            out.append(_CONSONANT_KEYS[ch])
+            nxt = word[i + 1] if i + 1 < n else ""
+            if nxt in _MATRA_KEYS:
+                out.append(_MATRA_KEYS[nxt])
+                i += 1
+            elif nxt == _VIRAMA:
+                i += 1
+            else:
+                out.append("a")
+        elif ch in _VOWEL_KEYS:
+            out.append(_VOWEL_KEYS[ch])
+        elif ch == "ಂ":
+            out.append("m")
+        elif ch == "ಃ":
+            out.append("h")
+        i += 1
+    return "".join(out)
+
+def loosen(roman):
+    """Collapses doubled vowels ("namaskaara" -> "namaskara")."""
+    return _LOOSE_RE.sub(r"\1", roman.lower())
+
+def _is_kannada(text):
+    return any("ಀ" <= ch <= "೿" for ch in text)
+
+# --- Vocabulary ---
+
+def count_words(lines, counts=None):
+    """Adds the Kannada words of `lines` to a Counter."""
+    counts = Counter() if counts is None else counts
+    for line in lines:
+        counts.update(_WORD_RE.findall(nlp_utils.normalize_kannada(line)))
+    return counts
+
+def default_vocabulary():
+    """Words from the built-in corpora and lexicons (each lexicon word counts once)."""
+    import corpus_store
+
+    counts = count_words(nlp_utils.LEXICONS["vachana_corpus"])
+    with corpus_store.wisdom_quotes() as quotes:
+        count_words((corpus_store.parse_quote(q)["text"] for q in quotes), counts)
+    lexicon_words = list(nlp_utils.LEXICONS["stopwords"])
+    lexicon_words += [word for _, word in nlp_utils.LEXICONS["topic_keywords"]]
+    lexicon_words += [word for word, _ in nlp_utils.LEXICONS["sentiment"]]
+    lexicon_words += list(nlp_utils.BASIC_EN_KN_LEXICON.values())
+    return count_words(lexicon_words, counts)
+
+# --- Builder ---
+
+def _bytes_column(encoded):
+    offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+def _top(word_ids, freqs, lo, hi, k):
+    # Most frequent first, ties by word id (= alphabetical)
+    size = hi - lo
+    if size > k:
+        part = lo + np.argpartition(freqs[lo:hi], size - k)[size - k:]
+    else:
+        part = np.arange(lo, hi)
+    part = part[np.lexsort((word_ids[part], -freqs[part].astype(np.int64)))]
+    return word_ids[part]
+
+def _build_index(keys, word_ids, freqs):
+    """Arrays for one sorted-key index (keys: list of bytes)."""
+    order = sorted(range(len(keys)), key=lambda i: (keys[i], word_ids[i]))
+    keys = [keys[i] for i in order]
+    word_ids = word_ids[order]
+    freqs = freqs[order]
+
+    # Heavy prefixes: walk down from the root while ranges stay large
+    heavy, tops = [], []
+    stack = [b""]
+    while stack:
+        prefix = stack.pop()
+        lo = bisect.bisect_left(keys, prefix)
+        hi = bisect.bisect_left(keys, prefix + b"\xff")
+        if hi - lo <= HEAVY_RANGE:
+            continue
+        heavy.append(prefix)
+        row = np.full(MAX_K, _NO_WORD, dtype="<u4")
+        top = _top(word_ids, freqs, lo, hi, MAX_K)
+        row[:len(top)] = top
+        tops.append(row)
+        stack.extend({prefix + k[len(prefix):len(prefix) + 1] for k in keys[lo:hi] if len(k) > len(prefix)})
+
+    key_offsets, key_blob = _bytes_column(keys)
+    heavy_offsets, heavy_blob = _bytes_column(heavy)
+    return {
+        "key_offsets": key_offsets, "key_blob": key_blob,
+        "key_words": word_ids.astype("<u4"), "key_freqs": freqs.astype("<u4"),
+        "heavy_offsets": heavy_offsets, "heavy_blob": heavy_blob,
+        "heavy_tops": np.array(tops, dtype="<u4").reshape(-1, MAX_K),
+    }
+
+def compile_index(counts, min_count=1):
+    """Counter of Kannada words -> index file bytes."""
+    words = sorted(w for w, c in counts.items() if c >= min_count)
+    freqs = np.array([min(counts[w], _NO_WORD - 1) for w in words], dtype=np.int64)
+    ids = np.arange(len(words), dtype=np.int64)
+    romans = [romanize(w) for w in words]
+
+    arrays = {}
+    word_offsets, word_blob = _bytes_column([w.encode("utf-8") for w in words])
+    arrays["word_offsets"], arrays["word_blob"] = word_offsets, word_blob
+    arrays["word_freqs"] = freqs.astype("<u4")
+    for name, keys in (("roman", romans), ("loose", [loosen(r) for r in romans]), ("kannada", words)):
+        for field, arr in _build_index([k.encode("utf-8") for k in keys], ids, freqs).items():
+            arrays[f"{name}.{field}"] = arr
+
+    # Layout: header, JSON directory, then 8-byte aligned arrays
+    directory, chunks, pos = {}, [], 0
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        pad = -pos % 8
+        chunks.append(b"\0" * pad)
+        pos += pad
+        directory[name] = [arr.dtype.str, list(arr.shape), pos]
+        chunks.append(arr.tobytes())
+        pos += arr.nbytes
+    dir_bytes = json.dumps({"words": len(words), "arrays": directory}).encode("utf-8")
+    dir_bytes += b" " * (-(HEADER.size + len(dir_bytes)) % 8)
+    return HEADER.pack(MAGIC, FORMAT_VERSION, len(dir_bytes)) + dir_bytes + b"".join(chunks)
+
+def build_index(counts, path=DEFAULT_INDEX, min_count=1):
+    """Writes the index atomically; returns path."""
+    payload = compile_index(counts, min_count)
+    with atomic_write(path, prefix=".completions-") as f:
+        f.write(payload)
+    return path
+
+# --- Reader ---
+
+class _SortedKeys:
+    """One index: sorted keys plus their word ids, counts and heavy-prefix tops."""
+
+    def __init__(self, arrays, name):
+        get = lambda field: arrays[f"{name}.{field}"]
+        self.offsets = get("key_offsets")
+        self.blob = get("key_blob")
+        self.words = get("key_words")
+        self.freqs = get("key_freqs")
+        self.n = len(self.words)
+        heavy_offsets, heavy_blob = get("heavy_offsets"), get("heavy_blob").tobytes()
+        bounds = heavy_offsets.tolist()
+        self.heavy = {heavy_blob[a:b]: i for i, (a, b) in enumerate(zip(bounds[:-1], bounds[1:]))}
+        self.tops = get("heavy_tops")
+
+    def _key(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes()
+
+    def _lower_bound(self, target):
+        lo, hi = 0, self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def top_words(self, prefix, k):
+        """Word ids of the k most frequent keys starting with `prefix`."""
+        target = prefix.encode("utf-8")
+        row = self.heavy.get(target)
+        if row is not None and k <= MAX_K:
+            top = self.tops[row][:k]
+            return top[top != _NO_WORD]
+        lo = self._lower_bound(target)
+        hi = self._lower_bound(target + b"\xff")
+        return _top(self.words, self.freqs, lo, hi, k)
+
+class CompletionIndex:
+    """A loaded completion index (memory-mapped when read from a file)."""
+
+    def __init__(self, buf, path=None):
+        magic, fmt, dir_len = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(f"not a completion index (format {FORMAT_VERSION}): {path}")
+        directory = json.loads(bytes(buf[HEADER.size:HEADER.size + dir_len]))
+        base = HEADER.size + dir_len
+        arrays = {}
+        for name, (dtype, shape, offset) in directory["arrays"].items():
+            count = int(np.prod(shape)) if shape else 1
+            arrays[name] = np.frombuffer(buf, dtype=dtype, count=count, offset=base + offset).reshape(shape)
+        self.path = path
+        self._buf = buf
+        self._word_offsets = arrays["word_offsets"]
+        self._word_blob = arrays["word_blob"]
+        self.word_freqs = arrays["word_freqs"]
+        self.indexes = {name: _SortedKeys(arrays, name) for name in INDEXES}
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX):
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buf, path)
+
+    @classmethod
+    def from_counts(cls, counts, min_count=1):
+        """In-memory index straight from a Counter (no file)."""
+        return cls(compile_index(counts, min_count))
+
+    def __len__(self):
+        return len(self.word_freqs)
+
+    def word(self, i):
+        return self._word_blob[self._word_offsets[i]:self._word_offsets[i + 1]].tobytes().decode("utf-8")
+
+    def complete(self, prefix, k=5):
+        """
+        Top-k Completions for a romanized or Kannada prefix. Romanized
+        prefixes are matched exactly first, then loosely (doubled vowels
+        collapsed) to fill up to k.
+        """
+        prefix = prefix.strip()
+        if not prefix or k <= 0:
+            return []
+        if _is_kannada(prefix):
+            ids = self.indexes["kannada"].top_words(nlp_utils.normalize_kannada(prefix), k)
+        else:
+            prefix = prefix.lower()
+            ids = self.indexes["roman"].top_words(prefix, k).tolist()
+            if len(ids) < k:
+                seen = set(ids)
+                loose = self.indexes["loose"].top_words(loosen(prefix), k + len(ids)).tolist()
+                ids += [i for i in loose if i not in seen][:k - len(ids)]
+        out = []
+        for i in ids:
+            word = self.word(int(i))
+            out.append(Completion(word, romanize(word), int(self.word_freqs[i])))
+        return out
+
+def load_or_build(path=DEFAULT_INDEX):
+    """The prebuilt index at `path` if there is one, else one over default_vocabulary()."""
+    if os.path.exists(path):
+        return CompletionIndex.load(path)
+    return CompletionIndex.from_counts(default_vocabulary())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build / query the word completion index.")
+    parser.add_argument("--index", default=DEFAULT_INDEX)
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Build from text files (plus the built-in vocabulary).")
+    build.add_argument("files", nargs="*")
+    build.add_argument("--min-count", type=int, default=1)
+    query = sub.add_parser("complete", help="Print completions for a prefix.")
+    query.add_argument("prefix")
+    query.add_argument("-k", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        counts = default_vocabulary()
+        for path in args.files:
+            with open(path, encoding="utf-8") as f:
+                count_words(f, counts)
+        build_index(counts, args.index, args.min_count)
+        print(f"Wrote {args.index}: {len(CompletionIndex.load(args.index))} words, {os.path.getsize(args.index)} bytes")
+    else:
+        for c in load_or_build(args.index).complete(args.prefix, args.k):
+            print(f"{c.count:>8}  {c.word}  ({c.romanized})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,377 @@
+"""
+Streaming, memory-bounded corpus frequency statistics.
+
+Text is consumed line by line in chunks. Each chunk is counted exactly with a
+Counter and then folded into per-kind BoundedCounters (words, stems,
+aksharas, word/akshara n-grams). A BoundedCounter keeps exact counts for the
+first `max_exact` distinct keys and routes everything after that into a
+count-min sketch plus a small heavy-hitters table, so memory stays flat no
+matter how large the corpus is. All structures serialize to JSON and merge,
+so partial runs over shards can be combined later.
+
+    stats = CorpusStats()
+    stats.consume_file("corpus.txt")
+    stats.save("part1.json")
+    total = CorpusStats.load("part0.json").merge(CorpusStats.load("part1.json"))
+    total.top_k("words", 20)
+"""
+
+import base64
+import hashlib
+import io
+import json
+import zlib
+from collections import Counter
+
+import numpy as np
+
+import nlp_utils
+
+FORMAT_VERSION = 1
+
+# --- Count-Min Sketch ---
+
+class CountMinSketch:
+    """
+    Count-min sketch with `depth` rows of `width` counters. Keys are hashed
+    with BLAKE2b (not Python's per-process salted hash()) so sketches built in
+    different processes or runs line up and can be merged by adding tables.
+    """
+
+    def __init__(self, width=1 << 16, depth=4, seed=0):
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self._salt = seed.to_bytes(8, "little")
+
+    def _flat_indices(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16, salt=self._salt).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        width = self.width
+        # Kirsch-Mitzenmacher double hashing: row i uses h1 + i * h2
+        return [i * width + (h1 + i * h2) % width for i in range(self.depth)]
+
+    def add(self, key, count=1):
+        flat = self.table.reshape(-1)
+        est = None
+        for idx in self._flat_indices(key):
+            value = int(flat[idx]) + count
+            flat[idx] = value
+            if est is None or value < est:
+                est = value
+        return est
+
+    def estimate(self, key):
+        flat = self.table.reshape(-1)
+        return min(int(flat[idx]) for idx in self._flat_indices(key))
+
+    def compatible(self, other):
+        return (self.width, self.depth, self.seed) == (other.width, other.depth, other.seed)
+
+    def merge(self, other):
+        if not self.compatible(other):
+            raise ValueError("Cannot merge sketches with different width/depth/seed")
+        self.table += other.table
+        return self
+
+    def to_dict(self):
+        raw = zlib.compress(self.table.tobytes(), 6)
+        return {"width": self.width, "depth": self.depth, "seed": self.seed,
+                "table": base64.b64encode(raw).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, data):
+        cms = cls(data["width"], data["depth"], data["seed"])
+        raw = zlib.decompress(base64.b64decode(data["table"]))
+        cms.table = np.frombuffer(raw, dtype=np.int64).reshape(cms.depth, cms.width).copy()
+        return cms
+
+# --- Bounded Counter ---
+
+class BoundedCounter:
+    """
+    Exact counts for up to `max_exact` distinct keys; past that, new keys are
+    counted approximately in a CountMinSketch, and the `heavy_capacity` most
+    frequent of them are tracked by estimated count so they still show up in
+    top-k tables. A count in `exact` is always the true count: on merge, a key
+    the other shard may have spilled into its sketch becomes approximate.
+    """
+
+    def __init__(self, max_exact=200_000, heavy_capacity=1000, sketch_width=1 << 16, sketch_depth=4, seed=0):
+        self.max_exact = max_exact
+        self.heavy_capacity = heavy_capacity
+        self.exact = {}
+        self.heavy = {}
+        self.sketch = None
+        self.total = 0
+        self._sketch_args = (sketch_width, sketch_depth, seed)
+        self._heavy_min = 0
+        self._heavy_min_key = None
+
+    def __len__(self):
+        return len(self.exact) + len(self.heavy)
+
+    @property
+    def saturated(self):
+        return self.sketch is not None
+
+    def update(self, counts):
+        """Adds a mapping of key -> count (typically a per-chunk Counter)."""
+        exact = self.exact
+        for key, count in counts.items():
+            self.total += count
+            if key in exact:
+                exact[key] += count
+            elif len(exact) < self.max_exact and (self.sketch is None or not self.sketch.estimate(key)):
+                # (a key already in the sketch stays approximate, or its count would split)
+                exact[key] = count
+            else:
+                self._add_approx(key, count)
+
+    def _add_approx(self, key, count):
+        if self.sketch is None:
+            self.sketch = CountMinSketch(*self._sketch_args)
+        est = self.sketch.add(key, count)
+        heavy = self.heavy
+        if key in heavy or len(heavy) < self.heavy_capacity:
+            heavy[key] = est
+            # Counts only grow, so the minimum moves only when its own key grows
+            if len(heavy) == self.heavy_capacity and (key == self._heavy_min_key or self._heavy_min_key is None):
+                self._refresh_heavy_min()
+        elif est > self._heavy_min:
+            # Evict the current weakest heavy hitter
+            del heavy[self._heavy_min_key]
+            heavy[key] = est
+            self._refresh_heavy_min()
+
+    def _refresh_heavy_min(self):
+        if self.heavy and len(self.heavy) == self.heavy_capacity:
+            self._heavy_min_key = min(self.heavy, key=self.heavy.get)
+            self._heavy_min = self.heavy[self._heavy_min_key]
+        else:
+            self._heavy_min_key, self._heavy_min = None, 0
+
+    def get(self, key):
+        if key in self.exact:
+            return self.exact[key]
+        if self.sketch is None:
+            return 0
+        return self.sketch.estimate(key)
+
+    def most_common(self, k=None):
+        items = list(self.exact.items()) + list(self.heavy.items())
+        items.sort(key=lambda kv: (-kv[1], kv[0]))
+        return items[:k] if k else items
+
+    def merge(self, other):
+        """Folds `other` into this counter in place."""
+        self.total += other.total
+        spill = {}
+        if other.sketch is not None:
+            # A key this side counts exactly may have spilled into other's
+            # sketch. A zero estimate proves it didn't; otherwise its merged
+            # count can't be exact any more, so it moves to the sketch.
+            for key in [k for k in self.exact if k not in other.exact and other.sketch.estimate(k)]:
+                spill[key] = self.exact.pop(key)
+        for key, count in other.exact.items():
+            if key in self.exact:
+                self.exact[key] += count
+            elif len(self.exact) < self.max_exact and (self.sketch is None or not self.sketch.estimate(key)):
+                self.exact[key] = count
+            else:
+                spill[key] = count
+        if other.sketch is not None:
+            if self.sketch is None:
+                self.sketch = CountMinSketch(*self._sketch_args)
+            self.sketch.merge(other.sketch)
+        for key, count in spill.items():
+            self._add_approx(key, count)
+        # Re-estimate heavy hitters against the merged sketch
+        if self.sketch is not None:
+            candidates = set(self.heavy) | set(other.heavy)
+            ranked = sorted(((k, self.sketch.estimate(k)) for k in candidates if k not in self.exact),
+                            key=lambda kv: -kv[1])[:self.heavy_capacity]
+            self.heavy = dict(ranked)
+            self._refresh_heavy_min()
+        return self
+
+    def to_dict(self):
+        width, depth, seed = self._sketch_args
+        return {
+            "max_exact": self.max_exact,
+            "heavy_capacity": self.heavy_capacity,
+            "sketch_args": [width, depth, seed],
+            "total": self.total,
+            "exact": self.exact,
+            "heavy": self.heavy,
+            "sketch": self.sketch.to_dict() if self.sketch is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        width, depth, seed = data["sketch_args"]
+        bc = cls(data["max_exact"], data["heavy_capacity"], width, depth, seed)
+        bc.total = data["total"]
+        bc.exact = dict(data["exact"])
+        bc.heavy = dict(data["heavy"])
+        if data["sketch"] is not None:
+            bc.sketch = CountMinSketch.from_dict(data["sketch"])
+        bc._refresh_heavy_min()
+        return bc
+
+# --- Corpus Statistics Engine ---
+
+KINDS = ["words", "stems", "aksharas", "word_bigrams", "akshara_bigrams", "akshara_trigrams"]
+
+class CorpusStats:
+    """Streaming word / stem / akshara / n-gram frequencies for a corpus."""
+
+    def __init__(self, max_exact=200_000, heavy_capacity=1000, sketch_width=1 << 16, sketch_depth=4):
+        self.counters = {
+            kind: BoundedCounter(max_exact, heavy_capacity, sketch_width, sketch_depth)
+            for kind in KINDS
+        }
+        self.lines = 0
+        self._stem_cache = {}
+
+    def _stem(self, word):
+        stem = self._stem_cache.get(word)
+        if stem is None:
+            stem = nlp_utils.simple_kannada_stemmer(word)
+            if len(self._stem_cache) < 100_000:
+                self._stem_cache[word] = stem
+        return stem
+
+    def _count_chunk(self, lines):
+        chunk = {kind: Counter() for kind in KINDS}
+        for line in lines:
+            words = nlp_utils.preprocess_text(line)
+            words = [w for w in words if w]
+            if not words:
+                continue
+            self.lines += 1
+            chunk["words"].update(words)
+            chunk["word_bigrams"].update(" ".join(p) for p in zip(words, words[1:]))
+            aksharas = nlp_utils.analyze_morphology.uncached(line)["aksharas"]
+            chunk["aksharas"].update(aksharas)
+            chunk["akshara_bigrams"].update("".join(p) for p in zip(aksharas, aksharas[1:]))
+            chunk["akshara_trigrams"].update("".join(p) for p in zip(aksharas, aksharas[1:], aksharas[2:]))
+        # Stem each distinct word once per chunk instead of once per occurrence
+        for word, count in chunk["words"].items():
+            chunk["stems"][self._stem(word)] += count
+        for kind, counts in chunk.items():
+            self.counters[kind].update(counts)
+
+    def consume(self, lines, chunk_size=5000):
+        """Streams an iterable of lines; only one chunk is held at a time."""
+        buf = []
+        for line in lines:
+            buf.append(line)
+            if len(buf) >= chunk_size:
+                self._count_chunk(buf)
+                buf = []
+        if buf:
+            self._count_chunk(buf)
+        return self
+
+    def update(self, text):
+        return self.consume(text.splitlines())
+
+    def consume_file(self, filepath, encoding="utf-8", chunk_size=5000):
+        with open(filepath, encoding=encoding, errors="replace") as f:
+            return self.consume(f, chunk_size)
+
+    def consume_stream(self, binary_stream, encoding="utf-8", chunk_size=5000):
+        """For file-like byte streams such as Streamlit uploads."""
+        return self.consume(io.TextIOWrapper(binary_stream, encoding=encoding, errors="replace"), chunk_size)
+
+    def merge(self, other):
+        for kind in KINDS:
+            self.counters[kind].merge(other.counters[kind])
+        self.lines += other.lines
+        return self
+
+    def top_k(self, kind="words", k=20):
+        return self.counters[kind].most_common(k)
+
+    def top_k_frame(self, kind="words", k=20):
+        import pandas as pd
+        counter = self.counters[kind]
+        rows = self.top_k(kind, k)
+        df = pd.DataFrame(rows, columns=["Item", "Count"])
+        df.index = pd.RangeIndex(1, len(df) + 1, name="Rank")
+        df["Frequency"] = df["Count"] / counter.total if counter.total else 0.0
+        df["Exact"] = [item in counter.exact for item in df["Item"]]
+        return df
+
+    def zipf_plot(self, kinds=("words", "aksharas"), ax=None, max_points=100_000):
+        """Log-log rank/frequency plot. Returns the matplotlib Figure."""
+        import matplotlib.pyplot as plt
+        if ax is None:
+            fig, ax = plt.subplots(figsize=(6, 4))
+        else:
+            fig = ax.figure
+        for kind in kinds:
+            counts = np.array([c for _, c in self.counters[kind].most_common(max_points)], dtype=float)
+            if counts.size:
+                ranks = np.arange(1, counts.size + 1)
+                ax.loglog(ranks, counts, marker=".", linestyle="none", markersize=3, label=kind)
+        ax.set_xlabel("Rank")
+        ax.set_ylabel("Frequency")
+        ax.set_title("Zipf Plot")
+        ax.grid(True, which="both", linestyle="--", alpha=0.4)
+        ax.legend()
+        return fig
+
+    def summary(self):
+        out = {
+            kind: {"total": c.total, "distinct_tracked": len(c), "approximate": c.saturated}
+            for kind, c in self.counters.items()
+        }
+        out["lines"] = self.lines
+        return out
+
+    def to_dict(self):
+        return {"version": FORMAT_VERSION, "lines": self.lines,
+                "counters": {kind: c.to_dict() for kind, c in self.counters.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported corpus stats version: {data.get('version')}")
+        stats = cls()
+        stats.lines = data["lines"]
+        stats.counters = {kind: BoundedCounter.from_dict(c) for kind, c in data["counters"].items()}
+        return stats
+
+    def save(self, filepath):
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, filepath):
+        with open(filepath, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Stream corpus statistics and merge partial results.")
+    parser.add_argument("inputs", nargs="*", help="Text files to count.")
+    parser.add_argument("--merge", nargs="*", default=[], help="Saved stats JSON files to merge in.")
+    parser.add_argument("--output", help="Where to save the combined stats JSON.")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    stats = CorpusStats()
+    for path in args.inputs:
+        stats.consume_file(path)
+    for path in args.merge:
+        stats.merge(CorpusStats.load(path))
+    if args.output:
+        stats.save(args.output)
+    for kind in KINDS:
+        print(f"\n== {kind} ==")
+        for item, count in stats.top_k(kind, args.top):
+            print(f"{count:>10}  {item}")
@@ -0,0 +1,291 @@
+"""
+Memory-mapped, line-indexed access to large UTF-8 corpora.
+
+A CorpusStore maps the corpus file read-only and keeps a persisted line
+index next to it (`<file>.lineidx`): the byte start and end of every kept
+line, as uint32 when the file is under 4 GB and uint64 otherwise. The index
+is built with one vectorized newline scan and rebuilt automatically when the
+file's size or mtime changes, so opening a multi-GB corpus after the first
+time costs one small read plus an mmap.
+
+    store = CorpusStore("vachanas.txt", comment="#")
+    store[12345]                       # O(1) line access
+    store.sample(5)                    # uniform, without replacement
+    store.stratified_sample(10)        # spread evenly over the file
+    nlp_utils.markov_gen.train(store.iter_lines())
+
+Raw access (raw(), iter_raw(), iter_byte_range()) yields memoryviews into the
+mapping, so nothing is copied until a line is decoded.
+
+    python corpus_store.py index big.txt
+    python corpus_store.py sample big.txt -k 5 --stratified
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+
+from file_utils import atomic_write
+
+MAGIC = b"KNLIDX\0\0"
+FORMAT_VERSION = 1
+# magic, version, offset width (4/8), comment byte (0 = none), skip_blank,
+# file size, file mtime_ns, line count
+HEADER = struct.Struct("<8sIBBBxQQQ")
+INDEX_SUFFIX = ".lineidx"
+SCAN_CHUNK = 64 << 20
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WISDOM_FILE = os.path.join(BASE_DIR, "corpora", "wisdom_quotes.tsv")
+
+# --- Index ---
+
+def scan_lines(buf, comment=None, skip_blank=True, chunk_size=SCAN_CHUNK):
+    """
+    (starts, ends) byte offsets of the lines in `buf`, ends excluding the
+    newline (and a trailing \\r). Lines starting with `comment` and, with
+    skip_blank, empty lines are left out.
+    """
+    size = len(buf)
+    if not size:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    view = np.frombuffer(buf, dtype=np.uint8)
+    # Newlines chunk by chunk, so the temporary mask stays bounded
+    newlines = [np.flatnonzero(view[lo:lo + chunk_size] == 0x0A) + lo for lo in range(0, size, chunk_size)]
+    newlines = np.concatenate(newlines)
+    ends = newlines if len(newlines) and newlines[-1] == size - 1 else np.append(newlines, size)
+    starts = np.concatenate(([0], newlines + 1))[:len(ends)]
+
+    has_cr = ends > starts
+    has_cr[has_cr] = view[ends[has_cr] - 1] == 0x0D
+    ends = ends - has_cr
+
+    keep = np.ones(len(starts), dtype=bool)
+    if skip_blank:
+        keep &= ends > starts
+    if comment is not None:
+        nonempty = np.flatnonzero(ends > starts)
+        keep[nonempty[view[starts[nonempty]] == ord(comment)]] = False
+    return starts[keep].astype(np.int64), ends[keep].astype(np.int64)
+
+def _file_signature(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+def write_index(index_path, starts, ends, signature, comment=None, skip_blank=True):
+    """Writes a line index atomically."""
+    size, mtime_ns = signature
+    width = 4 if size < 2**32 else 8
+    dtype = "<u4" if width == 4 else "<u8"
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, width, ord(comment) if comment else 0,
+                         int(skip_blank), size, mtime_ns, len(starts))
+    with atomic_write(index_path, prefix=".lineidx-") as f:
+        f.write(header)
+        f.write(starts.astype(dtype).tobytes())
+        f.write(ends.astype(dtype).tobytes())
+
+def read_index(index_path, signature, comment=None, skip_blank=True):
+    """(starts, ends) from a line index, or None if it is missing or stale."""
+    try:
+        with open(index_path, "rb") as f:
+            raw = f.read(HEADER.size)
+            if len(raw) < HEADER.size:
+                return None
+            magic, version, width, cbyte, blank, size, mtime_ns, n = HEADER.unpack(raw)
+            if (magic, version) != (MAGIC, FORMAT_VERSION):
+                return None
+            if (size, mtime_ns) != tuple(signature) or cbyte != (ord(comment) if comment else 0) or blank != int(skip_blank):
+                return None
+            dtype = "<u4" if width == 4 else "<u8"
+            offsets = np.fromfile(f, dtype=dtype, count=2 * n)
+    except OSError:
+        return None
+    if len(offsets) != 2 * n:
+        return None
+    return offsets[:n], offsets[n:]
+
+# --- Store ---
+
+class CorpusStore:
+    """
+    Read-only, line-addressable view of a UTF-8 text file. `comment` (a
+    single ASCII character such as "#") drops comment lines; blank lines are
+    dropped unless skip_blank=False. If the index can't be written next to
+    the file (read-only location), it is kept in memory only.
+    """
+
+    def __init__(self, path, comment=None, skip_blank=True, index_path=None):
+        if comment is not None and (len(comment) != 1 or ord(comment) > 127):
+            raise ValueError("comment must be a single ASCII character")
+        self.path = path
+        self.index_path = index_path or path + INDEX_SUFFIX
+        self.comment = comment
+        self.skip_blank = skip_blank
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.size = size
+
+        signature = _file_signature(path)
+        offsets = read_index(self.index_path, signature, comment, skip_blank)
+        self.index_rebuilt = offsets is None
+        if offsets is None:
+            offsets = scan_lines(self._buf, comment, skip_blank)
+            try:
+                write_index(self.index_path, *offsets, signature, comment, skip_blank)
+            except OSError:
+                pass
+        self.starts, self.ends = offsets
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        # Raises BufferError while memoryviews from raw()/iter_raw() are alive
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+    def raw(self, i):
+        """Line i as a memoryview into the mapping (no copy)."""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return memoryview(self._buf)[int(self.starts[i]):int(self.ends[i])]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        return str(self.raw(i), "utf-8", "replace")
+
+    def __iter__(self):
+        return self.iter_lines()
+
+    def iter_raw(self, start=0, stop=None):
+        """memoryviews of lines start..stop-1."""
+        mv = memoryview(self._buf)
+        stop = len(self) if stop is None else min(stop, len(self))
+        for a, b in zip(self.starts[start:stop].tolist(), self.ends[start:stop].tolist()):
+            yield mv[a:b]
+
+    def iter_lines(self, start=0, stop=None):
+        """Decoded lines start..stop-1."""
+        for line in self.iter_raw(start, stop):
+            yield str(line, "utf-8", "replace")
+
+    def line_range(self, lo, hi):
+        """(first, stop) line numbers of the lines that start in bytes [lo, hi)."""
+        return int(np.searchsorted(self.starts, lo)), int(np.searchsorted(self.starts, hi))
+
+    def iter_byte_range(self, lo, hi):
+        """memoryviews of the lines starting in bytes [lo, hi); disjoint ranges never share a line."""
+        return self.iter_raw(*self.line_range(lo, hi))
+
+    def byte_ranges(self, n):
+        """Splits the file into n contiguous byte ranges (e.g. one per worker)."""
+        cuts = np.linspace(0, self.size, n + 1).astype(np.int64)
+        return list(zip(cuts[:-1].tolist(), cuts[1:].tolist()))
+
+    def _pick(self, ids):
+        return [self[int(i)] for i in ids]
+
+    def sample(self, k, replace=False, rng=None):
+        """k lines drawn uniformly (without replacement unless replace=True)."""
+        rng = np.random.default_rng(rng)
+        if not len(self):
+            return []
+        if not replace:
+            k = min(k, len(self))
+        return self._pick(rng.choice(len(self), size=k, replace=replace))
+
+    def stratified_sample(self, k, strata=None, n_strata=None, allocation="proportional", rng=None):
+        """
+        k lines sampled within strata, without replacement.
+
+        strata is either None, to cut the file into `n_strata` (default k)
+        equal contiguous blocks of lines, so the sample covers the whole
+        file, or a per-line label array (len(store) long). allocation is
+        "proportional" (by stratum size, largest remainder) or "equal".
+        """
+        rng = np.random.default_rng(rng)
+        n = len(self)
+        k = min(k, n)
+        if not k:
+            return []
+        if strata is None:
+            n_strata = min(n_strata or k, n)
+            labels = (np.arange(n) * n_strata) // n
+        else:
+            labels = np.unique(np.asarray(strata), return_inverse=True)[1].ravel()
+            if len(labels) != n:
+                raise ValueError(f"strata has {len(labels)} labels for {n} lines")
+        sizes = np.bincount(labels)
+
+        if allocation == "proportional":
+            quota = k * sizes / n
+        elif allocation == "equal":
+            quota = np.full(len(sizes), k / len(sizes))
+        else:
+            raise ValueError(f"unknown allocation {allocation!r}")
+        take = np.minimum(np.floor(quota).astype(np.int64), sizes)
+        # Hand out what's left by largest remainder among strata with room
+        while take.sum() < k:
+            room = take < sizes
+            gap = np.where(room, quota - take, -np.inf)
+            take[np.argmax(gap)] += 1
+
+        order = np.argsort(labels, kind="stable")
+        bounds = np.concatenate(([0], np.cumsum(sizes)))
+        ids = [rng.choice(order[bounds[s]:bounds[s + 1]], size=t, replace=False)
+               for s, t in enumerate(take) if t]
+        return self._pick(np.sort(np.concatenate(ids)))
+
+    def __repr__(self):
+        return f"CorpusStore({self.path!r}, lines={len(self)}, bytes={self.size})"
+
+# --- Wisdom quotes ---
+
+def wisdom_quotes(path=WISDOM_FILE):
+    """CorpusStore over the `text<TAB>meaning<TAB>author` quotes file."""
+    return CorpusStore(path, comment="#")
+
+def parse_quote(line):
+    text, meaning, author = line.split("\t")
+    return {"text": text, "meaning": meaning, "author": author}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Line-indexed corpus files.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in [("index", "Build (or refresh) the line index."),
+                            ("sample", "Print random lines.")]:
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("file")
+        cmd.add_argument("--comment", help="Skip lines starting with this character.")
+    sample = sub.choices["sample"]
+    sample.add_argument("-k", type=int, default=5)
+    sample.add_argument("--stratified", action="store_true", help="Spread the sample evenly over the file.")
+    sample.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    with CorpusStore(args.file, comment=args.comment) as store:
+        if args.command == "index":
+            state = "built" if store.index_rebuilt else "up to date"
+            print(f"{store.index_path}: {len(store)} lines, {store.size} bytes ({state})")
+        else:
+            pick = store.stratified_sample if args.stratified else store.sample
+            for line in pick(args.k, rng=args.seed):
+                print(line)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
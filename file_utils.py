@@ -0,0 +1,39 @@
+"""
+Atomic file publishing for the generated artifacts (lexicon bundle, line
+indexes, retrieval segments, completion index).
+
+    with atomic_write(path, prefix=".completions-") as f:
+        f.write(payload)
+
+The data goes to a temp file next to `path` that is renamed over it only
+once complete, so readers (and mmaps) never see a half-written file. The
+temp file is created the way open() creates files -- mode 0o666 minus the
+process umask -- rather than tempfile.mkstemp's owner-only 0600, so workers
+running as other users can read what gets published.
+"""
+
+import os
+import secrets
+from contextlib import contextmanager
+
+def _create_temp(folder, prefix):
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    while True:
+        tmp = os.path.join(folder, f"{prefix}{secrets.token_hex(6)}")
+        try:
+            return os.open(tmp, flags, 0o666), tmp
+        except FileExistsError:
+            continue
+
+@contextmanager
+def atomic_write(path, mode="wb", encoding=None, prefix=".tmp-"):
+    """Yields a file object; on success it atomically replaces `path`, on error it is removed."""
+    fd, tmp = _create_temp(os.path.dirname(os.path.abspath(path)), prefix)
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
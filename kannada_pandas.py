@@ -0,0 +1,151 @@
+"""
+Registers a `.kn` accessor on pandas Series for column-wise Kannada NLP.
+
+    import kannada_pandas  # noqa: F401  (registers the accessor)
+    df['stem'] = df['word'].kn.stem()
+    df[['label', 'score']] = df['review'].kn.sentiment()
+
+Every operation factorizes the column so each distinct value is computed
+once and mapped back, walks the column in row chunks so intermediate
+results stay bounded, and can fan the distinct values out to a process
+pool (n_jobs > 1) for big frames. Missing values stay missing.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import nlp_utils
+from transliterate import transliterate
+
+DEFAULT_CHUNK_SIZE = 100_000
+CATEGORIES = ["Sports", "Politics", "Cinema", "Technology", "General / Unclassified"]
+SENTIMENT_LABELS = ["Positive 😊", "Negative 😞", "Neutral 😐"]
+STATS_COLUMNS = ["Swaras", "Vyanjanas", "Yogavahakas", "Ottaksharas", "Matras"]
+
+# Columns are deduplicated here already, so the memoized nlp_utils functions
+# are called through .uncached: a bulk pass would only flush the interactive
+# caches. (Module-level wrappers, so they pickle for the process pool.)
+
+def _meter_string(text):
+    return "".join(nlp_utils.get_chandassu_meter.uncached(text))
+
+def _phonetic_hash(text):
+    return nlp_utils.kannada_phonetic_hash.uncached(text)
+
+def _classify(text):
+    return nlp_utils.classify_text.uncached(text)
+
+def _sentiment(text):
+    return nlp_utils.analyze_sentiment.uncached(text)
+
+def _tokenize(text):
+    return nlp_utils.preprocess_text(text)
+
+def _tokenize_no_stopwords(text):
+    return nlp_utils.preprocess_text(text, remove_stopwords=True)
+
+def _stats_tuple(text):
+    stats = nlp_utils.morphology_stats_vectorized(text)
+    return tuple(stats[c] for c in STATS_COLUMNS)
+
+@pd.api.extensions.register_series_accessor("kn")
+class KannadaAccessor:
+    def __init__(self, series):
+        self._obj = series
+
+    # --- core ---
+
+    def _map_unique(self, func, chunk_size=None, n_jobs=1):
+        """
+        Applies `func` once per distinct non-null value, chunk by chunk.
+        Returns (object ndarray of results aligned to the Series, NA mask).
+        """
+        chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+        values = self._obj.to_numpy(dtype=object)
+        out = np.empty(len(values), dtype=object)
+        missing = np.zeros(len(values), dtype=bool)
+        memo = {}  # value -> result, shared across chunks while it stays small
+        pool = ProcessPoolExecutor(max_workers=n_jobs) if n_jobs and n_jobs > 1 else None
+        try:
+            for lo in range(0, len(values), chunk_size):
+                chunk = values[lo:lo + chunk_size]
+                codes, uniques = pd.factorize(chunk, use_na_sentinel=True)
+                todo = [u for u in uniques if u not in memo]
+                inputs = [u if isinstance(u, str) else str(u) for u in todo]
+                if pool is not None and len(inputs) > 1:
+                    per_worker = max(1, len(inputs) // (n_jobs * 4))
+                    results = list(pool.map(func, inputs, chunksize=per_worker))
+                else:
+                    results = [func(u) for u in inputs]
+                fresh = dict(zip(todo, results))
+                lookup = np.empty(len(uniques), dtype=object)
+                for i, u in enumerate(uniques):
+                    # Element-wise so list/tuple results aren't broadcast by NumPy
+                    lookup[i] = memo[u] if u in memo else fresh[u]
+                if len(memo) + len(fresh) <= chunk_size:
+                    memo.update(fresh)
+                na = codes < 0
+                out[lo:lo + len(chunk)] = lookup[np.where(na, 0, codes)] if len(uniques) else None
+                missing[lo:lo + len(chunk)] = na
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        out[missing] = None
+        return out, missing
+
+    def _string_result(self, func, **kwargs):
+        out, _ = self._map_unique(func, **kwargs)
+        return pd.Series(out, index=self._obj.index, name=self._obj.name, dtype="string")
+
+    def _list_result(self, func, **kwargs):
+        out, _ = self._map_unique(func, **kwargs)
+        return pd.Series(out, index=self._obj.index, name=self._obj.name, dtype=object)
+
+    # --- operations ---
+
+    def normalize(self, chunk_size=None, n_jobs=1):
+        return self._string_result(nlp_utils.normalize_kannada, chunk_size=chunk_size, n_jobs=n_jobs)
+
+    def tokenize(self, remove_stopwords=False, chunk_size=None, n_jobs=1):
+        func = _tokenize_no_stopwords if remove_stopwords else _tokenize
+        return self._list_result(func, chunk_size=chunk_size, n_jobs=n_jobs)
+
+    def stem(self, chunk_size=None, n_jobs=1):
+        return self._string_result(nlp_utils.simple_kannada_stemmer, chunk_size=chunk_size, n_jobs=n_jobs)
+
+    def phonetic_hash(self, chunk_size=None, n_jobs=1):
+        return self._string_result(_phonetic_hash, chunk_size=chunk_size, n_jobs=n_jobs)
+
+    def simplify(self, chunk_size=None, n_jobs=1):
+        return self._string_result(nlp_utils.simplify_kannada, chunk_size=chunk_size, n_jobs=n_jobs)
+
+    def transliterate(self, chunk_size=None, n_jobs=1):
+        return self._string_result(transliterate, chunk_size=chunk_size, n_jobs=n_jobs)
+
+    def meter(self, chunk_size=None, n_jobs=1):
+        """Chandassu pattern per row as a string such as 'U--U'."""
+        return self._string_result(_meter_string, chunk_size=chunk_size, n_jobs=n_jobs)
+
+    def classify(self, chunk_size=None, n_jobs=1):
+        out, _ = self._map_unique(_classify, chunk_size=chunk_size, n_jobs=n_jobs)
+        return pd.Series(pd.Categorical(out, categories=CATEGORIES), index=self._obj.index, name=self._obj.name)
+
+    def sentiment(self, chunk_size=None, n_jobs=1):
+        """DataFrame with a categorical 'label' and a nullable-int 'score' column."""
+        out, missing = self._map_unique(_sentiment, chunk_size=chunk_size, n_jobs=n_jobs)
+        labels = [None if m else r[0] for r, m in zip(out, missing)]
+        scores = [pd.NA if m else r[1] for r, m in zip(out, missing)]
+        return pd.DataFrame({
+            "label": pd.Categorical(labels, categories=SENTIMENT_LABELS),
+            "score": pd.array(scores, dtype="Int64"),
+        }, index=self._obj.index)
+
+    def morphology_stats(self, chunk_size=None, n_jobs=1):
+        """Swara/Vyanjana/... counts per row as nullable-int columns."""
+        out, missing = self._map_unique(_stats_tuple, chunk_size=chunk_size, n_jobs=n_jobs)
+        data = {}
+        for i, col in enumerate(STATS_COLUMNS):
+            data[col] = pd.array([pd.NA if m else r[i] for r, m in zip(out, missing)], dtype="Int64")
+        return pd.DataFrame(data, index=self._obj.index)
@@ -0,0 +1,271 @@
+"""
+Streaming batch pipeline over nlp_utils, for JSONL or plain-text corpora.
+
+Reads records from files or stdin, runs a declared chain of stages on each
+and writes one JSON object per line. Input lines are grouped into batches
+that a process pool works on; at most --max-inflight batches are queued at a
+time (reading pauses until the oldest batch is written), and batches are
+written in input order, so output line i always belongs to input record i.
+
+    python kn_pipeline.py corpus.txt > out.jsonl
+    cat docs.jsonl | python kn_pipeline.py --stages normalize,tokenize,stem,classify --workers 8
+    python kn_pipeline.py scraped.txt --stages validate,repair,normalize,morphology
+    python kn_pipeline.py --list-stages
+
+Plain-text lines become {"text": line}; JSONL records keep all their fields,
+and stages read (and normalize/repair rewrite) --field in place (default
+"text"). A record that fails gets an
+"error" field instead of stopping the run. Throughput goes to stderr.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import kn_validate
+import nlp_utils
+import sandhi
+
+DEFAULT_STAGES = ["normalize", "tokenize", "stem", "phonetic", "classify", "sentiment", "morphology"]
+
+# --- Stages ---
+# Each stage reads record[field] (and earlier stages' fields) and adds its own.
+# Whole-record analyses bypass the memo caches (records don't repeat); the
+# per-word ones keep them.
+
+def _tokens(record, field="text"):
+    if "tokens" not in record:
+        _tokenize(record, field)
+    return record["tokens"]
+
+def _validate(record, field="text"):
+    record["violations"] = [{"offset": v.offset, "kind": v.kind} for v in kn_validate.validate(record[field])]
+
+def _repair(record, field="text"):
+    record[field] = kn_validate.repair(record[field])[0]
+
+def _normalize(record, field="text"):
+    record[field] = nlp_utils.normalize_kannada(record[field])
+
+def _tokenize(record, field="text"):
+    record["tokens"] = [t for t in nlp_utils.preprocess_text(record[field]) if t]
+
+def _stem(record, field="text"):
+    record["stems"] = [nlp_utils.simple_kannada_stemmer(t) for t in _tokens(record, field)]
+
+def _phonetic(record, field="text"):
+    record["phonetic"] = [nlp_utils.kannada_phonetic_hash(t) for t in _tokens(record, field)]
+
+def _classify(record, field="text"):
+    record["topic"] = nlp_utils.classify_text.uncached(record[field])
+
+def _sentiment(record, field="text"):
+    label, score = nlp_utils.analyze_sentiment.uncached(record[field])
+    record["sentiment"] = {"label": label, "score": score}
+
+def _morphology(record, field="text"):
+    result = nlp_utils.analyze_morphology.uncached(record[field])
+    record["morphology"] = {"aksharas": result["aksharas"], "stats": result["stats"]}
+
+def _sandhi(record, field="text"):
+    record["sandhi"] = [list(sandhi.split_word(t)) for t in _tokens(record, field)]
+
+def _chandassu(record, field="text"):
+    record["meter"] = nlp_utils.get_chandassu_meter.uncached(record[field])
+
+STAGES = {
+    "validate": _validate,
+    "repair": _repair,
+    "normalize": _normalize,
+    "tokenize": _tokenize,
+    "stem": _stem,
+    "phonetic": _phonetic,
+    "classify": _classify,
+    "sentiment": _sentiment,
+    "morphology": _morphology,
+    "sandhi": _sandhi,
+    "chandassu": _chandassu,
+}
+
+def parse_stages(spec):
+    """"normalize,stem" -> ["normalize", "stem"], rejecting unknown names."""
+    names = [s.strip() for s in spec.split(",") if s.strip()] if isinstance(spec, str) else list(spec)
+    unknown = [s for s in names if s not in STAGES]
+    if unknown:
+        raise ValueError(f"unknown stage(s): {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+    return names
+
+# --- Workers ---
+
+def process_batch(lines, stages, input_format="text", field="text"):
+    """
+    Runs `stages` over a batch of raw input lines; returns (output JSONL
+    lines, error count). Parsing and serialization happen here so they run
+    in the worker.
+    """
+    funcs = [STAGES[s] for s in stages]
+    out = []
+    errors = 0
+    for line in lines:
+        try:
+            if input_format == "jsonl":
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("JSONL records must be objects")
+                if field not in record:
+                    raise KeyError(f"record has no {field!r} field")
+                key = field
+            else:
+                record, key = {"text": line}, "text"
+            for func in funcs:
+                func(record, key)
+        except Exception as e:
+            record = {"error": f"{type(e).__name__}: {e}", "input": line}
+            errors += 1
+        out.append(json.dumps(record, ensure_ascii=False))
+    return out, errors
+
+# --- Driver ---
+
+def read_lines(paths):
+    """Non-empty input lines (without the newline) from paths; "-" is stdin."""
+    for path in paths or ["-"]:
+        f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            for line in f:
+                line = line.rstrip("\r\n")
+                if line.strip():
+                    yield line
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+def batched(lines, batch_size):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class Throughput:
+    """Records/bytes counters with a periodic stderr progress line."""
+
+    def __init__(self, every=5.0, stream=None):
+        self.every = every
+        self.stream = stream
+        self.start = self._last = time.perf_counter()
+        self.records = self.errors = self.bytes_in = 0
+
+    def add(self, batch, errors=0):
+        self.records += len(batch)
+        self.bytes_in += sum(len(line.encode("utf-8")) + 1 for line in batch)
+        self.errors += errors
+        now = time.perf_counter()
+        if self.stream and self.every and now - self._last >= self.every:
+            self._last = now
+            r = self.report()
+            print(f"[kn_pipeline] {r['records']} records, {r['records_per_sec']:.0f} rec/s, "
+                  f"{r['mb_per_sec']:.2f} MB/s", file=self.stream, flush=True)
+
+    def report(self):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return {
+            "records": self.records,
+            "errors": self.errors,
+            "elapsed_sec": round(elapsed, 3),
+            "records_per_sec": self.records / elapsed,
+            "mb_per_sec": self.bytes_in / elapsed / 1e6,
+        }
+
+def ordered_map(func, jobs, args=(), workers=None, max_inflight=None):
+    """
+    Yields (job, func(job, *args)) for each job, in input order. workers=0
+    runs in-process; otherwise a process pool (default: CPU count) works on
+    at most max_inflight jobs (default: 2 x workers), and reading `jobs`
+    pauses until the oldest result has been taken.
+    """
+    if workers == 0:
+        for job in jobs:
+            yield job, func(job, *args)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    max_inflight = max_inflight or 2 * workers
+    pending = deque()  # (job, future) in input order
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for job in jobs:
+            if len(pending) >= max_inflight:
+                # Backpressure: hand back the oldest job before reading more
+                done, future = pending.popleft()
+                yield done, future.result()
+            pending.append((job, pool.submit(func, job, *args)))
+        while pending:
+            done, future = pending.popleft()
+            yield done, future.result()
+
+def run_pipeline(lines, out, stages=DEFAULT_STAGES, input_format="text", field="text",
+                 workers=None, batch_size=256, max_inflight=None, throughput=None):
+    """
+    Streams `lines` through the stages into `out` (a text file). workers=0
+    runs in-process. Returns the throughput report.
+    """
+    stages = parse_stages(stages)
+    throughput = throughput or Throughput()
+    results = ordered_map(process_batch, batched(lines, batch_size), (stages, input_format, field),
+                          workers, max_inflight)
+    for batch, (result, errors) in results:
+        out.write("\n".join(result) + "\n")
+        throughput.add(batch, errors)
+    return throughput.report()
+
+def _detect_format(paths, fmt):
+    if fmt != "auto":
+        return fmt
+    return "jsonl" if paths and all(p.endswith((".jsonl", ".ndjson")) for p in paths) else "text"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run nlp_utils stages over JSONL / text records.")
+    parser.add_argument("inputs", nargs="*", help="Input files (default: stdin; '-' also means stdin).")
+    parser.add_argument("-o", "--output", help="Output JSONL file (default: stdout).")
+    parser.add_argument("--stages", default=",".join(DEFAULT_STAGES),
+                        help="Comma-separated stage chain (default: %(default)s).")
+    parser.add_argument("--format", choices=["auto", "jsonl", "text"], default="auto",
+                        help="Input format; auto = jsonl for .jsonl/.ndjson files, else text.")
+    parser.add_argument("--field", default="text", help="JSONL field holding the text.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (0 = in-process; default: CPU count).")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--max-inflight", type=int, default=None, help="Batches queued at once (default: 2 x workers).")
+    parser.add_argument("--progress", type=float, default=5.0, help="Seconds between progress lines (0 = off).")
+    parser.add_argument("--list-stages", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.list_stages:
+        print("\n".join(STAGES))
+        return 0
+    try:
+        stages = parse_stages(args.stages)
+    except ValueError as e:
+        parser.error(str(e))
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        report = run_pipeline(
+            read_lines(args.inputs), out, stages, _detect_format(args.inputs, args.format), args.field,
+            workers=args.workers, batch_size=args.batch_size, max_inflight=args.max_inflight,
+            throughput=Throughput(args.progress, sys.stderr),
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps({"stages": stages, **report}), file=sys.stderr)
+    return 1 if report["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Unicode well-formedness scanner (and repairer) for Kannada text.
+
+Every character is mapped to a class (consonant, vowel sign, virama, ...)
+through a codepoint lookup table, and every adjacent pair of classes is
+looked up in a precomputed transition table that says whether the second
+may follow the first. Both lookups are NumPy gathers over the whole text, so
+a batch of lines is checked in a handful of array operations. Violations:
+
+    orphan_matra    vowel sign with no consonant before it    (ಅಿ, a word starting with ಾ)
+    double_matra    two vowel signs on one consonant          (ಕಾೆ)
+    orphan_virama   virama with no consonant before it        (ಕಿ್)
+    double_virama   repeated virama                           (ಕ್್)
+    orphan_sign     anusvara / visarga / nukta with no base   (ಂ at a word start)
+    stray_joiner    ZWJ / ZWNJ anywhere but virama + joiner + consonant
+    mixed_script    another Indic script's character inside a Kannada word (ಕನ್నಡ, Telugu న)
+    invalid_utf8    U+FFFD left behind by undecodable input bytes
+
+    validate("ಕನ್್ನಡ")   # [Violation(offset=3, kind='double_virama', char='್')]
+    repair("ಕನ್నಡ")      # ('ಕನ್ನಡ', [Violation(offset=3, kind='mixed_script', char='న')])
+
+repair() drops orphaned and doubled signs and stray joiners, and maps letters
+of the other ISCII-parallel blocks (Devanagari ... Malayalam) to the Kannada
+letter at the same position. Files are streamed in line batches over a
+process pool, in input order:
+
+    python kn_validate.py corpus.txt                       # violations as JSONL, exit 1 if any
+    python kn_validate.py big.txt --summary --workers 8    # counts per kind only
+    python kn_validate.py big.txt --repair -o clean.txt --report issues.jsonl
+"""
+
+import argparse
+import json
+import sys
+import unicodedata
+from collections import Counter, namedtuple
+
+import numpy as np
+
+import nlp_utils
+from nlp_utils import MARK, MATRA, SWARA, VIRAMA, VYANJANA, YOGAVAHA
+
+Violation = namedtuple("Violation", "offset kind char")
+
+KINDS = ("", "orphan_matra", "double_matra", "orphan_virama", "double_virama",
+         "orphan_sign", "stray_joiner", "mixed_script", "invalid_utf8")
+(_, ORPHAN_MATRA, DOUBLE_MATRA, ORPHAN_VIRAMA, DOUBLE_VIRAMA,
+ ORPHAN_SIGN, STRAY_JOINER, MIXED_SCRIPT, INVALID_UTF8) = range(len(KINDS))
+
+# Character classes
+_OTHER, _VOWEL, _CONSONANT, _SIGN, _VIRAMA, _YOGAVAHA, _NUKTA, _JOINER, _FOREIGN, _INVALID = range(10)
+_N_CLASSES = 10
+_KANNADA_LETTERS = (_VOWEL, _CONSONANT, _SIGN, _VIRAMA, _YOGAVAHA, _NUKTA)
+
+_KANNADA = nlp_utils.script_classes("Knda")
+
+def _class_of(flags):
+    if flags & VIRAMA:
+        return _VIRAMA
+    if flags & MATRA:
+        return _SIGN
+    if flags & SWARA:
+        return _VOWEL
+    if flags & VYANJANA:
+        return _CONSONANT
+    if flags & YOGAVAHA:
+        return _YOGAVAHA
+    if flags & MARK:
+        return _NUKTA
+    return _OTHER
+
+_LUT_END = max(max(map(ord, nlp_utils._CHAR_CLASSES)), 0xFFFD) + 1
+_CLASS_LUT = np.zeros(_LUT_END + 1, dtype=np.uint8)  # the last slot catches everything above
+for _char, _flags in nlp_utils._CHAR_CLASSES.items():
+    _CLASS_LUT[ord(_char)] = _class_of(_flags) if _char in _KANNADA else _FOREIGN
+_CLASS_LUT[[0x200C, 0x200D]] = _JOINER
+_CLASS_LUT[0xFFFD] = _INVALID
+
+def _build_transitions():
+    # kind[prev, cur]; at_prev marks violations reported at the first character of the pair
+    kind = np.zeros((_N_CLASSES, _N_CLASSES), dtype=np.uint8)
+    at_prev = np.zeros((_N_CLASSES, _N_CLASSES), dtype=bool)
+    for prev in range(_N_CLASSES):
+        if prev not in (_CONSONANT, _NUKTA):
+            kind[prev, _SIGN] = DOUBLE_MATRA if prev == _SIGN else ORPHAN_MATRA
+            kind[prev, _VIRAMA] = DOUBLE_VIRAMA if prev == _VIRAMA else ORPHAN_VIRAMA
+        if prev not in (_VOWEL, _CONSONANT, _SIGN, _NUKTA):
+            kind[prev, _YOGAVAHA] = ORPHAN_SIGN
+        if prev != _CONSONANT:
+            kind[prev, _NUKTA] = ORPHAN_SIGN
+        if prev != _VIRAMA:
+            kind[prev, _JOINER] = STRAY_JOINER
+    for cur in range(_N_CLASSES):
+        if cur != _CONSONANT:
+            kind[_JOINER, cur] = STRAY_JOINER
+            at_prev[_JOINER, cur] = True
+    for letter in _KANNADA_LETTERS:
+        kind[letter, _FOREIGN] = MIXED_SCRIPT
+        kind[_FOREIGN, letter] = MIXED_SCRIPT
+        at_prev[_FOREIGN, letter] = True
+    kind[:, _INVALID] = INVALID_UTF8
+    at_prev[:, _INVALID] = False
+    return kind.ravel(), at_prev.ravel()
+
+_TRANSITIONS, _AT_PREV = _build_transitions()
+
+def _is_composed_sign(text, o):
+    # Vowel signs ending at o that are one sign in decomposed form (ೆ + ೂ + ೕ = ೋ)
+    start = o
+    while start > 0 and _CLASS_LUT[min(ord(text[start - 1]), _LUT_END)] == _SIGN:
+        start -= 1
+    return len(unicodedata.normalize("NFC", text[start:o + 1])) == 1
+
+def scan(text):
+    """
+    (offsets, kind codes) of every violation in text as NumPy arrays, in
+    offset order; KINDS[code] is the kind's name.
+    """
+    codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    classes = np.zeros(len(codes) + 2, dtype=np.intp)  # _OTHER on both ends
+    classes[1:-1] = _CLASS_LUT[np.minimum(codes, _LUT_END)]
+    pairs = classes[:-1] * _N_CLASSES + classes[1:]
+    hits = np.flatnonzero(_TRANSITIONS[pairs])
+    if not hits.size:
+        return hits, hits.astype(np.uint8)
+    # Pair j is (text[j-1], text[j])
+    offsets = hits - _AT_PREV[pairs[hits]]
+    offsets, first = np.unique(offsets, return_index=True)  # a joiner can be hit from both sides
+    kinds = _TRANSITIONS[pairs[hits[first]]]
+    doubles = np.flatnonzero(kinds == DOUBLE_MATRA)
+    if doubles.size:
+        keep = np.ones(len(offsets), dtype=bool)
+        for i in doubles:
+            keep[i] = not _is_composed_sign(text, offsets[i])
+        offsets, kinds = offsets[keep], kinds[keep]
+    return offsets, kinds
+
+def validate(text):
+    """Every violation in text as a Violation(offset, kind, char)."""
+    offsets, kinds = scan(text)
+    return [Violation(int(o), KINDS[k], text[o]) for o, k in zip(offsets, kinds)]
+
+def is_valid(text):
+    return not scan(text)[0].size
+
+def _to_kannada(ch):
+    # Same position in the Kannada block (the ISCII-derived blocks share a layout)
+    cp = ord(ch)
+    if 0x0900 <= cp < 0x0D80:
+        mapped = chr(0x0C80 + (cp & 0x7F))
+        if mapped in _KANNADA:
+            return mapped
+    return None
+
+def _repair_once(text, offsets, kinds):
+    chars = list(text)
+    for o, k in zip(offsets.tolist(), kinds.tolist()):
+        if k == MIXED_SCRIPT:
+            # Map the whole foreign run the boundary belongs to
+            start = end = o
+            while start > 0 and _CLASS_LUT[min(ord(text[start - 1]), _LUT_END)] == _FOREIGN:
+                start -= 1
+            while end < len(text) and _CLASS_LUT[min(ord(text[end]), _LUT_END)] == _FOREIGN:
+                end += 1
+            for i in range(start, end):
+                chars[i] = _to_kannada(text[i]) or text[i]
+        elif k != INVALID_UTF8:
+            chars[o] = ""
+    return "".join(chars)
+
+def repair(text, max_passes=4):
+    """
+    (repaired text, violations found in the original). Dropping a mark can
+    expose another (ಕ್್ಿ), so the scan is repeated up to max_passes times.
+    U+FFFD and unmappable foreign characters are left in place.
+    """
+    offsets, kinds = scan(text)
+    found = [Violation(int(o), KINDS[k], text[o]) for o, k in zip(offsets, kinds)]
+    for _ in range(max_passes):
+        if not offsets.size:
+            break
+        fixed = _repair_once(text, offsets, kinds)
+        if fixed == text:
+            break
+        text = fixed
+        offsets, kinds = scan(text)
+    return text, found
+
+# --- Bulk / streaming ---
+
+def check_batch(lines, first_line=1, source=None, fix=False):
+    """
+    Scans a batch of lines as one text. Returns (violation records, repaired
+    lines or None, Counter of kinds, unrepaired count). Records are dicts
+    with source, 1-based line, offset (code points into the line), kind and
+    the character's codepoint.
+    """
+    joined = "\n".join(lines)
+    offsets, kinds = scan(joined)
+    counts = Counter(KINDS[k] for k in kinds.tolist())
+    records = []
+    repaired = list(lines) if fix else None
+    unrepaired = 0
+    if offsets.size:
+        starts = np.cumsum([0] + [len(line) + 1 for line in lines[:-1]])
+        rows = np.searchsorted(starts, offsets, side="right") - 1
+        for row, o, k in zip(rows.tolist(), offsets.tolist(), kinds.tolist()):
+            records.append({"source": source, "line": first_line + row, "offset": o - int(starts[row]),
+                            "kind": KINDS[k], "char": f"U+{ord(joined[o]):04X}"})
+        if fix:
+            for row in sorted(set(rows.tolist())):
+                repaired[row] = repair(lines[row])[0]
+                unrepaired += len(scan(repaired[row])[0])
+    return records, repaired, counts, unrepaired
+
+def iter_batches(paths, batch_size=4096):
+    """(source, first line number, lines) batches of every line, empty ones included."""
+    for path in paths or ["-"]:
+        f = sys.stdin if path == "-" else open(path, encoding="utf-8", errors="replace", newline="")
+        try:
+            batch, first = [], 1
+            for n, line in enumerate(f, 1):
+                batch.append(line.rstrip("\r\n"))
+                if len(batch) >= batch_size:
+                    yield path, first, batch
+                    batch, first = [], n + 1
+            if batch:
+                yield path, first, batch
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+def _check(job, fix):
+    source, first, lines = job
+    return check_batch(lines, first, source, fix)
+
+def run_validation(paths, report=None, output=None, fix=False, workers=None, batch_size=4096, max_inflight=None):
+    """
+    Streams paths through check_batch, writing violation records as JSONL to
+    `report` and (with fix) the repaired lines to `output`, in input order.
+    workers=0 runs in-process. Returns the summary dict.
+    """
+    from kn_pipeline import Throughput, ordered_map
+    throughput = Throughput(every=0)
+    totals = Counter()
+    unrepaired = 0
+
+    for job, (records, repaired, counts, missed) in ordered_map(
+            _check, iter_batches(paths, batch_size), (fix,), workers, max_inflight):
+        if report is not None and records:
+            report.write("\n".join(json.dumps(r, ensure_ascii=False) for r in records) + "\n")
+        if output is not None and repaired is not None:
+            output.write("\n".join(repaired) + "\n")
+        totals.update(counts)
+        unrepaired += missed
+        throughput.add(job[2])
+
+    perf = throughput.report()
+    summary = {"lines": perf["records"], "violations": sum(totals.values()), "by_kind": dict(totals.most_common()),
+               "elapsed_sec": perf["elapsed_sec"], "mb_per_sec": round(perf["mb_per_sec"], 2)}
+    if fix:
+        summary["unrepaired"] = unrepaired
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check (and repair) Kannada text for malformed Unicode sequences.")
+    parser.add_argument("inputs", nargs="*", help="Input files (default: stdin; '-' also means stdin).")
+    parser.add_argument("--repair", action="store_true", help="Write repaired text to --output (default: stdout).")
+    parser.add_argument("-o", "--output", help="Repaired text file (with --repair).")
+    parser.add_argument("--report", help="Violations JSONL file (default: stdout unless --repair).")
+    parser.add_argument("--summary", action="store_true", help="Only print the per-kind counts.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (0 = in-process; default: CPU count).")
+    parser.add_argument("--batch-size", type=int, default=4096, help="Lines per batch.")
+    args = parser.parse_args(argv)
+
+    files = []
+
+    def open_out(path):
+        f = open(path, "w", encoding="utf-8")
+        files.append(f)
+        return f
+
+    report = None
+    if args.report:
+        report = open_out(args.report)
+    elif not args.repair and not args.summary:
+        report = sys.stdout
+    output = (open_out(args.output) if args.output else sys.stdout) if args.repair else None
+    try:
+        summary = run_validation(args.inputs, report, output, args.repair, args.workers, args.batch_size)
+    finally:
+        for f in files:
+            f.close()
+    print(json.dumps(summary, ensure_ascii=False), file=sys.stdout if args.summary else sys.stderr)
+    remaining = summary["unrepaired"] if args.repair else summary["violations"]
+    return 1 if remaining else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
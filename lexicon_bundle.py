@@ -0,0 +1,345 @@
+"""
+Compiled lexical resources.
+
+The word lists nlp_utils uses (stopwords, topic keywords, sentiment words,
+simplification pairs, the EN->KN dictionary, stemmer suffixes, the Markov
+corpus, the sandhi splitter's base words) live as plain text under
+lexicons/, one file per table with a `# version: N` header. They are
+compiled into a single binary bundle that is memory-mapped read-only, so
+every worker process shares one copy through the page cache and opening it
+costs a few milliseconds regardless of size. The bundle is a cache, kept
+outside the source tree: under $KANNADA_CACHE_DIR (default
+$XDG_CACHE_HOME/kannada-nlp or ~/.cache/kannada-nlp), one file per source
+directory.
+
+Bundle layout (little-endian):
+    b"KNLEX\\0\\0\\0"  u32 format version  u32 directory length
+    directory        JSON: source digest + per-table rows/columns/offsets
+    column data      per column: u32 offsets[rows + 1] (8-byte aligned),
+                     then the UTF-8 strings back to back
+
+Keyed tables are stored sorted by the UTF-8 bytes of their first column, so
+lookups are a binary search over the mapped file; ordered tables keep the
+source order.
+
+    python lexicon_bundle.py build     # (re)compile the bundle
+    python lexicon_bundle.py info      # table sizes and versions
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping
+
+import numpy as np
+
+from file_utils import atomic_write
+
+MAGIC = b"KNLEX\0\0\0"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sII")
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lexicons")
+CACHE_ENV = "KANNADA_CACHE_DIR"
+
+# table name -> (source file, column count, keyed)
+TABLES = {
+    "stopwords": ("stopwords.txt", 1, True),
+    "topic_keywords": ("topic_keywords.tsv", 2, False),
+    "sentiment": ("sentiment.tsv", 2, True),
+    "simplify": ("simplify.tsv", 2, False),
+    "en_kn": ("en_kn.tsv", 2, True),
+    "stem_suffixes": ("stem_suffixes.txt", 1, False),
+    "vachana_corpus": ("vachana_corpus.txt", 1, False),
+    "sandhi_words": ("sandhi_words.tsv", 2, True),
+}
+
+def cache_dir():
+    """Where compiled bundles go: $KANNADA_CACHE_DIR, else the user cache directory."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.environ.get(CACHE_ENV) or os.path.join(base, "kannada-nlp")
+
+def bundle_path(source_dir=SOURCE_DIR):
+    """Cache file for the bundle compiled from source_dir (separate checkouts get separate files)."""
+    tag = hashlib.sha256(os.path.abspath(source_dir).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir(), f"lexicons-{tag}.bin")
+
+# --- Sources ---
+
+def read_source(path, n_cols):
+    """Returns (version, rows) from a lexicon source file."""
+    version = 0
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("#"):
+                key, _, value = line[1:].partition(":")
+                if key.strip() == "version":
+                    version = int(value)
+                continue
+            if not line.strip():
+                continue
+            cells = line.split("\t") if n_cols > 1 else [line]
+            if len(cells) != n_cols:
+                raise ValueError(f"{path}: expected {n_cols} column(s): {line!r}")
+            rows.append(tuple(cells))
+    return version, rows
+
+def source_stamps(source_dir=SOURCE_DIR):
+    """{source file: [size, mtime_ns]}: a cheap first check before source_digest()."""
+    stamps = {}
+    for filename, _, _ in TABLES.values():
+        st = os.stat(os.path.join(source_dir, filename))
+        stamps[filename] = [st.st_size, st.st_mtime_ns]
+    return stamps
+
+def source_digest(source_dir=SOURCE_DIR):
+    """SHA-256 over every source file, used to spot a stale bundle."""
+    h = hashlib.sha256(struct.pack("<I", FORMAT_VERSION))
+    for name, (filename, _, _) in sorted(TABLES.items()):
+        h.update(name.encode())
+        with open(os.path.join(source_dir, filename), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+# --- Compiler ---
+
+def _pad(out):
+    out.write(b"\0" * (-out.tell() % 8))
+
+def compile_bundle(source_dir=SOURCE_DIR):
+    """Compiles every table under source_dir into bundle bytes."""
+    tables = {}
+    for name, (filename, n_cols, keyed) in TABLES.items():
+        version, rows = read_source(os.path.join(source_dir, filename), n_cols)
+        encoded = [tuple(cell.encode("utf-8") for cell in row) for row in rows]
+        if keyed:
+            # Last definition of a duplicate key wins, like a dict literal
+            encoded = sorted(dict((row[0], row) for row in encoded).values())
+        tables[name] = (version, n_cols, keyed, encoded)
+
+    # Lay out the data first; the directory (which needs the offsets) goes in front
+    data = io.BytesIO()
+    directory = {"digest": source_digest(source_dir), "stamps": source_stamps(source_dir), "tables": {}}
+    for name, (version, n_cols, keyed, rows) in tables.items():
+        columns = []
+        for j in range(n_cols):
+            cells = [row[j] for row in rows]
+            offsets = np.zeros(len(cells) + 1, dtype="<u4")
+            np.cumsum([len(c) for c in cells], out=offsets[1:])
+            _pad(data)
+            offsets_pos = data.tell()
+            data.write(offsets.tobytes())
+            blob_pos = data.tell()
+            data.write(b"".join(cells))
+            columns.append([offsets_pos, blob_pos])
+        directory["tables"][name] = {
+            "version": version, "rows": len(rows), "keyed": keyed, "columns": columns,
+        }
+
+    dir_bytes = json.dumps(directory, sort_keys=True).encode("utf-8")
+    dir_bytes += b" " * (-(HEADER.size + len(dir_bytes)) % 8)
+    return HEADER.pack(MAGIC, FORMAT_VERSION, len(dir_bytes)) + dir_bytes + data.getvalue()
+
+def build_bundle(path=None, source_dir=SOURCE_DIR):
+    """Compiles the bundle and atomically replaces `path` (default: bundle_path()). Returns path."""
+    path = path or bundle_path(source_dir)
+    payload = compile_bundle(source_dir)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with atomic_write(path, prefix=".lexicons-") as f:
+        f.write(payload)
+    return path
+
+# --- Reader ---
+
+class StringTable:
+    """
+    Read-only view of one table. Rows are str (one column) or tuples of str;
+    nothing is decoded until it is read. Keyed tables support `key in table`
+    and get() via binary search on the first column.
+    """
+
+    def __init__(self, buf, name, meta, base):
+        self.name = name
+        self.version = meta["version"]
+        self.keyed = meta["keyed"]
+        self._buf = buf
+        self._rows = meta["rows"]
+        self._columns = []
+        for offsets_pos, blob_pos in meta["columns"]:
+            offsets = np.frombuffer(buf, dtype="<u4", count=self._rows + 1, offset=base + offsets_pos)
+            self._columns.append((offsets, base + blob_pos))
+
+    def __len__(self):
+        return self._rows
+
+    def _raw(self, i, j=0):
+        offsets, blob = self._columns[j]
+        return self._buf[blob + int(offsets[i]):blob + int(offsets[i + 1])]
+
+    def cell(self, i, j=0):
+        return bytes(self._raw(i, j)).decode("utf-8")
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(self._rows))]
+        if i < 0:
+            i += self._rows
+        if not 0 <= i < self._rows:
+            raise IndexError(i)
+        if len(self._columns) == 1:
+            return self.cell(i)
+        return tuple(self.cell(i, j) for j in range(len(self._columns)))
+
+    def __iter__(self):
+        for i in range(self._rows):
+            yield self[i]
+
+    def column(self, j=0):
+        """Decodes one whole column into a list (one slice of the mapped file)."""
+        offsets, blob = self._columns[j]
+        raw = bytes(self._buf[blob:blob + int(offsets[-1])])
+        return [raw[a:b].decode("utf-8") for a, b in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+    def lower_bound(self, key):
+        """First row of a keyed table whose key is >= `key` (by UTF-8 bytes); len(table) if none."""
+        if not self.keyed:
+            raise TypeError(f"table {self.name!r} is not keyed")
+        target = key.encode("utf-8")
+        lo, hi = 0, self._rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._raw(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, key):
+        """Row index of `key` in a keyed table, or -1."""
+        i = self.lower_bound(key)
+        return i if i < self._rows and self._raw(i) == key.encode("utf-8") else -1
+
+    def __contains__(self, key):
+        if self.keyed:
+            return self.find(key) >= 0
+        return any(row == key for row in self)
+
+    def get(self, key, default=None):
+        """Second-column value for `key` (the key itself for one-column tables)."""
+        i = self.find(key)
+        if i < 0:
+            return default
+        return self.cell(i, 1) if len(self._columns) > 1 else self.cell(i)
+
+    def mapping(self):
+        """dict-like view of a keyed two-column table."""
+        return TableMapping(self)
+
+    def __repr__(self):
+        return f"StringTable({self.name!r}, rows={self._rows}, version={self.version})"
+
+class TableMapping(Mapping):
+    """Read-only Mapping over a keyed table; lookups hit the mapped file."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def __getitem__(self, key):
+        i = self.table.find(key)
+        if i < 0:
+            raise KeyError(key)
+        return self.table.cell(i, 1)
+
+    def __iter__(self):
+        return iter(self.table.column(0))
+
+    def __len__(self):
+        return len(self.table)
+
+    def items(self):
+        return list(zip(self.table.column(0), self.table.column(1)))
+
+class LexiconBundle:
+    """A loaded bundle: `bundle["stopwords"]` -> StringTable."""
+
+    def __init__(self, buf, path=None):
+        magic, fmt, dir_len = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(f"not a lexicon bundle (format {FORMAT_VERSION}): {path}")
+        directory = json.loads(bytes(buf[HEADER.size:HEADER.size + dir_len]))
+        self.path = path
+        self.digest = directory["digest"]
+        self.stamps = directory.get("stamps")
+        base = HEADER.size + dir_len
+        self._tables = {name: StringTable(buf, name, meta, base) for name, meta in directory["tables"].items()}
+        self._buf = buf
+
+    @classmethod
+    def open(cls, path=None):
+        path = path or bundle_path()
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buf, path)
+
+    def __getitem__(self, name):
+        return self._tables[name]
+
+    def __contains__(self, name):
+        return name in self._tables
+
+    def tables(self):
+        return dict(self._tables)
+
+    def info(self):
+        return {name: {"rows": len(t), "version": t.version, "keyed": t.keyed} for name, t in self._tables.items()}
+
+def load_bundle(path=None, source_dir=SOURCE_DIR):
+    """
+    Maps the bundle at `path` (default: bundle_path(source_dir)), recompiling
+    it first when the sources under source_dir have changed (or it doesn't
+    exist yet). If the bundle can't be written (read-only cache directory),
+    the freshly compiled bytes are used in memory.
+    """
+    path = path or bundle_path(source_dir)
+    have_sources = os.path.isdir(source_dir)
+    if os.path.exists(path):
+        bundle = LexiconBundle.open(path)
+        # Unchanged sizes/mtimes mean unchanged sources; only hash when they differ
+        if not have_sources or bundle.stamps == source_stamps(source_dir):
+            return bundle
+        if bundle.digest == source_digest(source_dir):
+            try:
+                build_bundle(path, source_dir)  # same content, touched files: refresh the stamps
+            except OSError:
+                return bundle
+            return LexiconBundle.open(path)
+    try:
+        build_bundle(path, source_dir)
+    except OSError:
+        return LexiconBundle(compile_bundle(source_dir), None)
+    return LexiconBundle.open(path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile / inspect the lexicon bundle.")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("--bundle", help="Bundle file (default: one under the cache directory).")
+    parser.add_argument("--sources", default=SOURCE_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        path = build_bundle(args.bundle, args.sources)
+        print(f"Wrote {path} ({os.path.getsize(path)} bytes)")
+    bundle = load_bundle(args.bundle, args.sources)
+    for name, meta in bundle.info().items():
+        print(f"{name:<16} v{meta['version']:<3} {meta['rows']:>8} rows{'  (keyed)' if meta['keyed'] else ''}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Local load test: N concurrent Streamlit sessions of app.py in one process.
+
+Each simulated session is a streamlit.testing AppTest, so every session runs
+the real script with its own session state while sharing the process-wide
+@st.cache_resource resources, exactly as on a server. All N sessions stay
+alive together; their reruns are interleaved round-robin (AppTest drives one
+script run at a time per process). Sessions type into the morphology, meter
+and transliteration inputs for a few rounds; the report gives rerun latency,
+process RSS growth per session and the session-artifact totals from
+session_memory.
+
+    python load_test.py --sessions 8 --rounds 5
+    python load_test.py --sessions 16 --budget-mb 1     # watch evictions kick in
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(BASE_DIR, "app.py")
+
+def rss_mb():
+    """Current resident set size (peak RSS where /proc isn't available)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+def _widget(widgets, key=None, label=None):
+    for w in widgets:
+        if (key is not None and w.key == key) or (label is not None and w.label == label):
+            return w
+    raise KeyError(key or label)
+
+class SimulatedSession:
+    """One browser session driving app.py through AppTest."""
+
+    def __init__(self, lines, seed, timeout=120):
+        from streamlit.testing.v1 import AppTest
+        self.app = AppTest.from_file(APP_FILE, default_timeout=timeout)
+        self.rng = random.Random(seed)
+        self.lines = lines
+        self.latencies = []
+        self.text = ""
+
+    def _run(self, action=None):
+        start = time.perf_counter()
+        (action or self.app).run()
+        self.latencies.append(time.perf_counter() - start)
+        if self.app.exception:
+            raise RuntimeError(str(self.app.exception[0].message))
+
+    def start(self):
+        self._run()
+
+    def round(self):
+        # The text grows a line per round, like someone typing a long poem
+        self.text = (self.text + " " + self.rng.choice(self.lines)).strip()
+        app = self.app
+        _widget(app.text_area, key="morph_input").set_value(self.text)
+        self._run(_widget(app.button, key="btn_morph").click())
+        _widget(app.text_input, key="chand_input").set_value(self.text[-200:])
+        self._run(_widget(app.button, key="btn_chand").click())
+        self._run(_widget(app.text_input, label="Enter text:").set_value(self.rng.choice(["namaskara", "kannada naadu", "bengaluru"])))
+
+def run_load_test(sessions=4, rounds=3, budget_mb=None, seed=0, lines=None):
+    """Runs the simulation and returns the report dict."""
+    if budget_mb is not None:
+        os.environ["KANNADA_SESSION_BUDGET_MB"] = str(budget_mb)
+    os.chdir(BASE_DIR)  # app.py reads its data files relative to the working directory
+    import nlp_utils
+    import session_memory
+    lines = lines or list(nlp_utils.LEXICONS["vachana_corpus"])
+
+    rss_start = rss_mb()
+    warm = SimulatedSession(lines, seed)  # pays for the shared resources once
+    warm.start()
+    rss_warm = rss_mb()
+
+    pool_sessions = [SimulatedSession(lines, seed + 1 + i) for i in range(sessions)]
+    started = time.perf_counter()
+    for session in pool_sessions:
+        session.start()
+    for _ in range(rounds):
+        for session in pool_sessions:
+            session.round()
+    elapsed = time.perf_counter() - started
+    rss_end = rss_mb()
+
+    latencies = np.array([t for s in pool_sessions for t in s.latencies[1:]]) * 1000
+    memory = session_memory.process_report()
+    return {
+        "sessions": sessions,
+        "rounds": rounds,
+        "reruns": int(latencies.size),
+        "elapsed_sec": round(elapsed, 2),
+        "rerun_ms": {"p50": round(float(np.percentile(latencies, 50)), 1),
+                     "p95": round(float(np.percentile(latencies, 95)), 1)} if latencies.size else {},
+        "rss_mb": {"start": round(rss_start, 1), "after_first_session": round(rss_warm, 1), "end": round(rss_end, 1),
+                   "per_extra_session": round((rss_end - rss_warm) / max(sessions, 1), 2)},
+        "session_artifacts": {**memory, "budget_mb": session_memory.default_budget() / (1 << 20)},
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent Streamlit sessions of app.py.")
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=3, help="Edit/analyze rounds per session.")
+    parser.add_argument("--budget-mb", type=float, help="Per-session artifact budget (KANNADA_SESSION_BUDGET_MB).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    report = run_load_test(args.sessions, args.rounds, args.budget_mb, args.seed)
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
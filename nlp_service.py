@@ -0,0 +1,412 @@
+"""
+Standalone asyncio HTTP/JSON service around nlp_utils.
+
+Concurrent requests for the same operation are collected into micro-batches
+(up to --max-batch items or --max-wait-ms, whichever comes first) and each
+batch runs on a worker pool, so the event loop only ever parses HTTP and
+shuffles futures.
+
+    python nlp_service.py serve --port 8765 --workers 4
+    python nlp_service.py loadtest --port 8765 --concurrency 64 --requests 5000
+
+Endpoints:
+    POST /morphology | /chandassu | /transliterate | /sentiment
+         /classify | /stem | /phonetic_hash
+         body: {"text": "..."} or {"texts": ["...", ...]}
+    GET  /health
+    GET  /metrics
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import nlp_utils
+from perf_monitor import FunctionStats
+from transliterate import transliterate
+
+MAX_BODY_BYTES = 1 << 20
+
+# Request texts rarely repeat, so the text-level operations skip the memo
+# caches; per-word ones (stem, phonetic hash) keep them
+
+def _sentiment(text):
+    label, score = nlp_utils.analyze_sentiment.uncached(text)
+    return {"label": label, "score": score}
+
+def _morphology(text):
+    result = nlp_utils.analyze_morphology.uncached(text)
+    return {"aksharas": result["aksharas"], "stats": result["stats"]}
+
+def _chandassu(text):
+    meter = nlp_utils.get_chandassu_meter.uncached(text)
+    return {"meter": meter, "guru": meter.count("-"), "laghu": meter.count("U")}
+
+OPERATIONS = {
+    "morphology": _morphology,
+    "chandassu": _chandassu,
+    "transliterate": transliterate,
+    "sentiment": _sentiment,
+    "classify": nlp_utils.classify_text.uncached,
+    "stem": nlp_utils.simple_kannada_stemmer,
+    "phonetic_hash": nlp_utils.kannada_phonetic_hash,
+}
+
+def run_batch(op_name, texts):
+    """Runs one operation over a batch of texts. Executes inside a worker."""
+    func = OPERATIONS[op_name]
+    out = []
+    for text in texts:
+        try:
+            out.append((True, func(text)))
+        except Exception as e:
+            out.append((False, f"{type(e).__name__}: {e}"))
+    return out
+
+# --- Micro-batching ---
+
+class MicroBatcher:
+    """
+    Queues single items for one operation and flushes them to the pool as a
+    batch once max_batch items are waiting or max_wait seconds have passed
+    since the first one arrived.
+    """
+
+    def __init__(self, op_name, executor, max_batch=64, max_wait=0.005):
+        self.op_name = op_name
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.items = 0
+        self.inflight = 0
+        self._task = None
+        self._dispatches = set()  # strong refs so running dispatches aren't collected
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._collect())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, text):
+        fut = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, fut))
+        return await fut
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Don't await here: the next batch can start collecting while this one runs
+            task = loop.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch):
+        loop = asyncio.get_running_loop()
+        self.batches += 1
+        self.items += len(batch)
+        self.inflight += 1
+        try:
+            results = await loop.run_in_executor(self.executor, run_batch, self.op_name, [t for t, _ in batch])
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        finally:
+            self.inflight -= 1
+        for (_, fut), result in zip(batch, results):
+            if not fut.done():
+                fut.set_result(result)
+
+# --- HTTP ---
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class NLPService:
+    def __init__(self, workers=None, use_threads=False, max_batch=64, max_wait_ms=5.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.use_threads = use_threads
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = None
+        self.batchers = {}
+        self.stats = {name: FunctionStats(name) for name in OPERATIONS}
+        self.started = time.time()
+        self.connections = 0
+
+    async def start(self, host, port):
+        pool_cls = ThreadPoolExecutor if self.use_threads else ProcessPoolExecutor
+        self.executor = pool_cls(max_workers=self.workers)
+        for name in OPERATIONS:
+            batcher = MicroBatcher(name, self.executor, self.max_batch, self.max_wait)
+            batcher.start()
+            self.batchers[name] = batcher
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def close(self):
+        for batcher in self.batchers.values():
+            await batcher.stop()
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _handle_connection(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                try:
+                    status, payload = 200, await self._route(method, path, body)
+                except HttpError as e:
+                    status, payload = e.status, {"error": e.message}
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                keep_alive = headers.get("connection", "keep-alive").lower() != "close"
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HttpError as e:
+            self._write_response(writer, e.status, {"error": e.message}, False)
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+        headers = {}
+        while True:
+            h = await reader.readline()
+            if h in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = h.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        raw_length = headers.get("content-length", "0") or "0"
+        if not (raw_length.isascii() and raw_length.isdigit()):  # no signs, blanks or other digits
+            raise HttpError(400, "Invalid Content-Length")
+        length = int(raw_length) if len(raw_length) <= 18 else MAX_BODY_BYTES + 1
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "Body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    def _write_response(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'OK')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+
+    async def _route(self, method, path, body):
+        name = path.strip("/")
+        if name == "health":
+            return self.health()
+        if name == "metrics":
+            return self.metrics()
+        if name not in OPERATIONS:
+            raise HttpError(404, f"Unknown endpoint: {path}")
+        if method != "POST":
+            raise HttpError(405, "Use POST with a JSON body")
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            raise HttpError(400, "Body is not valid JSON")
+        if not isinstance(data, dict):
+            raise HttpError(400, "Body must be a JSON object")
+        if "texts" in data:
+            texts = data["texts"]
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise HttpError(400, "'texts' must be a list of strings")
+            results = await asyncio.gather(*(self._run(name, t) for t in texts))
+            return {"results": results}
+        if not isinstance(data.get("text"), str):
+            raise HttpError(400, "Expected 'text' (string) or 'texts' (list)")
+        return {"result": await self._run(name, data["text"])}
+
+    async def _run(self, name, text):
+        t0 = time.perf_counter_ns()
+        ok, value = await self.batchers[name].submit(text)
+        self.stats[name].record(time.perf_counter_ns() - t0, len(text), not ok)
+        if not ok:
+            raise HttpError(400, value)
+        return value
+
+    def health(self):
+        return {
+            "status": "ok",
+            "uptime_s": round(time.time() - self.started, 3),
+            "workers": self.workers,
+            "pool": "threads" if self.use_threads else "processes",
+            "queued": sum(b.queue.qsize() for b in self.batchers.values()),
+        }
+
+    def metrics(self):
+        ops = {}
+        for name, batcher in self.batchers.items():
+            entry = self.stats[name].to_dict()
+            entry["batches"] = batcher.batches
+            entry["mean_batch_size"] = batcher.items / batcher.batches if batcher.batches else None
+            entry["queued"] = batcher.queue.qsize()
+            entry["inflight_batches"] = batcher.inflight
+            ops[name] = entry
+        return {"open_connections": self.connections, "operations": ops}
+
+async def serve(host="127.0.0.1", port=8765, **kwargs):
+    service = NLPService(**kwargs)
+    server = await service.start(host, port)
+    print(f"nlp_service listening on http://{host}:{port} "
+          f"({service.workers} {'threads' if service.use_threads else 'processes'})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+# --- Load Test Client ---
+
+async def _post(reader, writer, path, payload):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write((f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b""):
+            break
+        key, _, value = h.decode("latin-1").partition(":")
+        if key.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+async def load_test(host="127.0.0.1", port=8765, concurrency=32, requests=2000, seed=1):
+    """
+    Fires `requests` single-text requests over `concurrency` keep-alive
+    connections, spread across the operations, and reports throughput and
+    latency percentiles.
+    """
+    rng = random.Random(seed)
+    kannada = ["ನಮಸ್ಕಾರ ಕನ್ನಡ", "ಮಂಕುತಿಮ್ಮನ ಕಗ್ಗ", "ಈ ಚಲನಚಿತ್ರ ತುಂಬಾ ಚೆನ್ನಾಗಿದೆ",
+               "ಕಲಿತರೆ ಕಲಿಯಬೇಕು ಕಲಿತು ಅನ್ಯರಿಗೆ ಕಲಿಸಬೇಕು"]
+    samples = {
+        "morphology": kannada,
+        "chandassu": kannada,
+        "sentiment": kannada,
+        "transliterate": ["namaskara", "kannada naadu", "siriganadam gelge"],
+    }
+    ops = list(samples)
+    plan = []
+    for _ in range(requests):
+        op = rng.choice(ops)
+        plan.append((f"/{op}", {"text": rng.choice(samples[op])}))
+    latencies = []
+    errors = 0
+    cursor = iter(plan)
+
+    async def worker():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for path, payload in cursor:
+                t0 = time.perf_counter()
+                status = await _post(reader, writer, path, payload)
+                latencies.append(time.perf_counter() - t0)
+                if status != 200:
+                    errors += 1
+        finally:
+            writer.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+
+    def pct(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1e3 if latencies else None
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "requests_per_s": len(latencies) / elapsed if elapsed else None,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kannada NLP HTTP service.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", help="Run the service.")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8765)
+    p_serve.add_argument("--workers", type=int, default=None, help="Worker pool size (default: CPU count).")
+    p_serve.add_argument("--threads", action="store_true", help="Use a thread pool instead of processes.")
+    p_serve.add_argument("--max-batch", type=int, default=64)
+    p_serve.add_argument("--max-wait-ms", type=float, default=5.0)
+
+    p_load = sub.add_parser("loadtest", help="Hammer a running service on localhost.")
+    p_load.add_argument("--host", default="127.0.0.1")
+    p_load.add_argument("--port", type=int, default=8765)
+    p_load.add_argument("--concurrency", type=int, default=32)
+    p_load.add_argument("--requests", type=int, default=2000)
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.host, args.port, workers=args.workers, use_threads=args.threads,
+                              max_batch=args.max_batch, max_wait_ms=args.max_wait_ms))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    report = asyncio.run(load_test(args.host, args.port, args.concurrency, args.requests))
+    print(json.dumps(report, indent=2))
+    return 1 if report["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,203 @@
-
-import re
+import inspect
+import math
+import mmap
+import os
 import random
+import re
+import sys
+import threading
+import types
 import unicodedata
-from collections import Counter
+from array import array
+from collections import Counter, OrderedDict, deque, namedtuple
+from functools import lru_cache, wraps
+
+import numpy as np
+
+import lexicon_bundle
+
+# --- 0. Memoization (shared across sessions and threads) ---
+
+MemoInfo = namedtuple("MemoInfo", "hits misses evictions currsize maxsize nbytes max_bytes")
+
+_memo_caches = {}  # function name -> MemoCache
+_memo_enabled = True
+
+_ATOM_TYPES = frozenset((str, bytes, int, float, bool))
+_SHARED_TYPES = (types.ModuleType, types.FunctionType, types.BuiltinFunctionType, type, mmap.mmap)
+_STR_HEADER = sys.getsizeof("\u0c85") - 2  # a non-Latin-1 str without its code units
+
+def approx_nbytes(obj):
+    """
+    Approximate memory held by obj and everything it references (strings,
+    containers, arrays, plain and __slots__ objects). Modules, functions,
+    classes and memory maps are shared and count as 0; containers, objects
+    and arrays reached twice are counted once (strings and numbers each
+    time). An object with an approx_nbytes() method reports its own size, so
+    long-lived analyzers can keep it up to date instead of being walked.
+    """
+    getsizeof = sys.getsizeof
+    total = 0
+    seen = set()
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if type(o) in _ATOM_TYPES:
+            total += getsizeof(o)
+            continue
+        if id(o) in seen or isinstance(o, _SHARED_TYPES):
+            continue
+        seen.add(id(o))
+        if isinstance(o, dict):
+            total += getsizeof(o)
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            total += getsizeof(o)
+            stack.extend(o)
+        elif isinstance(o, np.ndarray):
+            # Views count their header; the buffer is counted with its owner
+            total += getsizeof(o) if o.base is None else 112
+            if o.base is not None:
+                stack.append(o.base)
+            elif o.dtype == object:
+                stack.extend(o.ravel().tolist())
+        elif o is None or isinstance(o, (str, bytes, bytearray, int, float, complex, array, memoryview)):
+            total += getsizeof(o)
+        else:
+            own = getattr(o, "approx_nbytes", None)
+            if callable(own):
+                total += own()
+                continue
+            total += getsizeof(o)
+            d = getattr(o, "__dict__", None)
+            if d is not None:
+                stack.append(d)
+            for slot in getattr(type(o), "__slots__", ()):
+                if hasattr(o, slot):
+                    stack.append(getattr(o, slot))
+    return total
+
+class MemoCache:
+    """
+    Thread-safe LRU cache bounded by entry count and (approximate) bytes.
+    Results larger than the whole byte budget are returned but not stored.
+    """
+
+    def __init__(self, name, max_entries=1024, max_bytes=8 << 20):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # key -> (value, nbytes)
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        """Returns (found, value) and marks the entry as recently used."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key, value):
+        nbytes = approx_nbytes((key, value))
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self._data[key] = (value, nbytes)
+            self.nbytes += nbytes
+            while len(self._data) > self.max_entries or self.nbytes > self.max_bytes:
+                _, (_, dropped) = self._data.popitem(last=False)
+                self.nbytes -= dropped
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+    def info(self):
+        with self._lock:
+            return MemoInfo(self.hits, self.misses, self.evictions, len(self._data),
+                            self.max_entries, self.nbytes, self.max_bytes)
+
+def memoize(max_entries=1024, max_bytes=8 << 20, copy=None):
+    """
+    Decorator for pure text -> result functions. The cache key is the
+    normalize_kannada() form of the first argument plus the remaining
+    arguments, so the function's result must depend on the text only through
+    its normalized form. `copy(result, text)` is applied to every returned
+    value so callers never mutate the shared cached object.
+
+    Bulk one-shot input (pipelines, corpus passes) should call
+    `func.uncached(text)`: no key normalization, sizing or copying, and the
+    interactive cache isn't flushed by lines that never repeat.
+    """
+    def decorator(func):
+        cache = _memo_caches[func.__name__] = MemoCache(func.__name__, max_entries, max_bytes)
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _memo_enabled:
+                return func(*args, **kwargs)
+            if kwargs or not args:
+                # Fold keyword arguments into positions, so f(text=t) and f(t) share a key
+                bound = signature.bind(*args, **kwargs)
+                args, kwargs = bound.args, bound.kwargs
+            text = args[0]
+            key = (normalize_kannada(text), args[1:], tuple(sorted(kwargs.items())))
+            found, result = cache.get(key)
+            if not found:
+                result = func(*args, **kwargs)
+                cache.put(key, result)
+            return copy(result, text) if copy else result
+
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+def cache_stats():
+    """{function name: hit/miss/eviction counters and sizes} for every memoized function."""
+    return {name: dict(cache.info()._asdict()) for name, cache in _memo_caches.items()}
+
+def invalidate_caches(*names):
+    """Empties the named memo caches (all of them when no name is given)."""
+    for name in names or list(_memo_caches):
+        _memo_caches[name].clear()
+
+def set_memoization(enabled):
+    """Turns memo lookups on/off globally (e.g. for benchmarks). Returns the previous setting."""
+    global _memo_enabled
+    previous, _memo_enabled = _memo_enabled, bool(enabled)
+    return previous
+
+def _copy_list(result, text):
+    return list(result)
+
+def _copy_morphology(result, text):
+    aksharas = result["aksharas"]
+    return {
+        "aksharas": list(aksharas) if isinstance(aksharas, list) else aksharas,
+        "stats": dict(result["stats"]),
+        "text_len": len(text),  # raw length, which the key doesn't capture
+    }
+
+# --- Lexical resources ---
+# Every word list lives under lexicons/ and is compiled into one memory-mapped
+# bundle (see lexicon_bundle.py). The small hot-path lists are materialized
+# once per process below; big tables are read straight from the mapping.
+LEXICONS = lexicon_bundle.load_bundle()
 
 # --- 1. Preprocessing & Normalization ---
 
@@ -30,6 +225,8 @@ def normalize_kannada(text):
     
     return text
 
+_STOPWORDS = frozenset(LEXICONS["stopwords"])
+
 def preprocess_text(text, remove_stopwords=False):
     """
     Tokenizes and optionally removes stopwords.
@@ -41,29 +238,35 @@ def preprocess_text(text, remove_stopwords=False):
     tokens = text.split(' ')
     
     if remove_stopwords:
-        # A small sample list of Kannada stopwords
-        stopwords = {
-            'ಮತ್ತು', 'ಒಂದು', 'ಈ', 'ಆ', 'ನನ್ನ', 'ನಿಮ್ಮ', 'ಅವರು', 'ಇದು', 'ಆದರೆ', 
-            'ಬಗ್ಗೆ', 'ನಾವು', 'ನೀವು', 'ಎಂದು', 'ಇದೆ', 'ಆಗಿ', 'ಅದು', 'ಅಲ್ಲಿ', 'ಇಲ್ಲಿ'
-        }
-        tokens = [t for t in tokens if t not in stopwords]
+        tokens = [t for t in tokens if t not in _STOPWORDS]
         
     return tokens
 
 # --- 2. Classification (Rule Based) ---
 
+def _group_rows(table):
+    # (group, item) rows -> {group: [items]}, keeping the source order
+    groups = {}
+    for group, item in table:
+        groups.setdefault(group, []).append(item)
+    return groups
+
+# Category order matters: ties go to the first category listed
+_TOPIC_KEYWORDS = _group_rows(LEXICONS["topic_keywords"])
+
+def topic_keywords():
+    """{category: [keywords]} used by classify_text, in tie-break order."""
+    return {cat: list(words) for cat, words in _TOPIC_KEYWORDS.items()}
+
+@memoize()
 def classify_text(text):
     """
     Classifies text into categories based on keyword presence.
     Categories: Sports, Politics, Cinema, Technology, General
     """
-    keywords = {
-        'Sports': ['ಕ್ರಿಕೆಟ್', 'ಆಟ', 'ಬ್ಯಾಟಿಂಗ್', 'ಬೌಲಿಂಗ್', 'ಪಂದ್ಯ', 'ಕ್ರೀಡೆ', 'ಗೆಲುವು', 'ಸೋಲು'],
-        'Politics': ['ಚುನಾವಣೆ', 'ಸರ್ಕಾರ', 'ರಾಜಕೀಯ', 'ಮಂತ್ರಿ', 'ಪಕ್ಷ', 'ಮತದಾನ', 'ಪ್ರಧಾನಿ'],
-        'Cinema': ['ಚಲನಚಿತ್ರ', 'ನಟ', 'ನಟಿ', 'ಸಿನಿಮಾ', 'ಹಾಡು', 'ನಿರ್ದೇಶಕ', 'ತೆರೆ'],
-        'Technology': ['ತಂತ್ರಜ್ಞಾನ', 'ಕಂಪ್ಯೂಟರ್', 'ಮೊಬೈಲ್', 'ಜಾಲತಾಣ', 'ಸಾಫ್ಟ್ವೇರ್', 'ಅಂತರ್ಜಾಲ']
-    }
-    
+    # Normalize first so decomposed / ZWJ-laden input matches the keywords
+    text = normalize_kannada(text)
+    keywords = _TOPIC_KEYWORDS
     scores = {cat: 0 for cat in keywords}
     
     for token in text.split():
@@ -79,18 +282,16 @@ def classify_text(text):
 
 # --- 3. Sentiment Analysis (Lexicon Based) ---
 
+_SENTIMENT_WORDS = _group_rows((polarity, word) for word, polarity in LEXICONS["sentiment"])
+
+@memoize()
 def analyze_sentiment(text):
     """
     Returns polarity (-1 to 1) and label.
     """
-    positive_words = [
-        'ಚೆನ್ನಾಗಿದೆ', 'ಸುಂದರ', 'ಉತ್ತಮ', 'ಶ್ರೇಷ್ಠ', 'ಖುಷಿ', 'ಪ್ರೀತಿ', 'ಗೆಲುವು', 'ಅದ್ಭುತ', 
-        'ಒಳ್ಳೆಯ', 'ಸಂತೋಷ', 'ಆನಂದ', 'ಸೂಪರ್'
-    ]
-    negative_words = [
-        'ಕೆಟ್ಟ', 'ಕಷ್ಟ', 'ದುಃಖ', 'ನೋವು', 'ಸೋಲು', 'ಅಸಹ್ಯ', 'ಕೋಪ', 'ಬೇಜಾರು', 'ಭಯ', 
-        'ದೋಷ', 'ಸಮಸ್ಯೆ'
-    ]
+    text = normalize_kannada(text)
+    positive_words = _SENTIMENT_WORDS.get('+1', ())
+    negative_words = _SENTIMENT_WORDS.get('-1', ())
     
     score = 0
     words = text.split()
@@ -109,22 +310,15 @@ def analyze_sentiment(text):
 
 # --- 4. Text Simplification (Prototype) ---
 
+# Applied in file order, so longer phrases can be listed before their parts
+_SIMPLIFY_PAIRS = list(LEXICONS["simplify"])
+
 def simplify_kannada(text):
     """
     Replaces complex/formal words with simpler colloquial ones.
     """
-    replacements = {
-        'ವಿದ್ಯಾರ್ಥಿ': 'ಮಕ್ಕಳು',       # Student -> Children (Contextual approx)
-        'ಚಲನಚಿತ್ರ': 'ಸಿನಿಮಾ',        # Movie (Formal) -> Cinema
-        'ಆರಕ್ಷಕ': 'ಪೊಲೀಸ್',          # Police (Formal) -> Police
-        'ವೈದ್ಯ': 'ಡಾಕ್ಟರ್',          # Doctor (Formal) -> Doctor
-        'ದೂರವಾಣಿ': 'ಫೋನ್',           # Telephone -> Phone
-        'ಗ್ರಂಥಾಲಯ': 'ಲೈಬ್ರರಿ',       # Library -> Library
-        'ವಿಮಾನ ನಿಲ್ದಾಣ': 'ಏರ್‌ಪೋರ್ಟ್' # Airport
-    }
-    
     simple_text = text
-    for complex_w, simple_w in replacements.items():
+    for complex_w, simple_w in _SIMPLIFY_PAIRS:
         simple_text = simple_text.replace(complex_w, simple_w)
         
     return simple_text
@@ -144,139 +338,532 @@ def generate_story_start(prompt):
 
 # --- 6. Translation (Deterministic Dictionary) ---
 
+# Built-in starter lexicon (lexicons/en_kn.tsv), a read-only mapping over the
+# bundle. Larger bilingual lexicons (TSV: english<TAB>kannada, phrases allowed
+# on the English side) can be loaded into `en_kn_translator`.
+BASIC_EN_KN_LEXICON = LEXICONS["en_kn"].mapping()
+
+def _translation_tokens(text):
+    # Same tokenization basic_translate_en_kn has always used
+    return text.lower().replace('.', '').split()
+
+class LexiconTranslator:
+    """
+    Greedy longest-phrase translator backed by a token trie.
+
+    Every distinct English token gets an integer id, and trie edges live in a
+    single flat dict keyed by (node << 32 | token_id), so a lexicon with
+    hundreds of thousands of phrases costs one int key per edge instead of a
+    dict per node. Translating is a single left-to-right pass: at each word we
+    walk the trie as far as it goes and emit the longest phrase that ended on
+    a terminal node, or copy the word through unchanged.
+
+    `table` is an optional keyed lexicon_bundle table (english phrase ->
+    kannada, keys already in the lowercase single-spaced form translation
+    looks up) that is searched in place instead of being copied into the
+    trie, so a large mapped lexicon stays shared through the page cache. A
+    phrase added with add()/update()/load() wins over the table's entry.
+    """
+
+    def __init__(self, entries=None, cache_size=4096, table=None):
+        self._table = table
+        self._token_ids = {}
+        self._edges = {}
+        self._outputs = {}   # terminal node -> translation
+        self._node_count = 1 # node 0 is the root
+        self.max_phrase_len = 0
+        self._cache_size = cache_size
+        self._reset_cache()
+        if entries:
+            self.update(entries)
+
+    @classmethod
+    def from_file(cls, filepath, encoding="utf-8", cache_size=4096):
+        """Builds a translator from a TSV lexicon file."""
+        translator = cls(cache_size=cache_size)
+        translator.load(filepath, encoding=encoding)
+        return translator
+
+    def _reset_cache(self):
+        # Memoizes whole sentences; repeated UI strings hit this constantly
+        self.translate = lru_cache(maxsize=self._cache_size)(self._translate)
+
+    def __len__(self):
+        # (a phrase both in the table and added on top counts twice)
+        return len(self._outputs) + (len(self._table) if self._table is not None else 0)
+
+    def add(self, source, target):
+        """Adds (or replaces) one word or phrase mapping."""
+        self._insert(source, target)
+        self._reset_cache()
+
+    def _insert(self, source, target):
+        tokens = _translation_tokens(source)
+        if not tokens:
+            return
+        node = 0
+        for tok in tokens:
+            tid = self._token_ids.get(tok)
+            if tid is None:
+                tid = self._token_ids[tok] = len(self._token_ids)
+            key = (node << 32) | tid
+            child = self._edges.get(key)
+            if child is None:
+                child = self._edges[key] = self._node_count
+                self._node_count += 1
+            node = child
+        self._outputs[node] = target
+        self.max_phrase_len = max(self.max_phrase_len, len(tokens))
+
+    def update(self, entries):
+        """Adds mappings from a mapping or an iterable of (source, target) pairs."""
+        if hasattr(entries, "items"):
+            entries = entries.items()
+        for source, target in entries:
+            self._insert(source, target)
+        self._reset_cache()
+
+    def load(self, filepath, encoding="utf-8"):
+        """
+        Loads a TSV lexicon (english<TAB>kannada per line, '#' comments).
+        Lines are streamed, so the file itself is never held in memory.
+        """
+        def rows():
+            with open(filepath, encoding=encoding) as f:
+                for line in f:
+                    line = line.rstrip('\n')
+                    if not line or line.startswith('#') or '\t' not in line:
+                        continue
+                    source, target = line.split('\t', 1)
+                    yield source, target.strip()
+        self.update(rows())
+        return self
+
+    def _translate(self, text):
+        words = _translation_tokens(text)
+        edges, token_ids, outputs = self._edges, self._token_ids, self._outputs
+        translated = []
+        i = 0
+        n = len(words)
+        while i < n:
+            node = 0
+            best_end = i
+            best_out = None
+            j = i
+            while j < n:
+                tid = token_ids.get(words[j])
+                if tid is None:
+                    break
+                node = edges.get((node << 32) | tid)
+                if node is None:
+                    break
+                j += 1
+                out = outputs.get(node)
+                if out is not None:
+                    best_end, best_out = j, out
+            if self._table is not None:
+                table_end, table_out = self._table_match(words, i)
+                if table_end > best_end:
+                    best_end, best_out = table_end, table_out
+            if best_out is None:
+                translated.append(words[i]) # Return original if not found
+                i += 1
+            else:
+                translated.append(best_out)
+                i = best_end
+        return " ".join(translated)
+
+    def _table_match(self, words, i):
+        # Longest table phrase starting at words[i]: extend one word at a time
+        # while some key still starts with the phrase (two binary searches a word)
+        table, rows = self._table, len(self._table)
+        best_end, best_out = i, None
+        phrase = words[i]
+        for j in range(i, len(words)):
+            if j > i:
+                phrase += " " + words[j]
+            row = table.lower_bound(phrase)
+            if row < rows and table.cell(row) == phrase:
+                best_end, best_out = j + 1, table.cell(row, 1)
+            row = table.lower_bound(phrase + " ")
+            if row >= rows or not table.cell(row).startswith(phrase + " "):
+                break
+        return best_end, best_out
+
+    def translate_batch(self, lines):
+        """Translates an iterable of sentences, returning a list."""
+        translate = self.translate
+        return [translate(line) for line in lines]
+
+    def translate_file(self, src_path, dst_path, encoding="utf-8"):
+        """
+        Translates a text file line by line into dst_path.
+        Returns the number of lines written.
+        """
+        translate = self.translate
+        count = 0
+        with open(src_path, encoding=encoding) as src, open(dst_path, "w", encoding=encoding) as dst:
+            for line in src:
+                dst.write(translate(line.rstrip('\n')) + "\n")
+                count += 1
+        return count
+
+# Singleton instance for easy import (load a bigger lexicon with en_kn_translator.load(path)).
+# The bundled table is searched in the mapping, not copied into a per-process trie
+en_kn_translator = LexiconTranslator(table=LEXICONS["en_kn"])
+
 def basic_translate_en_kn(text):
     """
-    Performs a deterministic word-level dictionary lookup.
-    """
-    dictionary = {
-        'hello': 'ನಮಸ್ಕಾರ',
-        'world': 'ಪ್ರಪಂಚ',
-        'love': 'ಪ್ರೀತಿ',
-        'kannada': 'ಕನ್ನಡ',
-        'good': 'ಒಳ್ಳೆಯ',
-        'morning': 'ಮುಂಜಾನೆ/ಶುಭೋದಯ',
-        'is': 'ಇದೆ',
-        'beautiful': 'ಸುಂದರ',
-        'name': 'ಹೆಸರು',
-        'my': 'ನನ್ನ'
-    }
-    
-    words = text.lower().replace('.', '').split()
-    translated = []
-    for w in words:
-        translated.append(dictionary.get(w, w)) # Return original if not found
-        
-    return " ".join(translated)
+    Performs a deterministic dictionary lookup, preferring the longest
+    matching phrase in the lexicon at each position.
+    """
+    return en_kn_translator.translate(text)
 
 # --- 7. Morphology & Character Analysis ---
+# One engine for every Brahmic script: the akshara splitter, the stats and the
+# meter only look at per-character class flags, read from script_classes.tsv
+# (generated by `python script_detect.py classes` for each script in
+# analyze_scripts.get_indic_scripts_list() with a Brahmic layout). Supporting
+# a new script means adding its rows to that table.
+
+# Character class bit flags. A char can carry more than one (the Virama sits
+# inside the dependent-sign range, so it is counted as a Matra too). The same
+# flags are OR-ed together per akshara in AksharaSpans.flags. HEAVY marks long
+# vowels/signs and Anusvara/Visarga (they make an akshara Guru); MARK is any
+# other combining sign (nukta, ...) that belongs to its akshara but isn't counted.
+SWARA, VYANJANA, MATRA, YOGAVAHA, VIRAMA, OTTAKSHARA, HEAVY, MARK = 1, 2, 4, 8, 16, 32, 64, 128
+
+SCRIPT_CLASSES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "script_classes.tsv")
+_CLASS_LETTERS = {"S": SWARA, "C": VYANJANA, "M": MATRA, "Y": YOGAVAHA, "V": VIRAMA, "H": HEAVY, "N": MARK}
+
+def _load_script_classes(path=SCRIPT_CLASSES_FILE):
+    """{ISO 15924 code: {char: class flags}} from the generated table."""
+    scripts = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            code, lo, hi, letters = line.rstrip("\n").split("\t")
+            flags = 0
+            for letter in letters:
+                flags |= _CLASS_LETTERS[letter]
+            table = scripts.setdefault(code, {})
+            for cp in range(int(lo, 16), int(hi, 16) + 1):
+                table[chr(cp)] = flags
+    return scripts
+
+SCRIPT_CLASSES = _load_script_classes()
+# Script blocks don't overlap, so one merged table serves all of them
+_CHAR_CLASSES = {char: flags for table in SCRIPT_CLASSES.values() for char, flags in table.items()}
 
 def is_vowel(char):
-    # Kannada Vowels: 0C85 (ಅ) to 0C94 (ಔ), plus 0CE0 (ಋ - Vocalic RR)
-    # Note: 0C82 (Anusvara), 0C83 (Visarga) are Yogavahakas, not pure vowels in this logic
-    return 0x0C85 <= ord(char) <= 0x0C94 or ord(char) == 0x0C8B or ord(char) == 0x0CE0
+    # Independent vowel (ಅ, ಆ, ... ಔ, ಋ; अ, అ, ...)
+    # Note: Anusvara and Visarga are Yogavahakas, not pure vowels in this logic
+    return bool(_CHAR_CLASSES.get(char, 0) & SWARA)
 
 def is_consonant(char):
-    # Ka (0C95) to Ha (0CB9)
-    return 0x0C95 <= ord(char) <= 0x0CB9 or ord(char) == 0x0CDE # Fa (Nuqta char)
+    # Ka .. Ha, plus the nukta letters (ಫ಼ / ೞ, क़ ...)
+    return bool(_CHAR_CLASSES.get(char, 0) & VYANJANA)
 
 def is_matra(char):
-    # DEPENDENT VOWEL SIGNS: 0CBE to 0CD6
-    return 0x0CBE <= ord(char) <= 0x0CD6
+    # Dependent vowel signs (and the Virama / length marks)
+    return bool(_CHAR_CLASSES.get(char, 0) & MATRA)
 
 def is_virama(char):
-    # Halant / Virama
-    return ord(char) == 0x0CCD
+    # Halant / Virama (ccc 9: ್, ्, ్, Khmer coeng, ...)
+    return bool(_CHAR_CLASSES.get(char, 0) & VIRAMA)
 
 def is_yogavaha(char):
-    # Anusvara (0C82) and Visarga (0C83)
-    return ord(char) in [0x0C82, 0x0C83]
+    # Anusvara, Visarga (and Candrabindu and friends)
+    return bool(_CHAR_CLASSES.get(char, 0) & YOGAVAHA)
+
+def script_classes(script="Knda"):
+    """{char: class flags} for one script, e.g. script_classes("Telu")."""
+    return dict(SCRIPT_CLASSES[script])
 
-def analyze_morphology(text):
+def _segment_aksharas(cleaned):
     """
-    Analyzes Kannada text for morphological components.
-    Returns:
-    - aksharas: List of identified orthographic syllables (Aksharas)
-    - stats: Counts of Swara, Vyanjana, Yogavahaka, Ottakshara (Conjuncts)
+    Splits already-normalized text into akshara spans.
+    Returns (starts, ends, flags, stats) with offsets into `cleaned`.
     """
-    # Use existing normalization
-    cleaned = normalize_kannada(text)
-    
-    aksharas = []
-    stats = {"Swaras": 0, "Vyanjanas": 0, "Yogavahakas": 0, "Ottaksharas": 0, "Matras": 0}
-    
     # Logic to split into Aksharas:
     # A generic Indic Akshara = (C + Virama)* + C + (Matra)? + (Yogavaha)? 
     # OR Independent Vowel + (Yogavaha)?
-    # OR Non-Kannada/Whitespace chars treat as separate units or delimiters
-    
-    current_akshara = ""
-    buffer = []
-    
-    chars = list(cleaned)
-    i = 0
-    n = len(chars)
-    
-    while i < n:
-        char = chars[i]
-        code = ord(char)
-        
-        # Determine type
-        c_is_vowel = is_vowel(char)
-        c_is_consonant = is_consonant(char)
-        c_is_matra = is_matra(char)
-        c_is_virama = is_virama(char)
-        c_is_yogavaha = is_yogavaha(char)
-        
-        # Heuristic for Akshara Boundary:
-        # A new Akshara typically starts if:
-        # 1. It's a Vowel (Independent)
-        # 2. It's a Consonant, AND the previous char was NOT a Virama 
-        #    (if prev was Virama, this Consonant is likely part of a conjunct/cluster)
-        # 3. It's a non-Kannada char (space, punctuation) -> Break
-        
-        start_new = False
-        
-        if c_is_vowel:
+    # OR Non-Indic/Whitespace chars treat as separate units or delimiters
+    #
+    # A new Akshara starts if:
+    # 1. It's a Vowel (Independent)
+    # 2. It's a Consonant, AND the previous char was NOT a Virama 
+    #    (if prev was Virama, this Consonant is part of a conjunct/cluster)
+    # 3. It's a char with no class (space, punctuation, digits) -> Break, char is dropped
+    starts = array('I')
+    ends = array('I')
+    flags = array('B')
+    swaras = vyanjanas = yogavahas = ottaksharas = matras = 0
+
+    classes = _CHAR_CLASSES.get
+    start = -1  # start of the open akshara, -1 when none is open
+    current = 0 # OR of the classes in the open akshara
+    prev = 0    # class of the previous char, 0 after a delimiter
+
+    for i, char in enumerate(cleaned):
+        c = classes(char, 0)
+        if not c:
+            if start >= 0:
+                starts.append(start); ends.append(i); flags.append(current)
+                start = -1
+            prev = 0
+            continue
+
+        if c & SWARA:
             start_new = True
-        elif c_is_consonant:
-            if buffer and is_virama(buffer[-1]):
-                # Proven previous char was Virama -> This is a conjunct (e.g., K + Virama + Ka)
+            swaras += 1
+        elif c & VYANJANA:
+            vyanjanas += 1
+            if prev & VIRAMA:
+                # K + Virama + Ka: stays in the same akshara
                 start_new = False
-                stats["Ottaksharas"] += 1
+                ottaksharas += 1
+                current |= OTTAKSHARA
             else:
-                # Normal Consonant start
                 start_new = True
-        elif c_is_matra or c_is_virama or c_is_yogavaha:
-            # These differ to the previous base
-            start_new = False
         else:
-            # Non-Kannada (Space, Punctuation, Digits)
-            # Finish current buffer
-            if buffer:
-                aksharas.append("".join(buffer))
-                buffer = []
-            # We don't add non-kannada chars to 'aksharas' list for stats, but maybe keep structure?
-            # Let's ignore for stats purpose 
-            i += 1
-            continue
+            # Matras, Virama and Yogavahas attach to the previous base
+            start_new = False
+            if c & MATRA: matras += 1
+            if c & YOGAVAHA: yogavahas += 1
+
+        if start_new and start >= 0:
+            starts.append(start); ends.append(i); flags.append(current)
+            start = -1
+        if start < 0:
+            start = i
+            current = 0
+        current |= c
+        prev = c
+
+    if start >= 0:
+        starts.append(start); ends.append(len(cleaned)); flags.append(current)
+
+    stats = {"Swaras": swaras, "Vyanjanas": vyanjanas, "Yogavahakas": yogavahas,
+             "Ottaksharas": ottaksharas, "Matras": matras}
+    return starts, ends, flags, stats
+
+def akshara_spans(cleaned):
+    """
+    (starts, ends) of the aksharas in already-normalized text, e.g.
+    akshara_spans(normalize_kannada(text)). Characters outside any akshara
+    (spaces, punctuation) fall between spans.
+    """
+    starts, ends, _, _ = _segment_aksharas(cleaned)
+    return starts, ends
+
+class AksharaSpans:
+    """
+    Compact akshara sequence: the source string plus start/end offset arrays
+    (array('I')) and per-akshara class flags (array('B')). Nothing is sliced
+    until an akshara is actually read, so a large corpus costs ~9 bytes per
+    akshara instead of one Python str each.
+
+    Behaves like a read-only sequence of str and compares equal to the
+    equivalent list; to_list() gives the classic analyze_morphology output.
+    """
+
+    __slots__ = ("source", "starts", "ends", "flags")
+
+    def __init__(self, source, starts, ends, flags):
+        self.source = source
+        self.starts = starts
+        self.ends = ends
+        self.flags = flags
+
+    @classmethod
+    def from_text(cls, text):
+        cleaned = normalize_kannada(text)
+        starts, ends, flags, _ = _segment_aksharas(cleaned)
+        return cls(cleaned, starts, ends, flags)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return AksharaSpans(self.source, self.starts[index], self.ends[index], self.flags[index])
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def __iter__(self):
+        source = self.source
+        for s, e in zip(self.starts, self.ends):
+            yield source[s:e]
+
+    def __eq__(self, other):
+        if isinstance(other, AksharaSpans):
+            return self.to_list() == other.to_list()
+        if isinstance(other, (list, tuple)):
+            return len(other) == len(self) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"AksharaSpans({len(self)} aksharas over {len(self.source)} chars)"
+
+    def view(self, index):
+        """Lazy handle on one akshara; slices the source only when .text is read."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("akshara index out of range")
+        return AksharaView(self, index)
+
+    def views(self):
+        for i in range(len(self)):
+            yield AksharaView(self, i)
+
+    def to_list(self):
+        source = self.source
+        return [source[s:e] for s, e in zip(self.starts, self.ends)]
+
+    def has_flag(self, index, flag):
+        return bool(self.flags[index] & flag)
+
+    def as_numpy(self):
+        """Zero-copy NumPy views of (starts, ends, flags)."""
+        return (np.frombuffer(self.starts, dtype=np.uint32),
+                np.frombuffer(self.ends, dtype=np.uint32),
+                np.frombuffer(self.flags, dtype=np.uint8))
+
+    @property
+    def nbytes(self):
+        return (self.starts.itemsize * len(self.starts) + self.ends.itemsize * len(self.ends)
+                + self.flags.itemsize * len(self.flags))
+
+class AksharaView:
+    """One akshara inside an AksharaSpans, without its own copy of the text."""
+
+    __slots__ = ("spans", "index")
+
+    def __init__(self, spans, index):
+        self.spans = spans
+        self.index = index
+
+    @property
+    def start(self):
+        return self.spans.starts[self.index]
+
+    @property
+    def end(self):
+        return self.spans.ends[self.index]
+
+    @property
+    def flags(self):
+        return self.spans.flags[self.index]
+
+    @property
+    def text(self):
+        return self.spans.source[self.start:self.end]
+
+    @property
+    def is_conjunct(self):
+        return bool(self.flags & OTTAKSHARA)
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"AksharaView({self.text!r}, start={self.start}, flags={self.flags:#04x})"
+
+# Codepoint -> class flags lookup table for the vectorized stats path. The
+# last index is a catch-all 0 for every codepoint past the highest Indic block.
+_LUT_END = max(map(ord, _CHAR_CLASSES)) + 1
+_CLASS_LUT = np.zeros(_LUT_END + 1, dtype=np.uint8)
+for _char, _flags in _CHAR_CLASSES.items():
+    _CLASS_LUT[ord(_char)] = _flags
+
+def _flag_count(class_counts, flag):
+    # class_counts[i] = number of chars whose class bits are exactly i
+    return int(class_counts[np.arange(len(class_counts)) & flag != 0].sum())
+
+def _stats_codepoints(text):
+    """
+    Codepoints of `text` after the parts of normalize_kannada that can change
+    character counts or adjacency (NFC + ZWJ/ZWNJ removal). Whitespace
+    collapsing is skipped: whitespace is a delimiter either way.
+    """
+    # is_normalized is a fast C check and scraped text is nearly always NFC
+    # already, so the full normalize() pass is usually skipped
+    if not unicodedata.is_normalized('NFC', text):
+        text = unicodedata.normalize('NFC', text)
+    if '\u200d' in text or '\u200c' in text:
+        text = text.replace('\u200d', '').replace('\u200c', '')
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
+def morphology_stats_vectorized(text, normalize=True):
+    """
+    Same counts as analyze_morphology(text)['stats'], computed with NumPy
+    instead of the per-character loop. Meant for large texts (megabytes and
+    up) where only the counts are needed, not the aksharas.
+    """
+    if normalize:
+        codes = _stats_codepoints(text)
+    else:
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    classes = _CLASS_LUT[np.minimum(codes, _LUT_END)]
+
+    class_counts = np.bincount(classes, minlength=256)
+    # Ottakshara: a consonant immediately after a Virama
+    ottaksharas = np.count_nonzero((classes[1:] & VYANJANA) & ((classes[:-1] & VIRAMA) >> 3))
+
+    return {
+        "Swaras": _flag_count(class_counts, SWARA),
+        "Vyanjanas": _flag_count(class_counts, VYANJANA),
+        "Yogavahakas": _flag_count(class_counts, YOGAVAHA),
+        "Ottaksharas": int(ottaksharas),
+        "Matras": _flag_count(class_counts, MATRA),
+    }
+
+def segment_spans_vectorized(codes):
+    """
+    Akshara (start, end) offsets for an already-normalized codepoint array,
+    identical to _segment_aksharas but computed with NumPy. Used by bulk
+    consumers (language model, corpus tools) that only need the spans.
+    """
+    codes = np.asarray(codes, dtype=np.uint32)
+    classes = _CLASS_LUT[np.minimum(codes, _LUT_END)]
+    kannada = classes != 0
+    prev = np.zeros_like(classes)
+    prev[1:] = classes[:-1]
+    # Same rules as the loop: independent vowels always open an akshara,
+    # consonants do unless they follow a Virama, and anything opens one
+    # right after a delimiter
+    opens = kannada & (((classes & SWARA) != 0)
+                       | (((classes & VYANJANA) != 0) & ((prev & VIRAMA) == 0))
+                       | (prev == 0))
+    starts = np.flatnonzero(opens)
+    breaks = np.flatnonzero(opens | ~kannada)
+    nxt = np.searchsorted(breaks, starts, side="right")
+    ends = np.append(breaks, len(codes))[nxt]
+    return starts, ends
+
+@memoize(max_entries=512, max_bytes=32 << 20, copy=_copy_morphology)
+def analyze_morphology(text, compact=False):
+    """
+    Analyzes Kannada (or any other Brahmic-script) text for morphological components.
+    Returns:
+    - aksharas: List of identified orthographic syllables (Aksharas), or an
+      AksharaSpans over the normalized text when compact=True
+    - stats: Counts of Swara, Vyanjana, Yogavahaka, Ottakshara (Conjuncts)
+    """
+    # Use existing normalization
+    cleaned = normalize_kannada(text)
+    starts, ends, flags, stats = _segment_aksharas(cleaned)
+
+    if compact:
+        aksharas = AksharaSpans(cleaned, starts, ends, flags)
+    else:
+        aksharas = [cleaned[s:e] for s, e in zip(starts, ends)]
 
-        if start_new and buffer:
-            aksharas.append("".join(buffer))
-            buffer = []
-        
-        buffer.append(char)
-        
-        # Update Counts
-        if c_is_vowel: stats["Swaras"] += 1
-        if c_is_consonant: stats["Vyanjanas"] += 1
-        if c_is_matra: stats["Matras"] += 1
-        if c_is_yogavaha: stats["Yogavahakas"] += 1
-        
-        i += 1
-        
-    if buffer:
-        aksharas.append("".join(buffer))
-        
     return {
         "aksharas": aksharas,
         "stats": stats,
@@ -285,6 +872,50 @@ def analyze_morphology(text):
 
 # --- 8. Chandassu (Prosody) Calculator ---
 
+# Needs lookahead for "Previous short vowel becomes Guru if next is Conjunct"
+# Actually, in Akshara logic, the conjunct usually stays with the consonant.
+# Ex: Ka (L), Rna (G? No Rna is N+a, let's say).
+# Ex: Sakti. Sa (L? No, next is Kti). Kti (Conjunct).
+# In 'Sakti', 'Sa' becomes Guru because 'k' is traditionally part of next akshara 'ti' as conjunct.
+# Logic: If Akshara[i+1] is a Conjunct (starts with >1 consonant before vowel), Akshara[i] gets weight.
+
+# Simplified Logic based on Unicode analysis of specific Akshara string:
+# 1. Check if Akshara itself has Long Vowel or Yogavaha -> Guru
+# 2. Check if NEXT Akshara is "heavy" start? No, check if next akshara contains a conjunct cluster.
+
+_HEAVY_CHARS = frozenset(char for char, flags in _CHAR_CLASSES.items() if flags & HEAVY)
+_VIRAMA_CHARS = frozenset(char for char, flags in _CHAR_CLASSES.items() if flags & VIRAMA)
+
+def _has_long_vowel_or_yogavaha(aksh):
+    # Long vowel, long matra, or Anusvara/Visarga anywhere in the akshara
+    return not _HEAVY_CHARS.isdisjoint(aksh)
+
+# Helper to check if Akshara is a Conjunct (Ottakshara)
+# Definition: Contains a Halant sequence that forms a cluster.
+# In our akshara splitter, 'Kta' is one akshara. 
+# But for Prosody, the 'K' part makes the PREVIOUS syllable heavy.
+# Akshara = C1 + H + C2 + V. 
+# If Akshara starts with C+H+C, it implies the previous syllable takes the hit?
+# Wait, 'Satya'. Sa is one unit. Tya is next. Tya = T+Virama+Y+a.
+# Because Tya has a conjunct start, Sa becomes Guru.
+def _is_conjunct_start(aksh):
+    # Does it contain a Virama followed by Consonant?
+    # Actually our Akshara splitter makes 'Tya' one block.
+    # So we check if 'Tya' has a Virama inside it before the vowel.
+    return not _VIRAMA_CHARS.isdisjoint(aksh)
+
+def _meter_symbol(aksharas, i):
+    """Laghu/Guru symbol for aksharas[i] (looks one akshara ahead)."""
+    # Rule 1: Intrinsic Guru
+    if _has_long_vowel_or_yogavaha(aksharas[i]):
+        return "-"
+    # Rule 2: Positional Guru (Samyuktakshara Param)
+    # If current is Short, but next is Conjunct -> Guru
+    if i + 1 < len(aksharas) and _is_conjunct_start(aksharas[i + 1]):
+        return "-"
+    return "U"
+
+@memoize(copy=_copy_list)
 def get_chandassu_meter(text):
     """
     Determines the Laghu (U) / Guru (-) meter for a given text.
@@ -292,71 +923,139 @@ def get_chandassu_meter(text):
     - Guru (-): Long Vowel, Vowel followed by Conjunct (Ottakshara), Vowel with Anusvara/Visarga.
     - Laghu (U): Short Vowel (not followed by conjunct).
     """
-    analysis = analyze_morphology(text)
-    aksharas = analysis['aksharas']
-    meter_pattern = []
-    
-    # Needs lookahead for "Previous short vowel becomes Guru if next is Conjunct"
-    # Actually, in Akshara logic, the conjunct usually stays with the consonant.
-    # Ex: Ka (L), Rna (G? No Rna is N+a, let's say).
-    # Ex: Sakti. Sa (L? No, next is Kti). Kti (Conjunct).
-    # In 'Sakti', 'Sa' becomes Guru because 'k' is traditionally part of next akshara 'ti' as conjunct.
-    # Logic: If Akshara[i+1] is a Conjunct (starts with >1 consonant before vowel), Akshara[i] gets weight.
-    
-    # Simplified Logic based on Unicode analysis of specific Akshara string:
-    # 1. Check if Akshara itself has Long Vowel or Yogavaha -> Guru
-    # 2. Check if NEXT Akshara is "heavy" start? No, check if next akshara contains a conjunct cluster.
-    
-    # Helper to check if Akshara has Long Vowel or Yogavaha
-    def has_long_vowel_or_yogavaha(aksh):
-        # Scan chars
-        has_long = False
-        has_yog = False
-        
-        long_vowel_codes = [0x0C86, 0x0C87, 0x0C8A, 0x0C8B, 0x0C8E, 0x0C8F, 0x0C90, 0x0C92, 0x0C93, 0x0C94, 0x0C60, 0x0C61]
-        long_matra_codes = [0x0CBE, 0x0CC0, 0x0CC2, 0x0CC4, 0x0CC7, 0x0CC8, 0x0CCA, 0x0CCB, 0x0CD5, 0x0CD6]
-        
-        for char in aksh:
-            c = ord(char)
-            if c in long_vowel_codes or c in long_matra_codes:
-                has_long = True
-            if is_yogavaha(char):
-                has_yog = True
-        return has_long or has_yog
-
-    # Helper to check if Akshara is a Conjunct (Ottakshara)
-    # Definition: Contains a Halant sequence that forms a cluster.
-    # In our akshara splitter, 'Kta' is one akshara. 
-    # But for Prosody, the 'K' part makes the PREVIOUS syllable heavy.
-    # Akshara = C1 + H + C2 + V. 
-    # If Akshara starts with C+H+C, it implies the previous syllable takes the hit?
-    # Wait, 'Satya'. Sa is one unit. Tya is next. Tya = T+Virama+Y+a.
-    # Because Tya has a conjunct start, Sa becomes Guru.
-    def is_conjunct_start(aksh):
-        # Does it contain a Virama followed by Consonant?
-        # Specifically, check if the first part is a cluster.
-        # Actually our Akshara splitter makes 'Tya' one block.
-        # So we check if 'Tya' has a Virama inside it before the vowel.
-        return '\u0CCD' in aksh 
-
-    for i in range(len(aksharas)):
-        aksh = aksharas[i]
-        is_guru = False
-        
-        # Rule 1: Intrinsic Guru
-        if has_long_vowel_or_yogavaha(aksh):
-            is_guru = True
-            
-        # Rule 2: Positional Guru (Samyuktakshara Param)
-        # If current is Short, but next is Conjunct -> Guru
-        if not is_guru and (i + 1 < len(aksharas)):
-            next_aksh = aksharas[i+1]
-            if is_conjunct_start(next_aksh):
-                is_guru = True
-        
-        meter_pattern.append("U" if not is_guru else "-")
-        
-    return meter_pattern
+    # Not through the morphology cache: bulk callers use get_chandassu_meter.uncached
+    aksharas = analyze_morphology.uncached(text)['aksharas']
+    return [_meter_symbol(aksharas, i) for i in range(len(aksharas))]
+
+# --- Incremental re-analysis (editor tabs) ---
+
+def _common_prefix_len(a, b):
+    # Binary search on slice equality: each probe is a C-level compare
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def _common_suffix_len(a, b, limit):
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:] == b[len(b) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def _is_safe_boundary(text, i):
+    """
+    True when an akshara always starts (or a delimiter sits) at text[i] no
+    matter what precedes text[i-1]: segmentation from i onward is then
+    independent of everything before it.
+    """
+    if i <= 0 or i >= len(text):
+        return True
+    c = _CHAR_CLASSES.get(text[i], 0)
+    if not c or c & SWARA:
+        return True
+    return bool(c & VYANJANA) and not _CHAR_CLASSES.get(text[i - 1], 0) & VIRAMA
+
+class IncrementalMorphology:
+    """
+    Keeps the analysis of the last text it saw and, on update(), re-segments
+    only the edited region (widened to safe akshara boundaries on both
+    sides), then patches the akshara list, stats and meter in place.
+    Results always match analyze_morphology / get_chandassu_meter.
+
+        analyzer = IncrementalMorphology()
+        analyzer.update(text)            # full analysis the first time
+        analyzer.update(edited_text)     # only the dirty region is redone
+        analyzer.meter()
+    """
+
+    def __init__(self):
+        self.cleaned = ""
+        self.text_len = 0
+        self._aksharas = []
+        self._starts = np.zeros(0, dtype=np.int64)
+        self._stats = _segment_aksharas("")[3]
+        self._meter = []
+        self.last_region = (0, 0)  # (start, end) re-segmented by the last update, in new-text offsets
+
+    def _segment(self, text, lo, hi):
+        starts, ends, _, stats = _segment_aksharas(text[lo:hi])
+        aksharas = [text[lo + s:lo + e] for s, e in zip(starts, ends)]
+        return aksharas, np.frombuffer(starts, dtype=np.uint32).astype(np.int64) + lo, stats
+
+    def update(self, text):
+        """Analyzes `text`, reusing everything outside the edited region."""
+        old, new = self.cleaned, normalize_kannada(text)
+        self.text_len = len(text)
+        if old == new:
+            self.last_region = (0, 0)
+            return self.result()
+
+        p = _common_prefix_len(old, new)
+        s = _common_suffix_len(old, new, min(len(old), len(new)) - p)
+
+        # Left edge: a safe boundary inside the unchanged prefix (both the char
+        # and its predecessor must be unchanged, hence < p)
+        left = max(p - 1, 0)
+        while left > 0 and not _is_safe_boundary(new, left):
+            left -= 1
+
+        # Right edge: same idea inside the unchanged suffix
+        delta = len(new) - len(old)
+        right = len(new) - s + 1
+        while right < len(new) and not _is_safe_boundary(new, right):
+            right += 1
+        right = min(right, len(new))
+        right_old = right - delta
+
+        i0 = int(np.searchsorted(self._starts, left, side="left"))
+        i1 = int(np.searchsorted(self._starts, right_old, side="left"))
+        old_aksharas, _, old_stats = self._segment(old, left, right_old)
+        new_aksharas, new_starts, new_stats = self._segment(new, left, right)
+
+        self._aksharas[i0:i1] = new_aksharas
+        self._starts = np.concatenate((self._starts[:i0], new_starts, self._starts[i1:] + delta))
+        for key in self._stats:
+            self._stats[key] += new_stats[key] - old_stats[key]
+
+        # Meter symbols depend on the akshara and the one after it, so the
+        # akshara just before the region has to be redone too
+        m0 = max(i0 - 1, 0)
+        m1 = i0 + len(new_aksharas)
+        self._meter[m0:i1] = [_meter_symbol(self._aksharas, i) for i in range(m0, m1)]
+
+        self.cleaned = new
+        self.last_region = (left, right)
+        return self.result()
+
+    def result(self):
+        """Same shape as analyze_morphology()."""
+        return {
+            "aksharas": list(self._aksharas),
+            "stats": dict(self._stats),
+            "text_len": self.text_len,
+        }
+
+    def meter(self):
+        """Same as get_chandassu_meter() on the last text."""
+        return list(self._meter)
+
+    def approx_nbytes(self):
+        """
+        Approximate memory held, without walking every akshara: each one is
+        a short str (header plus its code units, which add up to the text).
+        """
+        n = len(self._aksharas)
+        return (sys.getsizeof(self) + sys.getsizeof(self.cleaned) + self._starts.nbytes
+                + sys.getsizeof(self._aksharas) + n * _STR_HEADER + 2 * len(self.cleaned)
+                + sys.getsizeof(self._meter) + approx_nbytes(self._stats))
 
 # --- 9. Script Similarity (Kannada <> Telugu) ---
 
@@ -397,6 +1096,7 @@ def calculate_script_similarity(text_kn, text_te):
 
 # --- 10. Phonetic Hash (Soundex) ---
 
+@memoize(max_entries=8192, max_bytes=2 << 20)
 def kannada_phonetic_hash(word):
     """
     Generates a phonetic code for a Kannada word.
@@ -469,6 +1169,8 @@ def kannada_phonetic_hash(word):
 
 # --- 11. Rule-Based Stemmer ---
 
+_STEM_SUFFIXES = tuple(LEXICONS["stem_suffixes"])
+
 def simple_kannada_stemmer(word):
     """
     Removes common Kannada suffixes to find the root word (Stem).
@@ -477,19 +1179,6 @@ def simple_kannada_stemmer(word):
     word = normalize_kannada(word)
     if not word: return ""
     
-    # Common Suffixes (ordered by length/priority)
-    suffixes = [
-        'ಯನ್ನು', 'ಅನ್ನು', 'ನ್ನು', # Accusative (Annu)
-        'ಯಿಂದ', 'ಇಂದ', # Instrumental (Inda)
-        'ಯಿಗೆ', 'ಇಗೆ', 'ಗೆ', 'ಕ್ಕೆ', # Dative (Ige/Ke)
-        'ಯರ', 'ಅರ', 'ರ', # Genitive (Ra)
-        'ಯಲ್ಲಿ', 'ಅಲ್ಲಿ', # Locative (Alli)
-        'ಯಾಗಿ', 'ಆಗಿ', # Adverbial (Aagi)
-        'ಗಳು', 'ಗಳ', # Plural (Galu)
-        'ಯ', 'ವು', # Misc
-        'ದ', 'ದನು', 'ದಳು', 'ದರು' # Past tense markers (light)
-    ]
-    
     # Simple iterative stripping (greedy)
     # We strip the longest matching suffix found at the end
     
@@ -497,7 +1186,7 @@ def simple_kannada_stemmer(word):
     if len(word) < 4: return word
     
     best_suffix = ""
-    for s in suffixes:
+    for s in _STEM_SUFFIXES:
         if word.endswith(s):
             if len(s) > len(best_suffix):
                 best_suffix = s
@@ -511,43 +1200,55 @@ def simple_kannada_stemmer(word):
 
 # --- 12. Markov Chain Generator (Vachana) ---
 
+def _fits_meter(target, pos, prev_last, sig):
+    """
+    Can a word with signature `sig` follow at akshara `pos` of the target
+    meter? `prev_last` is the previous word's final symbol ("" at line start),
+    which a conjunct at the start of this word turns Guru. This word's own
+    final symbol is only checked when it is Guru; a Laghu may still flip.
+    """
+    symbols, conjunct = sig
+    end = pos + len(symbols)
+    if end > len(target):
+        return False
+    if prev_last and ("-" if conjunct else prev_last) != target[pos - 1]:
+        return False
+    return symbols[:-1] == target[pos:end - 1] and (symbols[-1] == "U" or target[end - 1] == "-")
+
 class MarkovGenerator:
     def __init__(self):
         self.chain = {}
-        self.corpus = [
-            "ಕಲಿತರೆ ಕಲಿಯಬೇಕು ಕಲಿತು ಅನ್ಯರಿಗೆ ಕಲಿಸಬೇಕು", # Learn and teach
-            "ನುಡಿದರೆ ಮುತ್ತಿನ ಹಾರದಂತಿರಬೇಕು", # Basavanna
-            "ನುಡಿದರೆ ಮಾಣಿಕ್ಯದ ದೀಪ್ತಿಯಂತಿರಬೇಕು",
-            "ನುಡಿದರೆ ಸ್ಫಟಿಕದ ಶಲಾಕೆಯಂತಿರಬೇಕು",
-            "ನುಡಿದರೆ ಲಿಂಗ ಮೆಚ್ಚಿ ಅಹುದಹುದೆನ್ನಬೇಕು",
-            "ಇವನಾರವ ಇವನಾರವ ಇವನಾರವನೆಂದೆನಿಸದಿರಯ್ಯಾ", # Basavanna
-            "ಇವ ನಮ್ಮವ ಇವ ನಮ್ಮವ ಇವ ನಮ್ಮವನೆಂದೆನಿಸಯ್ಯಾ",
-            "ಆಚಾರವಿಲ್ಲದ ನಾಲಿಗೆ ನಿನ್ನ ನೀಚ ಗುಣವ ಬಿಡು", # Purandara Dasa
-            "ಮಾನವ ಜನ್ಮ ದೊಡ್ಡದು ಇದ ಹಾನಿ ಮಾಡಲು ಬೇಡಿ ಹುಚ್ಚಪ್ಪಗಳಿರ",
-            "ದಯವಿಲ್ಲದ ಧರ್ಮವದೇವುದಯ್ಯಾ",
-            "ದಯವೇ ಧರ್ಮದ ಮೂಲವಯ್ಯಾ"
-        ]
+        self.starts = Counter()  # first word of each training line
+        self._version = 0
+        self._meter_cache = None
+        # Vachana lines from lexicons/vachana_corpus.txt (a sequence over the bundle)
+        self.corpus = LEXICONS["vachana_corpus"]
         self.train()
         
-    def train(self):
-        for text in self.corpus:
+    def train(self, lines=None):
+        # Adds `lines` (any iterable of str, e.g. CorpusStore.iter_lines()) to the chain
+        for text in (self.corpus if lines is None else lines):
             tokens = text.split()
+            if tokens:
+                self.starts[tokens[0]] += 1
             for i in range(len(tokens) - 1):
                 word = tokens[i]
                 next_word = tokens[i+1]
                 if word not in self.chain:
                     self.chain[word] = []
                 self.chain[word].append(next_word)
+        self._version += 1
                 
-    def generate(self, start_word="ನುಡಿದರೆ", length=10):
-        # Normalize start
+    def generate(self, start_word="ನುಡಿದರೆ", length=10, rng=None):
+        # rng: a random.Random for reproducible output (default: the module RNG)
+        rng = rng or random
         current = start_word
         result = [current]
         
         for _ in range(length):
             if current in self.chain:
                 possible_next = self.chain[current]
-                next_w = random.choice(possible_next)
+                next_w = rng.choice(possible_next)
                 result.append(next_w)
                 current = next_w
             else:
@@ -558,8 +1259,92 @@ class MarkovGenerator:
                 
         return " ".join(result)
 
-# Singleton instance for easy import
-markov_gen = MarkovGenerator()
+    def _meter_index(self):
+        """
+        (signatures, successors, starts) for metered generation, rebuilt after
+        train(). A signature is (Laghu/Guru string of the word on its own,
+        starts with a conjunct); successors and starts carry log-probabilities.
+        Words without aksharas (punctuation) are left out.
+        """
+        if self._meter_cache is None or self._meter_cache[0] != self._version:
+            vocab = set(self.chain) | set(self.starts)
+            for nxt in self.chain.values():
+                vocab.update(nxt)
+            sigs = {}
+            for word in vocab:
+                aksharas = analyze_morphology.uncached(word)['aksharas']
+                if aksharas:
+                    symbols = "".join(_meter_symbol(aksharas, i) for i in range(len(aksharas)))
+                    sigs[word] = (symbols, _is_conjunct_start(aksharas[0]))
+            succ = {}
+            for word, nxt in self.chain.items():
+                succ[word] = [(w, math.log(c / len(nxt))) for w, c in Counter(nxt).items() if w in sigs]
+            total = sum(self.starts.values())
+            starts = [(w, math.log(c / total)) for w, c in self.starts.items() if w in sigs]
+            self._meter_cache = (self._version, sigs, succ, starts)
+        return self._meter_cache[1:]
+
+    def generate_metered(self, meter, start_word=None, count=5, beam_width=16, temperature=1.0, rng=None):
+        """
+        Lines whose get_chandassu_meter() is exactly `meter` (a list of U/-
+        symbols or a string like "U-U--"), by beam search over the chain.
+
+        Every word is matched against the pattern through its precomputed
+        meter signature, and a partial line is only kept if the rest of the
+        pattern can still be completed from its last word (an exact
+        reachability table per call), so beams never run into dead ends.
+        Scores are transition log-probabilities plus Gumbel noise scaled by
+        `temperature` (0 = deterministic best lines). Returns up to `count`
+        distinct lines, best first; [] when the chain can't produce the meter.
+
+            meter = get_chandassu_meter("ನುಡಿದರೆ ಮುತ್ತಿನ ಹಾರದಂತಿರಬೇಕು")
+            markov_gen.generate_metered(meter, count=3)
+        """
+        target = "".join(meter).replace(" ", "")
+        if not target or set(target) - {"U", "-"}:
+            raise ValueError(f"meter must be a sequence of 'U' and '-', got {meter!r}")
+        sigs, succ, starts = self._meter_index()
+        rng = rng or random
+        n = len(target)
+        reachable = {}
 
+        def finishable(pos, word):
+            # Can target[pos:] be completed after `word`?
+            key = (pos, word)
+            ok = reachable.get(key)
+            if ok is None:
+                last = sigs[word][0][-1]
+                ok = (pos == n and last == target[-1]) or any(
+                    _fits_meter(target, pos, last, sigs[w]) and finishable(pos + len(sigs[w][0]), w)
+                    for w, _ in succ.get(word, ()))
+                reachable[key] = ok
+            return ok
 
+        def noise():
+            return -temperature * math.log(-math.log(max(rng.random(), 1e-12))) if temperature else 0.0
 
+        seeds = starts if start_word is None else [(start_word, 0.0)] if start_word in sigs else []
+        beams = []
+        for word, logp in seeds:
+            pos = len(sigs[word][0])
+            if _fits_meter(target, 0, "", sigs[word]) and finishable(pos, word):
+                beams.append((logp + noise(), (word,), pos))
+        finished = {}
+        while beams:
+            candidates = []
+            for score, words, pos in beams:
+                if pos == n:
+                    line = " ".join(words)
+                    finished[line] = max(score, finished.get(line, -math.inf))
+                    continue
+                last = sigs[words[-1]][0][-1]
+                for word, logp in succ.get(words[-1], ()):
+                    sig = sigs[word]
+                    if _fits_meter(target, pos, last, sig) and finishable(pos + len(sig[0]), word):
+                        candidates.append((score + logp + noise(), words + (word,), pos + len(sig[0])))
+            candidates.sort(key=lambda c: c[0], reverse=True)
+            beams = candidates[:beam_width]
+        return sorted(finished, key=finished.get, reverse=True)[:count]
+
+# Singleton instance for easy import
+markov_gen = MarkovGenerator()
@@ -0,0 +1,228 @@
+"""
+Opt-in hot-path instrumentation for nlp_utils and analyze_scripts.
+
+Nothing is wrapped until enable() is called (or KANNADA_PERF=1 is set and
+enable_from_env() runs), so the disabled cost is exactly zero: the modules keep
+their original function objects. Once enabled, every public function is
+replaced by a thin timing wrapper that records call counts, errors, a
+log-bucketed latency histogram (for p50/p95/p99) and input sizes. Cache hit
+rates are read from the wrapped function's cache_info() when it has one.
+
+    import perf_monitor
+    perf_monitor.enable()
+    ...
+    print(perf_monitor.dump_json())
+"""
+
+import bisect
+import inspect
+import json
+import os
+import threading
+import time
+
+import analyze_scripts
+import nlp_utils
+
+ENV_FLAG = "KANNADA_PERF"
+MONITORED_MODULES = [nlp_utils, analyze_scripts]
+# Per-character predicates called from inside the morphology loop; wrapping
+# them would mostly time the wrapper itself
+SKIP_FUNCTIONS = {"is_vowel", "is_consonant", "is_matra", "is_virama", "is_yogavaha"}
+
+# Geometric latency buckets: 4 per octave from 1 µs up to ~70 s
+BUCKET_EDGES_NS = [int(1000 * 2 ** (i / 4)) for i in range(4 * 26 + 1)]
+
+_lock = threading.Lock()
+_stats = {}
+_originals = {}  # (module, attr) -> original object
+_cache_sources = {
+    # Functions whose cache lives on a helper object rather than on themselves
+    "nlp_utils.basic_translate_en_kn": lambda: nlp_utils.en_kn_translator.translate.cache_info(),
+}
+
+class FunctionStats:
+    """Counters and histograms for one instrumented function."""
+
+    __slots__ = ("name", "calls", "errors", "total_ns", "max_ns", "buckets",
+                 "input_total", "input_max", "cache_info")
+
+    def __init__(self, name, cache_info=None):
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * (len(BUCKET_EDGES_NS) + 1)
+        self.input_total = 0
+        self.input_max = 0
+        self.cache_info = cache_info
+
+    def record(self, elapsed_ns, size, failed):
+        idx = bisect.bisect_left(BUCKET_EDGES_NS, elapsed_ns)
+        with _lock:
+            self.calls += 1
+            self.total_ns += elapsed_ns
+            if elapsed_ns > self.max_ns:
+                self.max_ns = elapsed_ns
+            self.buckets[idx] += 1
+            self.input_total += size
+            if size > self.input_max:
+                self.input_max = size
+            if failed:
+                self.errors += 1
+
+    def percentile(self, q):
+        """Upper edge (in ms) of the bucket holding the q-th quantile."""
+        if not self.calls:
+            return None
+        target = q * self.calls
+        seen = 0
+        for idx, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                edge = BUCKET_EDGES_NS[idx] if idx < len(BUCKET_EDGES_NS) else self.max_ns
+                return min(edge, self.max_ns) / 1e6
+        return self.max_ns / 1e6
+
+    def to_dict(self):
+        out = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": self.total_ns / 1e6,
+            "mean_ms": self.total_ns / self.calls / 1e6 if self.calls else None,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ns / 1e6,
+            "mean_input_size": self.input_total / self.calls if self.calls else None,
+            "max_input_size": self.input_max,
+        }
+        if self.cache_info is not None:
+            try:
+                info = self.cache_info()
+                lookups = info.hits + info.misses
+                out["cache_hits"] = info.hits
+                out["cache_misses"] = info.misses
+                out["cache_hit_rate"] = info.hits / lookups if lookups else None
+                if hasattr(info, "evictions"):
+                    out["cache_evictions"] = info.evictions
+            except Exception:
+                pass
+        return out
+
+def _input_size(args, kwargs):
+    # Size of the first text-like argument (chars for str, items for sequences)
+    for value in args or kwargs.values():
+        try:
+            return len(value)
+        except TypeError:
+            return 0
+    return 0
+
+def _make_wrapper(func, stats):
+    perf_counter_ns = time.perf_counter_ns
+
+    def wrapper(*args, **kwargs):
+        failed = True
+        t0 = perf_counter_ns()
+        try:
+            result = func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            stats.record(perf_counter_ns() - t0, _input_size(args, kwargs), failed)
+
+    wrapper.__name__ = func.__name__
+    wrapper.__qualname__ = func.__qualname__
+    wrapper.__doc__ = func.__doc__
+    wrapper.__wrapped__ = func
+    if hasattr(func, "cache_info"):
+        wrapper.cache_info = func.cache_info
+    if hasattr(func, "uncached"):
+        wrapper.uncached = func.uncached
+    return wrapper
+
+def public_functions(module):
+    """Public functions defined in `module` itself (not imported names)."""
+    return [
+        name for name, obj in vars(module).items()
+        if not name.startswith("_") and inspect.isfunction(obj) and obj.__module__ == module.__name__
+    ]
+
+def _instrument(owner, attr, qualname):
+    func = getattr(owner, attr)
+    cache_info = _cache_sources.get(qualname) or getattr(func, "cache_info", None)
+    stats = _stats.get(qualname)
+    if stats is None:
+        stats = _stats[qualname] = FunctionStats(qualname, cache_info)
+    _originals[(owner, attr)] = func
+    setattr(owner, attr, _make_wrapper(func, stats))
+
+def is_enabled():
+    return bool(_originals)
+
+def enable():
+    """Wraps every public nlp_utils/analyze_scripts function. Idempotent."""
+    with _lock:
+        _enable_locked()
+
+def _enable_locked():
+    # The whole wrap runs under _lock so concurrent callers can't wrap twice
+    # (and leave wrappers in _originals)
+    if _originals:
+        return
+    for module in MONITORED_MODULES:
+        for name in public_functions(module):
+            if name in SKIP_FUNCTIONS:
+                continue
+            _instrument(module, name, f"{module.__name__}.{name}")
+    # The Markov singleton is the one stateful entry point the app calls
+    _instrument(nlp_utils.markov_gen, "generate", "nlp_utils.markov_gen.generate")
+
+def disable():
+    """Restores the original functions; recorded stats are kept."""
+    with _lock:
+        _disable_locked()
+
+def _disable_locked():
+    for (owner, attr), func in list(_originals.items()):
+        if owner is nlp_utils.markov_gen:
+            # Drop the instance attribute so the class method shows through again
+            vars(owner).pop(attr, None)
+        else:
+            setattr(owner, attr, func)
+    _originals.clear()
+
+def enable_from_env():
+    """Enables instrumentation when KANNADA_PERF is set to 1/true/yes."""
+    if os.environ.get(ENV_FLAG, "").lower() in ("1", "true", "yes"):
+        enable()
+    return is_enabled()
+
+def reset():
+    """Clears all recorded stats."""
+    with _lock:
+        _stats.clear()
+        if _originals:
+            # Re-wrap so the wrappers point at fresh stats objects
+            _disable_locked()
+            _enable_locked()
+
+def snapshot():
+    """Returns {qualified function name: stats dict} for every function called so far."""
+    with _lock:
+        items = list(_stats.items())
+    return {name: stats.to_dict() for name, stats in sorted(items) if stats.calls}
+
+def dump_json(path=None):
+    """Machine-readable dump of snapshot(); written to `path` when given."""
+    payload = json.dumps({
+        "enabled": is_enabled(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "functions": snapshot(),
+    }, indent=2, ensure_ascii=False)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(payload)
+    return payload
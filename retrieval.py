@@ -0,0 +1,403 @@
+"""
+Inverted-index passage retrieval with BM25 ranking.
+
+Terms are produced by the nlp_utils pipeline: normalize_kannada, stopword
+removal, then simple_kannada_stemmer, so "ಮನೆಯಲ್ಲಿ" and "ಮನೆಗೆ" meet on one
+term. Every Kannada token also gets a "#" + kannada_phonetic_hash term,
+which queries can opt into to catch spelling variants.
+
+Postings are stored per term as one varint blob (doc-id gaps, then term
+frequencies), encoded and decoded with NumPy. Documents are added to an
+in-memory buffer and flushed as immutable segments; an index directory is
+just those segments plus a manifest, so building is incremental and a
+reopened index picks up where it left off. BM25 statistics (N, avgdl, df)
+are combined across segments at query time.
+
+    index = RetrievalIndex("chat_index")          # or RetrievalIndex() in memory
+    index.add(["ಕಾಯಕವೇ ಕೈಲಾಸ", ("ದಯವೇ ಧರ್ಮದ ಮೂಲವಯ್ಯಾ", "vachana")])
+    index.commit()
+    index.search("ಕಾಯಕ", k=5)
+
+From the shell (one passage per line; the file name becomes the source):
+    python retrieval.py index vachanas.txt proverbs.txt --index chat_index
+    python retrieval.py search "ಕಾಯಕ" --index chat_index
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import Counter, namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+import nlp_utils
+from file_utils import atomic_write
+
+FORMAT_VERSION = 1
+BM25_K1 = 1.2
+BM25_B = 0.75
+PHONETIC_PREFIX = "#"
+DEFAULT_FLUSH_DOCS = 50_000
+DEFAULT_INDEX = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chat_index")
+
+Hit = namedtuple("Hit", "doc_id score text source")
+
+_TOKEN_RE = re.compile(r"[\w\u0c80-\u0cff]+")
+
+# --- Analysis ---
+
+def analyze(text, phonetic=True):
+    """Index terms of a passage or query, in order (duplicates kept)."""
+    # Strip punctuation first so "ಮತ್ತು," still counts as a stopword
+    words = " ".join(_TOKEN_RE.findall(nlp_utils.normalize_kannada(text).lower()))
+    terms = []
+    for token in nlp_utils.preprocess_text(words, remove_stopwords=True):
+        if not token:
+            continue
+        stem, sound = _token_terms(token)
+        terms.append(stem)
+        if phonetic and sound:
+            terms.append(sound)
+    return terms
+
+@lru_cache(maxsize=1 << 16)
+def _token_terms(token):
+    # Corpus vocabularies are Zipfian, so most tokens hit this cache while indexing
+    sound = None
+    if any('\u0c80' <= ch <= '\u0cff' for ch in token):
+        sound = PHONETIC_PREFIX + nlp_utils.kannada_phonetic_hash(token)
+    return nlp_utils.simple_kannada_stemmer(token), sound
+
+# --- Varint coding ---
+
+def _varint_sizes(values):
+    nbytes = np.ones(len(values), dtype=np.int64)
+    for shift in range(7, 64, 7):
+        nbytes += values >= (np.uint64(1) << np.uint64(shift))
+    return nbytes
+
+def encode_varints(values):
+    """LEB128-style varints for a non-negative integer array, as uint8."""
+    values = np.asarray(values, dtype=np.uint64)
+    if not len(values):
+        return np.zeros(0, dtype=np.uint8)
+    nbytes = _varint_sizes(values)
+    pos = np.concatenate(([0], np.cumsum(nbytes)[:-1]))
+    out = np.empty(int(nbytes.sum()), dtype=np.uint8)
+    for j in range(int(nbytes.max())):
+        live = nbytes > j
+        byte = (values[live] >> np.uint64(7 * j)) & np.uint64(0x7F)
+        more = (nbytes[live] > j + 1).astype(np.uint64) << np.uint64(7)
+        out[pos[live] + j] = (byte | more).astype(np.uint8)
+    return out
+
+def decode_varints(buf):
+    """Inverse of encode_varints (uint64 array)."""
+    buf = np.asarray(buf, dtype=np.uint8)
+    ends = np.flatnonzero(buf < 0x80)
+    values = buf[ends].astype(np.uint64)
+    if len(ends) == len(buf):
+        return values  # all single-byte, the common case for gaps and tfs
+    lengths = np.diff(ends, prepend=-1)
+    # Fold in the lower-order bytes, walking back from each value's last byte
+    for j in range(1, int(lengths.max())):
+        live = np.flatnonzero(lengths > j)
+        low = (buf[ends[live] - j] & 0x7F).astype(np.uint64)
+        values[live] = (values[live] << np.uint64(7)) | low
+    return values
+
+# --- Segments ---
+
+class Segment:
+    """An immutable batch of documents with its own term dictionary and postings."""
+
+    def __init__(self, terms, post_offsets, dfs, postings, doc_lens, doc_offsets, doc_blob, sources):
+        self.terms = terms
+        self.term_index = {t: i for i, t in enumerate(terms)}
+        self.post_offsets = post_offsets
+        self.dfs = dfs
+        self.postings = postings
+        self.doc_lens = doc_lens
+        self.doc_offsets = doc_offsets
+        self.doc_blob = doc_blob
+        self.sources = sources
+        self.total_len = float(doc_lens.sum())
+
+    def __len__(self):
+        return len(self.doc_lens)
+
+    @classmethod
+    def build(cls, docs):
+        """docs: list of (text, source, terms)."""
+        vocab = {}
+        term_ids, doc_ids, tfs = [], [], []
+        doc_lens = np.zeros(len(docs), dtype=np.uint32)
+        for d, (_, _, terms) in enumerate(docs):
+            doc_lens[d] = len(terms)
+            for term, tf in Counter(terms).items():
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                doc_ids.append(d)
+                tfs.append(tf)
+
+        # Renumber terms in sorted order, then lay every term's postings out as
+        # [doc gaps..., tfs...] in one array and varint-encode it in one go
+        terms = sorted(vocab)
+        rank = np.zeros(len(vocab), dtype=np.int64)
+        rank[[vocab[t] for t in terms]] = np.arange(len(terms))
+        tid = rank[np.asarray(term_ids, dtype=np.int64)]
+        doc = np.asarray(doc_ids, dtype=np.uint64)
+        tf = np.asarray(tfs, dtype=np.uint64)
+        order = np.lexsort((doc, tid))
+        tid, doc, tf = tid[order], doc[order], tf[order]
+        dfs = np.bincount(tid, minlength=len(terms)).astype(np.uint32)
+        first = np.concatenate(([True], tid[1:] != tid[:-1])) if len(tid) else np.zeros(0, dtype=bool)
+        gaps = doc - np.where(first, np.uint64(0), np.concatenate(([np.uint64(0)], doc[:-1])))
+
+        kind = np.concatenate((np.zeros(len(tid), np.int8), np.ones(len(tid), np.int8)))
+        owner = np.concatenate((tid, tid))
+        layout = np.lexsort((kind, owner)) if len(owner) else np.zeros(0, dtype=np.int64)
+        values = np.concatenate((gaps, tf))[layout]
+        blob = encode_varints(values)
+        sizes = np.bincount(owner[layout], weights=_varint_sizes(values), minlength=len(terms))
+        post_offsets = np.concatenate(([0], np.cumsum(sizes))).astype(np.int64)
+
+        texts = [t.encode("utf-8") for t, _, _ in docs]
+        doc_offsets = np.concatenate(([0], np.cumsum([len(t) for t in texts]))).astype(np.int64)
+        doc_blob = np.frombuffer(b"".join(texts), dtype=np.uint8)
+        return cls(terms, post_offsets, dfs, blob, doc_lens, doc_offsets, doc_blob, [s for _, s, _ in docs])
+
+    def postings_for(self, term):
+        """(local doc ids, term frequencies) for `term`, or None."""
+        i = self.term_index.get(term)
+        if i is None:
+            return None
+        df = int(self.dfs[i])
+        values = decode_varints(self.postings[self.post_offsets[i]:self.post_offsets[i + 1]])
+        return np.cumsum(values[:df]).astype(np.int64), values[df:].astype(np.float64)
+
+    def df(self, term):
+        i = self.term_index.get(term)
+        return 0 if i is None else int(self.dfs[i])
+
+    def text(self, local_id):
+        return bytes(self.doc_blob[self.doc_offsets[local_id]:self.doc_offsets[local_id + 1]]).decode("utf-8")
+
+    def save(self, path):
+        """Writes the segment to `path` (.npz) atomically."""
+        with atomic_write(path, prefix=".segment-") as f:
+            np.savez(
+                f,
+                terms=np.frombuffer("\n".join(self.terms).encode("utf-8"), dtype=np.uint8),
+                post_offsets=self.post_offsets, dfs=self.dfs, postings=self.postings,
+                doc_lens=self.doc_lens, doc_offsets=self.doc_offsets, doc_blob=self.doc_blob,
+                sources=np.frombuffer("\n".join(self.sources).encode("utf-8"), dtype=np.uint8),
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            terms = data["terms"].tobytes().decode("utf-8").split("\n") if len(data["terms"]) else []
+            n_docs = len(data["doc_lens"])
+            sources = data["sources"].tobytes().decode("utf-8").split("\n") if n_docs else []
+            return cls(terms, data["post_offsets"], data["dfs"], data["postings"], data["doc_lens"],
+                       data["doc_offsets"], data["doc_blob"], sources)
+
+# --- Index ---
+
+class RetrievalIndex:
+    """
+    Segmented BM25 index. With a `path`, commit() writes each new segment
+    to that directory and updates manifest.json atomically; without one the
+    index lives in memory.
+    """
+
+    def __init__(self, path=None, flush_docs=DEFAULT_FLUSH_DOCS):
+        self.path = path
+        self.flush_docs = flush_docs
+        self.segments = []
+        self._names = []   # segment file names, parallel to self.segments
+        self._bases = []   # global id of each segment's first document
+        self._buffer = []  # (text, source, terms) not yet in a segment
+        self._buffer_segment = None
+        if path:
+            os.makedirs(path, exist_ok=True)
+            manifest = os.path.join(path, "manifest.json")
+            if os.path.exists(manifest):
+                with open(manifest, encoding="utf-8") as f:
+                    meta = json.load(f)
+                if meta["format_version"] != FORMAT_VERSION:
+                    raise ValueError(f"unsupported index format in {path}")
+                for name in meta["segments"]:
+                    self._append_segment(Segment.load(os.path.join(path, name)), name)
+
+    def _append_segment(self, segment, name=None):
+        self._bases.append(self.n_committed)
+        self.segments.append(segment)
+        self._names.append(name)
+
+    def _persist(self, segment):
+        # New file names keep counting up, so a merged segment never
+        # overwrites one the current manifest still points at
+        used = [int(n[4:9]) for n in self._names if n]
+        name = f"seg_{max(used, default=0) + 1:05d}.npz"
+        segment.save(os.path.join(self.path, name))
+        return name
+
+    @property
+    def n_committed(self):
+        return sum(len(s) for s in self.segments)
+
+    def __len__(self):
+        return self.n_committed + len(self._buffer)
+
+    def add(self, passages):
+        """
+        Adds passages (str or (text, source) pairs). Returns their global ids.
+        Flushes a segment automatically every `flush_docs` documents.
+        """
+        ids = []
+        for item in passages:
+            text, source = (item, "") if isinstance(item, str) else item
+            ids.append(len(self))
+            self._buffer.append((text, source or "", analyze(text)))
+            if len(self._buffer) >= self.flush_docs:
+                self.commit()
+        self._buffer_segment = None
+        return ids
+
+    def commit(self):
+        """Turns the buffer into a segment (persisted when the index has a path)."""
+        if not self._buffer:
+            return
+        segment = Segment.build(self._buffer)
+        self._buffer = []
+        self._buffer_segment = None
+        name = self._persist(segment) if self.path else None
+        self._append_segment(segment, name)
+        if self.path:
+            self._write_manifest()
+
+    def _write_manifest(self):
+        payload = json.dumps({"format_version": FORMAT_VERSION, "segments": self._names, "documents": self.n_committed})
+        with atomic_write(os.path.join(self.path, "manifest.json"), "w", "utf-8", ".manifest-") as f:
+            f.write(payload)
+
+    def _views(self):
+        # Committed segments plus a (cached) segment over the uncommitted buffer
+        views = list(zip(self._bases, self.segments))
+        if self._buffer:
+            if self._buffer_segment is None:
+                self._buffer_segment = Segment.build(self._buffer)
+            views.append((self.n_committed, self._buffer_segment))
+        return views
+
+    def get(self, doc_id):
+        """(text, source) of a global document id."""
+        for base, segment in reversed(self._views()):
+            if doc_id >= base:
+                local = doc_id - base
+                return segment.text(local), segment.sources[local]
+        raise IndexError(doc_id)
+
+    def search(self, query, k=5, phonetic=False, phonetic_weight=0.3):
+        """
+        Top-k Hits by BM25. With phonetic=True, phonetic-hash terms of the
+        query also match, at `phonetic_weight` of a normal term.
+        """
+        weights = Counter()
+        for term in analyze(query, phonetic=phonetic):
+            weights[term] += phonetic_weight if term.startswith(PHONETIC_PREFIX) else 1.0
+        views = self._views()
+        n_docs = sum(len(s) for _, s in views)
+        if not weights or not n_docs or k <= 0:
+            return []
+        avgdl = max(sum(s.total_len for _, s in views) / n_docs, 1e-9)
+
+        doc_parts, score_parts = [], []
+        for term, qweight in weights.items():
+            df = sum(s.df(term) for _, s in views)
+            if not df:
+                continue
+            idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for base, segment in views:
+                found = segment.postings_for(term)
+                if found is None:
+                    continue
+                local, tf = found
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * segment.doc_lens[local] / avgdl)
+                doc_parts.append(local + base)
+                score_parts.append(qweight * idf * tf * (BM25_K1 + 1) / (tf + norm))
+        if not doc_parts:
+            return []
+
+        hits = np.concatenate(doc_parts)
+        contributions = np.concatenate(score_parts)
+        if len(hits) * 8 > n_docs:
+            # Common terms: a dense accumulator beats sorting the postings
+            dense = np.bincount(hits, weights=contributions, minlength=n_docs)
+            docs = np.flatnonzero(dense)
+            scores = dense[docs]
+        else:
+            docs, inverse = np.unique(hits, return_inverse=True)
+            scores = np.bincount(inverse, weights=contributions)
+        top = np.arange(len(scores))
+        if len(scores) > k:
+            # Everything tied with the k-th score stays in, so ties break by doc id
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            top = np.flatnonzero(scores >= kth)
+        top = top[np.lexsort((docs[top], -scores[top]))][:k]
+        return [Hit(int(docs[i]), float(scores[i]), *self.get(int(docs[i]))) for i in top]
+
+    def merge_segments(self):
+        """Rewrites all committed segments as one (fewer segments = faster queries)."""
+        if len(self.segments) < 2:
+            return
+        docs = []
+        for segment in self.segments:
+            for local in range(len(segment)):
+                text = segment.text(local)
+                docs.append((text, segment.sources[local], analyze(text)))
+        merged = Segment.build(docs)
+        name = self._persist(merged) if self.path else None
+        old = [n for n in self._names if n]
+        self.segments, self._names, self._bases = [], [], []
+        self._append_segment(merged, name)
+        if self.path:
+            self._write_manifest()
+            for stale in old:
+                os.remove(os.path.join(self.path, stale))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the BM25 passage index.")
+    parser.add_argument("--index", default=DEFAULT_INDEX, help="Index directory.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("index", help="Add the lines of text files as passages (one new segment per run).")
+    add.add_argument("files", nargs="+")
+    add.add_argument("--merge", action="store_true", help="Merge all segments afterwards.")
+    search = sub.add_parser("search", help="Print the top passages for a query.")
+    search.add_argument("query")
+    search.add_argument("-k", type=int, default=5)
+    search.add_argument("--phonetic", action="store_true", help="Also match phonetic variants.")
+    args = parser.parse_args(argv)
+
+    index = RetrievalIndex(args.index)
+    if args.command == "index":
+        before = len(index)
+        for path in args.files:
+            source = os.path.splitext(os.path.basename(path))[0]
+            with open(path, encoding="utf-8") as f:
+                index.add((line.strip(), source) for line in f if line.strip() and not line.startswith("#"))
+        index.commit()
+        if args.merge:
+            index.merge_segments()
+        print(f"Added {len(index) - before} passages; {len(index)} in {len(index.segments)} segment(s) at {args.index}")
+    else:
+        for hit in index.search(args.query, k=args.k, phonetic=args.phonetic):
+            print(f"{hit.score:7.3f}  [{hit.source}]  {hit.text}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
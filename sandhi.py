@@ -0,0 +1,278 @@
+"""
+Sandhi / compound splitting for Kannada.
+
+A word is split by a Viterbi search over its akshara positions: every piece
+must be a path through a trie of base words (lexicons/sandhi_words.tsv plus
+the dictionary and sentiment words), and at each junction the sandhi rules
+are undone -- the akshara where two words fused is rewritten back into the
+end of the left word and the start of the right one:
+
+    lopa     ನಾ  -> ...ನು | ಆ...     (ಇವನು + ಆರವ -> ಇವನಾರವ)
+    savarna  ವಾ  -> ...ವ  | ಆ...     (ದೇವ + ಆಲಯ -> ದೇವಾಲಯ)
+    guna     ರ್ಯೋ -> ...ರ್ಯ | ಉ...    (ಸೂರ್ಯ + ಉದಯ -> ಸೂರ್ಯೋದಯ)
+    agama    ಯ/ವ are inserted glides (ಮನೆ + ಅಲ್ಲಿ -> ಮನೆಯಲ್ಲಿ)
+    adesha   ಗ/ದ/ಬ/ಡ were ಕ/ತ/ಪ/ಟ   (ಮಳೆ + ಕಾಲ -> ಮಳೆಗಾಲ)
+
+Words cost -log(frequency), rules add a small penalty and unknown stretches
+a large per-akshara one, so the cheapest path is the most plausible split.
+Subproblems (akshara position, pending start of the next word) are memoized
+within a word, and whole words are memoized across calls, so pre-splitting a
+corpus only searches each distinct word once.
+
+    split_word("ಇವನಾರವನೆಂದೆನಿಸದಿರಯ್ಯಾ")  # ('ಇವನು', 'ಆರವನು', 'ಎಂದು', 'ಎನಿಸದಿರು', 'ಅಯ್ಯಾ')
+    splitter.segment("ಮಳೆಗಾಲ")           # Split(parts=('ಮಳೆ', 'ಕಾಲ'), joins=('adesha',), cost=...)
+
+    python sandhi.py ಇವನಾರವನೆಂದೆನಿಸದಿರಯ್ಯಾ
+    python sandhi.py -f corpus.txt -o corpus.split.txt
+    python kn_pipeline.py corpus.txt --stages normalize,sandhi --workers 8
+"""
+
+import argparse
+import math
+import re
+import sys
+from collections import namedtuple
+
+import nlp_utils
+from nlp_utils import LEXICONS, SWARA
+
+Split = namedtuple("Split", "parts joins cost")
+
+OOV_BASE = 10.0         # per unknown piece
+OOV_PER_AKSHARA = 4.0   # plus this per akshara in it
+MIN_OOV_AKSHARAS = 2    # shorter unknown pieces are only allowed as the whole word
+MAX_AKSHARAS = 40       # longer runs (scraped text without spaces) are left whole
+
+_WORD_RE = re.compile(r"[ಀ-೿]+")
+_END = ""  # trie key holding a word's cost
+
+# Vowel sign -> the independent vowel it stands for ("" is the inherent a)
+_VOWELS = {
+    "": "ಅ", "ಾ": "ಆ", "ಿ": "ಇ", "ೀ": "ಈ", "ು": "ಉ", "ೂ": "ಊ", "ೃ": "ಋ",
+    "ೆ": "ಎ", "ೇ": "ಏ", "ೈ": "ಐ", "ೊ": "ಒ", "ೋ": "ಓ", "ೌ": "ಔ",
+}
+_YOGAVAHAS = "ಂಃ"
+
+# Lopa: the left word's final vowel is dropped and the right word's initial
+# vowel rides on its consonant. (dropped sign, cost)
+_LOPA = (("ು", 0.5), ("", 1.0), ("ೆ", 1.5), ("ಿ", 2.0))
+
+# Surface sign -> (left word's final sign, right word's initial vowel, rule, cost)
+_MERGES = {
+    "ಾ": (("", "ಅ", "savarna", 1.0), ("ಾ", "ಅ", "savarna", 1.5), ("ಾ", "ಆ", "savarna", 1.5)),
+    "ೀ": (("ಿ", "ಇ", "savarna", 1.0), ("ಿ", "ಈ", "savarna", 1.5), ("ೀ", "ಇ", "savarna", 1.5)),
+    "ೂ": (("ು", "ಉ", "savarna", 1.0), ("ು", "ಊ", "savarna", 1.5), ("ೂ", "ಉ", "savarna", 1.5)),
+    "ೇ": (("", "ಇ", "guna", 1.5), ("", "ಈ", "guna", 1.5), ("ಾ", "ಇ", "guna", 1.5)),
+    "ೋ": (("", "ಉ", "guna", 1.5), ("", "ಊ", "guna", 1.5), ("ಾ", "ಉ", "guna", 1.5)),
+    "ೈ": (("", "ಏ", "vriddhi", 2.0), ("", "ಐ", "vriddhi", 2.0)),
+    "ೌ": (("", "ಓ", "vriddhi", 2.0), ("", "ಔ", "vriddhi", 2.0)),
+}
+
+# Agama: glide inserted between two vowels -> the left word's possible endings
+_AGAMA = {
+    "ಯ": frozenset("ಿೀೆೇೈಇಈಎಏಐ"),
+    "ವ": frozenset("ುೂೊೋೌಉಊಒಓಔಾಆಅ") | {""},  # "" = ends in a consonant (inherent a)
+}
+_AGAMA_COST = 0.5
+
+# Adesha: surface consonant -> the consonant it replaced at the start of the right word
+_ADESHA = {"ಗ": "ಕ", "ದ": "ತ", "ಬ": "ಪ", "ಡ": "ಟ"}
+_ADESHA_COST = 1.5
+
+def _final_sign(word):
+    # Vowel sign / independent vowel the word ends in, "" for inherent a
+    last = word[-1]
+    return last if last in _AGAMA["ವ"] or last in _AGAMA["ಯ"] else ""
+
+def default_words():
+    """{word: count} from the sandhi table, plus dictionary and sentiment words at count 1."""
+    words = {word: int(count) for word, count in LEXICONS["sandhi_words"]}
+    extra = [kn for _, kn in LEXICONS["en_kn"]] + [word for word, _ in LEXICONS["sentiment"]]
+    for word in extra:
+        if " " not in word:
+            words.setdefault(word, 1)
+    return words
+
+class SandhiSplitter:
+    """
+    Splits words into lexicon words by undoing sandhi. `words` maps each base
+    word to a frequency (default: default_words()).
+    """
+
+    def __init__(self, words=None):
+        words = default_words() if words is None else words
+        total = sum(words.values())
+        self.trie = {}
+        for word, count in words.items():
+            node = self.trie
+            for ch in word:
+                node = node.setdefault(ch, {})
+            node[_END] = -math.log(count / total)
+        self.size = len(words)
+
+    def __contains__(self, word):
+        node = self._walk(self.trie, word)
+        return node is not None and _END in node
+
+    @staticmethod
+    def _walk(node, s):
+        for ch in s:
+            node = node.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def _junctions(self, akshara, left):
+        """
+        (left ending, right start, rule, cost) for every way `akshara` can be
+        the junction between the word begun by `left` and the next one.
+        left=None lists every junction regardless of the left word.
+        """
+        if nlp_utils._CHAR_CLASSES.get(akshara[0], 0) & SWARA:
+            return
+        body = akshara.rstrip(_YOGAVAHAS)
+        if not body:
+            return  # a stray anusvara / visarga (scraped text)
+        tail = akshara[len(body):]
+        sign = body[-1] if body[-1] in _VOWELS else ""
+        cons = body[:len(body) - len(sign)]
+        if not cons or cons.endswith("್"):
+            return  # a stray vowel sign, or a bare consonant: nothing to undo
+
+        vowel = _VOWELS[sign] + tail
+        for dropped, cost in _LOPA:
+            yield cons + dropped, vowel, "lopa", cost
+        for left_sign, right_vowel, rule, cost in _MERGES.get(sign, ()):
+            yield cons + left_sign, right_vowel + tail, rule, cost
+        if left or left is None:
+            if cons in _AGAMA and (left is None or _final_sign(left) in _AGAMA[cons]):
+                yield "", vowel, "agama", _AGAMA_COST
+            if cons[0] in _ADESHA:
+                yield "", _ADESHA[cons[0]] + akshara[1:], "adesha", _ADESHA_COST
+
+    def segment(self, word):
+        """
+        Best Split of a single word; words it can't improve on, and runs
+        longer than MAX_AKSHARAS (no real compound is), come back whole.
+        """
+        starts, ends = nlp_utils.akshara_spans(word)
+        aksharas = [word[a:b] for a, b in zip(starts, ends)]
+        n = len(aksharas)
+        if not aksharas or n > MAX_AKSHARAS or "".join(aksharas) != word:
+            return Split((word,), (), 0.0)
+
+        # best[(pos, carry)] = cheapest (cost, parts, joins) for aksharas[pos:]
+        # when the next word has to start with `carry` (left over from a
+        # junction). Filled right to left: every entry only reads entries at
+        # later positions, or (pos, "") which is solved before pos's carries.
+        best = {(n, ""): (0.0, (), ())}
+        for pos in range(n, -1, -1):
+            carries = {""} if pos < n else set()
+            if pos:
+                carries.update(start for _, start, _, _ in self._junctions(aksharas[pos - 1], None))
+            for carry in sorted(carries, key=len):  # "" first
+                best[pos, carry] = self._solve(aksharas, pos, carry, best)
+        cost, parts, joins = best[0, ""]
+        return Split(parts, joins, cost)
+
+    def _solve(self, aksharas, pos, carry, best):
+        n = len(aksharas)
+        result = (math.inf, None, None)
+
+        def consider(piece, cost, nxt, ncarry, rule):
+            nonlocal result
+            if cost >= result[0]:
+                return
+            rest_cost, rest, joins = best.get((nxt, ncarry), (math.inf, None, None))
+            total = cost + rest_cost
+            if total < result[0]:
+                result = (total, (piece,) + rest, ((rule,) if rest else ()) + joins)
+
+        node = self._walk(self.trie, carry)
+        if carry and node is not None and _END in node:
+            consider(carry, node[_END], pos, "", "")  # the carry is a word by itself
+        left = carry
+        for j in range(pos, n):
+            if node is None:
+                break
+            akshara = aksharas[j]
+            for ending, start, rule, cost in self._junctions(akshara, left):
+                end = self._walk(node, ending)
+                if end is not None and _END in end and left + ending:
+                    consider(left + ending, end[_END] + cost, j + 1, start, rule)
+            node = self._walk(node, akshara)
+            left += akshara
+            if node is not None and _END in node:
+                consider(left, node[_END], j + 1, "", "")
+        if not carry:
+            # Unknown stretch; single aksharas (ದ in ಮಾಣಿಕ್ಯದ) aren't split off
+            for j in range(pos + 1, n + 1):
+                if j - pos < MIN_OOV_AKSHARAS and (pos or j < n):
+                    continue
+                consider("".join(aksharas[pos:j]), OOV_BASE + OOV_PER_AKSHARA * (j - pos), j, "", "")
+        return result
+
+    def split(self, word):
+        return self.segment(word).parts
+
+    def split_text(self, text):
+        """The text's Kannada words replaced by their parts, space-separated."""
+        return _WORD_RE.sub(lambda m: " ".join(self.split(m.group())), text)
+
+splitter = SandhiSplitter()
+
+@nlp_utils.memoize(max_entries=1 << 16, max_bytes=32 << 20)
+def split_word(word):
+    """Parts of one word (a tuple; the word itself if nothing better is found)."""
+    return splitter.split(nlp_utils.normalize_kannada(word))
+
+def split_text(text):
+    """Every Kannada word in text replaced by its space-separated parts."""
+    return _WORD_RE.sub(lambda m: " ".join(split_word(m.group())), nlp_utils.normalize_kannada(text))
+
+def split_many(lines):
+    """
+    split_text over many lines. Each distinct word is searched once and
+    reused for the rest of the batch, whether or not the memo cache keeps it.
+    """
+    seen = {}
+
+    def parts(m):
+        word = m.group()
+        joined = seen.get(word)
+        if joined is None:
+            joined = seen[word] = " ".join(split_word(word))
+        return joined
+
+    return [_WORD_RE.sub(parts, nlp_utils.normalize_kannada(line)) for line in lines]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Split Kannada sandhi forms and compounds.")
+    parser.add_argument("words", nargs="*", help="Words to split (prints each split with its rules).")
+    parser.add_argument("-f", "--file", help="Pre-split a corpus file line by line ('-' = stdin).")
+    parser.add_argument("-o", "--output", help="Output file for --file (default: stdout).")
+    parser.add_argument("--batch-size", type=int, default=4096)
+    args = parser.parse_args(argv)
+
+    if not args.file:
+        if not args.words:
+            parser.error("give words to split or --file")
+        for word in args.words:
+            for token in _WORD_RE.findall(word):
+                s = splitter.segment(nlp_utils.normalize_kannada(token))
+                rules = ", ".join(r or "+" for r in s.joins)
+                print(f"{token}\t{' + '.join(s.parts)}\t{rules}\t{s.cost:.2f}")
+        return 0
+
+    from kn_pipeline import batched, read_lines
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for batch in batched(read_lines([args.file]), args.batch_size):
+            out.write("\n".join(split_many(batch)) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,412 @@
+"""
+Script identification and same-script run splitting for mixed input.
+
+Every codepoint maps to an ISO 15924 code through script_ranges.tsv, a
+precomputed range table generated from the Unicode Script property and keyed
+by the Alias column of df_iso15924_scripts.tsv. At import the table becomes a
+dense lookup array for the BMP (astral codepoints fall back to a binary
+search), so classifying a string is one NumPy gather and splitting it into
+runs is one pass over the positions where the script changes.
+
+    split_by_script("ನಮಸ್ಕಾರ hello नमस्ते 2024")
+    route(text, {"Knda": nlp_utils.analyze_morphology})
+    script_proportions(list_of_documents)
+
+Regenerate the table after a Unicode upgrade with either source (neither is
+needed at runtime, only to regenerate):
+    python script_detect.py generate --ucd Scripts.txt   # from the UCD file
+    pip install regex && python script_detect.py generate  # from the `regex` package
+Scripts.txt is https://www.unicode.org/Public/UCD/latest/ucd/Scripts.txt.
+
+script_classes.tsv, the per-script character classes behind nlp_utils'
+akshara / prosody engine, is generated from the same ranges:
+    python script_detect.py classes
+"""
+
+import argparse
+import os
+import re
+import sys
+import unicodedata
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RANGES_FILE = os.path.join(BASE_DIR, "script_ranges.tsv")
+CLASSES_FILE = os.path.join(BASE_DIR, "script_classes.tsv")
+ISO_FILE = os.path.join(BASE_DIR, "df_iso15924_scripts.tsv")
+
+COMMON = "Zyyy"     # spaces, punctuation, ASCII digits, symbols
+INHERITED = "Zinh"  # combining marks, ZWJ/ZWNJ: take the script of their base
+UNKNOWN = "Zzzz"    # unassigned codepoints
+
+ScriptRun = namedtuple("ScriptRun", "script start end text")
+
+# --- Table generation ---
+
+def _iso_aliases(iso_file=ISO_FILE):
+    """Unicode Script property value (the TSV's Alias column) -> ISO 15924 code."""
+    df = pd.read_csv(iso_file, sep="\t", dtype=str).dropna(subset=["Alias"])
+    return dict(zip(df["Alias"], df["Code"]))
+
+def _ranges_from_ucd(path, aliases):
+    ranges = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            cps, name = (part.strip() for part in line.split(";"))
+            lo, _, hi = cps.partition("..")
+            if name in aliases:
+                ranges.append((int(lo, 16), int(hi or lo, 16), aliases[name]))
+    return ranges
+
+def _ranges_from_regex(aliases):
+    import regex  # generation-time only
+
+    # Every non-surrogate codepoint once; offsets past the surrogate gap shift by 0x800
+    everything = "".join(chr(c) for c in range(0x110000) if not 0xD800 <= c < 0xE000)
+    to_cp = lambda off: off if off < 0xD800 else off + 0x800
+    ranges = []
+    for name, code in aliases.items():
+        try:
+            pattern = regex.compile(r"\p{Script=%s}+" % name)
+        except regex.error:
+            continue  # script newer than the regex package's Unicode data
+        for m in pattern.finditer(everything):
+            # A match can straddle the surrogate gap; split it there
+            lo, hi = to_cp(m.start()), to_cp(m.end() - 1)
+            if lo < 0xD800 <= hi:
+                ranges += [(lo, 0xD7FF, code), (0xE000, hi, code)]
+            else:
+                ranges.append((lo, hi, code))
+    return ranges
+
+def generate_table(ucd_path=None, out_path=RANGES_FILE, iso_file=ISO_FILE):
+    """Writes the range table; returns the number of ranges."""
+    aliases = _iso_aliases(iso_file)
+    if ucd_path:
+        ranges, source = _ranges_from_ucd(ucd_path, aliases), os.path.basename(ucd_path)
+    else:
+        try:
+            import regex
+        except ImportError:
+            raise SystemExit("generate needs the `regex` package (pip install regex) "
+                             "or a UCD Scripts.txt passed with --ucd")
+        ranges, source = _ranges_from_regex(aliases), f"regex {regex.__version__}"
+    ranges.sort()
+    # Merge adjacent ranges of the same script to keep the table small
+    merged = []
+    for lo, hi, code in ranges:
+        if merged and merged[-1][2] == code and merged[-1][1] + 1 == lo:
+            merged[-1] = (merged[-1][0], hi, code)
+        else:
+            merged.append((lo, hi, code))
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(f"# Codepoint ranges -> ISO 15924 code, generated by `python script_detect.py generate`\n")
+        f.write(f"# Source: Unicode Script property ({source}); codes joined via df_iso15924_scripts.tsv Alias\n")
+        f.write("# start\tend\tcode   (hex, inclusive; anything not listed is Zzzz)\n")
+        for lo, hi, code in merged:
+            f.write(f"{lo:04X}\t{hi:04X}\t{code}\n")
+    return len(merged)
+
+# --- Brahmic character classes ---
+# One row per run of codepoints sharing the same class letters, derived from
+# Unicode character names and combining classes:
+#   S independent vowel   C consonant      M vowel sign (the virama counts too)
+#   Y anusvara/visarga    V virama (ccc 9) H makes its akshara heavy (Guru)
+#   N other combining mark (nukta, ...): attaches to its akshara, not counted
+
+_VOWEL_NAME = re.compile(r"^(SHORT |CANDRA |PRISHTHAMATRA )?"
+                         r"(A|AA|I|II|U|UU|E|EE|AI|O|OO|AU|AE|AAE|OE|OOE|UE|UUE|VOCALIC [RL]{1,2})$")
+_LONG_VOWELS = {"AA", "II", "UU", "EE", "OO", "AI", "AU", "AAE", "OOE", "UUE", "VOCALIC RR", "VOCALIC LL"}
+_YOGAVAHA_NAMES = ("ANUSVARA", "VISARGA", "CANDRABINDU", "JIHVAMULIYA", "UPADHMANIYA",
+                   "NIKAHIT", "REAHMUK", "CECEK", "WIGNYAN", "BISAH")
+
+# Scripts that name their vowels in their own terms -> the usual vowel names
+_SINHALA_VOWEL = re.compile(r"^(A|AA|AE|AEE|I|II|U|UU|IRU|IRUU|ILU|ILUU|E|EE|AI|O|OO|AU)YANNA$")
+_BALINESE_VOWEL = re.compile(r"^(A|I|U|E|AI|O)KARA( TEDUNG)?$")
+_VOWEL_ALIASES = {
+    "AEE": "AAE", "IRU": "VOCALIC R", "IRUU": "VOCALIC RR", "ILU": "VOCALIC L", "ILUU": "VOCALIC LL",
+    # Sinhala vowel signs
+    "AELA-PILLA": "AA", "KETTI AEDA-PILLA": "AE", "DIGA AEDA-PILLA": "AAE", "KETTI IS-PILLA": "I",
+    "DIGA IS-PILLA": "II", "KETTI PAA-PILLA": "U", "DIGA PAA-PILLA": "UU", "GAETTA-PILLA": "VOCALIC R",
+    "DIGA GAETTA-PILLA": "VOCALIC RR", "GAYANUKITTA": "VOCALIC L", "DIGA GAYANUKITTA": "VOCALIC LL",
+    "KOMBUVA": "E", "DIGA KOMBUVA": "EE", "KOMBU DEKA": "AI", "KOMBUVA HAA AELA-PILLA": "O",
+    "KOMBUVA HAA DIGA AELA-PILLA": "OO", "KOMBUVA HAA GAYANUKITTA": "AU",
+    # Balinese / Javanese vowel signs
+    "TEDUNG": "AA", "ULU": "I", "ULU SARI": "II", "SUKU": "U", "SUKU ILUT": "UU",
+    "RA REPA": "VOCALIC R", "RA REPA TEDUNG": "VOCALIC RR", "LA LENGA": "VOCALIC L",
+    "LA LENGA TEDUNG": "VOCALIC LL", "TALING": "E", "TALING REPA": "AI", "TALING TEDUNG": "O",
+    "TALING REPA TEDUNG": "AU", "TARUNG": "AA", "WULU": "I", "WULU MELIK": "II",
+    "SUKU MENDUT": "UU", "DIRGA MURE": "AI",
+}
+
+def _vowel(tail):
+    """(vowel name, explicitly short) for a letter / sign name tail, or None."""
+    m = _VOWEL_NAME.match(tail)
+    if m:
+        return m.group(2), m.group(1) == "SHORT "
+    m = _SINHALA_VOWEL.match(tail)
+    if m:
+        return _VOWEL_ALIASES.get(m.group(1), m.group(1)), False
+    m = _BALINESE_VOWEL.match(tail)
+    if m:
+        return m.group(1) * 2 if m.group(2) and len(m.group(1)) == 1 else m.group(1), False
+    return (_VOWEL_ALIASES[tail], False) if tail in _VOWEL_ALIASES else None
+
+def _char_classes(cp, long_e_o):
+    char = chr(cp)
+    name = unicodedata.name(char, "")
+    category = unicodedata.category(char)
+    if not name:
+        return ""
+    if unicodedata.combining(char) == 9:
+        return "MV"
+    if any(word in name for word in _YOGAVAHA_NAMES):
+        return "YH"
+    if " LENGTH MARK" in name:
+        return "MH"
+    if " VOWEL SIGN " in name:
+        kind, vowel = "M", _vowel(name.split(" VOWEL SIGN ", 1)[1])
+    elif " INDEPENDENT VOWEL " in name:
+        # Khmer: QAA, QII, QOO TYPE ONE, ...
+        tail = name.split(" INDEPENDENT VOWEL ", 1)[1].split(" TYPE ")[0].removeprefix("Q")
+        kind, vowel = "S", _vowel(tail) or (tail, False)
+    elif category == "Lo" and " LETTER " in name:
+        kind, vowel = "S", _vowel(name.split(" LETTER ", 1)[1])
+        if vowel is None:
+            return "C"
+    elif category in ("Mn", "Mc"):
+        return "N"
+    else:
+        return ""
+    if vowel is None:
+        return kind
+    vowel, short = vowel
+    heavy = not short and (vowel in _LONG_VOWELS or (long_e_o and vowel in ("E", "O")))
+    return kind + ("H" if heavy else "")
+
+def brahmic_classes(code, rows=None):
+    """
+    {codepoint: class letters} for one script, or None when the script
+    doesn't have a Brahmic layout (independent vowels, consonants, vowel
+    signs and a virama that joins consonants into conjuncts).
+    """
+    rows = _load_ranges() if rows is None else rows
+    cps = [cp for lo, hi, c in rows if c == code for cp in range(lo, hi + 1)]
+    names = {cp: unicodedata.name(chr(cp), "") for cp in cps}
+    if any(" SUBJOINED LETTER " in n for n in names.values()):
+        return None  # Tibetan-style stacking, not virama conjuncts
+    # Sanskrit e/o are long; scripts that also have EE/OO make E/O short
+    long_e_o = not any(n.endswith((" EE", " OO", "EEYANNA", "DIGA KOMBUVA")) for n in names.values())
+    classes = {cp: _char_classes(cp, long_e_o) for cp in cps}
+    classes = {cp: c for cp, c in classes.items() if c}
+    present = set("".join(classes.values()))
+    return classes if {"S", "C", "M", "V"} <= present else None
+
+def generate_classes(out_path=CLASSES_FILE, codes=None):
+    """Writes script_classes.tsv for every Brahmic script; returns the scripts written."""
+    if codes is None:
+        from analyze_scripts import get_indic_scripts_list
+        codes = get_indic_scripts_list()
+    rows = _load_ranges()
+    written = []
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write("# Brahmic character classes for nlp_utils' akshara engine, generated by `python script_detect.py classes`\n")
+        f.write(f"# Source: unicodedata {unicodedata.unidata_version} names over script_ranges.tsv;"
+                f" scripts from analyze_scripts.get_indic_scripts_list()\n")
+        f.write("# code\tstart\tend\tclasses   (hex, inclusive; S swara, C vyanjana, M matra, Y yogavaha,"
+                " V virama, H heavy, N other mark)\n")
+        for code in codes:
+            classes = brahmic_classes(code, rows)
+            if classes is None:
+                continue
+            written.append(code)
+            run = None
+            for cp in sorted(classes):
+                if run and run[1] + 1 == cp and run[2] == classes[cp]:
+                    run[1] = cp
+                    continue
+                if run:
+                    f.write(f"{code}\t{run[0]:04X}\t{run[1]:04X}\t{run[2]}\n")
+                run = [cp, cp, classes[cp]]
+            f.write(f"{code}\t{run[0]:04X}\t{run[1]:04X}\t{run[2]}\n")
+    return written
+
+# --- Lookup tables ---
+
+def _load_ranges(path=RANGES_FILE):
+    rows = []
+    if not os.path.exists(path):
+        return rows  # only while generating the table for the first time
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            lo, hi, code = line.rstrip("\n").split("\t")
+            rows.append((int(lo, 16), int(hi, 16), code))
+    return rows
+
+def _build_tables(rows):
+    codes = [UNKNOWN, COMMON, INHERITED]
+    codes += sorted({code for _, _, code in rows} - set(codes))
+    ids = {code: i for i, code in enumerate(codes)}
+    starts = np.array([lo for lo, _, _ in rows], dtype=np.int64)
+    ends = np.array([hi for _, hi, _ in rows], dtype=np.int64)
+    range_ids = np.array([ids[code] for _, _, code in rows], dtype=np.uint16)
+
+    bmp = np.zeros(0x10000, dtype=np.uint16)  # 0 == UNKNOWN
+    for lo, hi, rid in zip(starts.tolist(), ends.tolist(), range_ids.tolist()):
+        if lo < 0x10000:
+            bmp[lo:min(hi, 0xFFFF) + 1] = rid
+    return codes, bmp, starts, ends, range_ids
+
+CODES, _BMP, _STARTS, _ENDS, _RANGE_IDS = _build_tables(_load_ranges())
+_CODE_IDS = {code: i for i, code in enumerate(CODES)}
+_COMMON_ID, _INHERITED_ID = _CODE_IDS[COMMON], _CODE_IDS[INHERITED]
+
+def _codepoints(text):
+    return np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+
+def script_ids(text):
+    """Per-character index into CODES."""
+    cps = _codepoints(text)
+    out = _BMP[np.minimum(cps, 0xFFFF)]
+    astral = cps > 0xFFFF
+    if astral.any():
+        cp = cps[astral].astype(np.int64)
+        idx = np.searchsorted(_STARTS, cp, side="right") - 1
+        hit = (idx >= 0) & (cp <= _ENDS[np.maximum(idx, 0)])
+        out[astral] = np.where(hit, _RANGE_IDS[np.maximum(idx, 0)], 0)
+    return out
+
+def script_of(char):
+    """ISO 15924 code of a single character."""
+    return CODES[int(script_ids(char)[0])]
+
+# --- Runs ---
+
+def split_by_script(text, resolve=True):
+    """
+    Splits text into maximal same-script ScriptRuns covering the whole string.
+
+    With resolve=True (the default), Inherited characters join the run they
+    follow, and Common characters (spaces, punctuation, digits) that sit
+    between two runs of the same script are absorbed into it, so
+    "ನಮ್ಮ ಕನ್ನಡ" is a single Knda run while "ನಮ್ಮ hello" stays three runs.
+    """
+    if not text:
+        return []
+    ids = script_ids(text)
+    if resolve:
+        # Inherited takes the script of whatever precedes it (forward fill)
+        inherited = ids == _INHERITED_ID
+        if inherited.any():
+            pos = np.where(inherited, 0, np.arange(len(ids)))
+            np.maximum.accumulate(pos, out=pos)
+            ids = ids[pos]
+    cuts = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+    bounds = [0] + cuts.tolist() + [len(ids)]
+    runs = [(int(ids[a]), a, b) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    if resolve:
+        merged = []
+        i = 0
+        while i < len(runs):
+            sid, a, b = runs[i]
+            if (sid == _COMMON_ID and merged and i + 1 < len(runs)
+                    and runs[i + 1][0] == merged[-1][0] != _COMMON_ID):
+                # X Common X -> one X run
+                merged[-1] = (merged[-1][0], merged[-1][1], runs[i + 1][2])
+                i += 2
+                continue
+            if merged and merged[-1][0] == sid:
+                merged[-1] = (sid, merged[-1][1], b)
+            else:
+                merged.append((sid, a, b))
+            i += 1
+        runs = merged
+    return [ScriptRun(CODES[sid], a, b, text[a:b]) for sid, a, b in runs]
+
+def route(text, handlers, default=None):
+    """
+    Sends each run to handlers[script] (or `default`, if given) and returns
+    [(ScriptRun, result)]. Runs with no handler get result None.
+    """
+    out = []
+    for run in split_by_script(text):
+        func = handlers.get(run.script, default)
+        out.append((run, func(run.text) if func else None))
+    return out
+
+# --- Bulk ---
+
+def script_counts(texts):
+    """(n_docs, len(CODES)) matrix of per-document character counts."""
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, len(CODES)), dtype=np.int64)
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    ids = script_ids("".join(texts)).astype(np.int64)
+    docs = np.repeat(np.arange(len(texts)), lengths)
+    flat = np.bincount(docs * len(CODES) + ids, minlength=len(texts) * len(CODES))
+    return flat.reshape(len(texts), len(CODES))
+
+def script_proportions(texts, include_common=False, batch_size=10_000):
+    """
+    Share of each script per document as a DataFrame (rows = documents,
+    columns = ISO codes that occur). Common/Inherited/Unknown characters are
+    left out of the denominator unless include_common=True. The corpus-wide
+    share is in `df.attrs['corpus']`.
+    """
+    texts = list(texts)
+    counts = np.vstack([script_counts(texts[lo:lo + batch_size])
+                        for lo in range(0, len(texts), batch_size)] or
+                       [np.zeros((0, len(CODES)), dtype=np.int64)])
+    if not include_common:
+        counts[:, [_CODE_IDS[UNKNOWN], _COMMON_ID, _INHERITED_ID]] = 0
+    used = np.flatnonzero(counts.sum(axis=0))
+    counts = counts[:, used]
+    totals = counts.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shares = np.where(totals > 0, counts / np.maximum(totals, 1), 0.0)
+    df = pd.DataFrame(shares, columns=[CODES[i] for i in used])
+    grand = counts.sum()
+    df.attrs["corpus"] = {CODES[i]: float(c / grand) for i, c in zip(used, counts.sum(axis=0))} if grand else {}
+    return df
+
+def script_names(codes=None, iso_file=ISO_FILE):
+    """ISO code -> English name from df_iso15924_scripts.tsv."""
+    df = pd.read_csv(iso_file, sep="\t", dtype=str)
+    names = dict(zip(df["Code"], df["English Name"]))
+    return names if codes is None else {c: names.get(c, c) for c in codes}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Script detection utilities.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="Regenerate script_ranges.tsv.")
+    gen.add_argument("--ucd", help="Path to Unicode's Scripts.txt (default: use the regex package, `pip install regex`).")
+    gen.add_argument("--output", default=RANGES_FILE)
+    classes = sub.add_parser("classes", help="Regenerate script_classes.tsv (Brahmic character classes).")
+    classes.add_argument("--output", default=CLASSES_FILE)
+    split = sub.add_parser("split", help="Print the script runs of a string.")
+    split.add_argument("text")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        n = generate_table(args.ucd, args.output)
+        print(f"Wrote {n} ranges to {args.output}")
+    elif args.command == "classes":
+        codes = generate_classes(args.output)
+        print(f"Wrote classes for {len(codes)} scripts to {args.output}: {' '.join(codes)}")
+    else:
+        for run in split_by_script(args.text):
+            print(f"{run.script}\t{run.start}-{run.end}\t{run.text!r}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Per-session memory accounting for the Streamlit app.
+
+Heavy immutable resources (the ISO dataset, search/retrieval indexes, the
+topic model, rendered charts) are held once per process behind
+@st.cache_resource; the lexicon bundle and the Markov model are module-level
+singletons in nlp_utils, so they are shared the same way. What a session
+keeps for itself -- incremental analyzers, generated audio -- goes in a
+SessionArtifacts store instead of straight into st.session_state. The store
+tracks the approximate size of every entry and, once the session is over its
+budget, evicts the least recently used ones. Artifacts are caches, so an
+evicted one is simply rebuilt on next use. Sizes come from
+nlp_utils.approx_nbytes; the incremental analyzers report their own, so
+re-measuring one after an edit costs O(1) rather than a walk of its state.
+
+    artifacts = session_artifacts(st.session_state)
+    analyzer = artifacts.get_or_create("morph_analyzer", nlp_utils.IncrementalMorphology)
+    analyzer.update(text)
+    artifacts.refresh("morph_analyzer")        # re-measure after it grew
+
+The per-session budget is KANNADA_SESSION_BUDGET_MB megabytes (default 16).
+process_report() sums all live sessions in this server process.
+"""
+
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+from nlp_utils import approx_nbytes
+
+BUDGET_ENV = "KANNADA_SESSION_BUDGET_MB"
+DEFAULT_BUDGET_MB = 16
+STATE_KEY = "_session_artifacts"
+
+_live = weakref.WeakSet()  # every SessionArtifacts in the process
+_live_lock = threading.Lock()
+
+def default_budget():
+    """Per-session budget in bytes, from KANNADA_SESSION_BUDGET_MB."""
+    return int(float(os.environ.get(BUDGET_ENV, DEFAULT_BUDGET_MB)) * (1 << 20))
+
+class SessionArtifacts:
+    """
+    LRU store of one session's cached artifacts, bounded by `budget` bytes
+    (default: default_budget()). Thread-safe.
+    """
+
+    def __init__(self, budget=None):
+        self.budget = default_budget() if budget is None else budget
+        self._data = OrderedDict()  # key -> (value, nbytes)
+        self._lock = threading.RLock()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = self.oversized = 0
+        with _live_lock:
+            _live.add(self)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def keys(self):
+        return list(self._data)
+
+    def get(self, key, default=None):
+        """The artifact under key (marked as recently used), else default."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes=None):
+        """
+        Stores value (replacing any previous one) and evicts older artifacts
+        while the session is over budget. The newest artifact is always kept,
+        even one larger than the whole budget (it then stays alone and is
+        counted in info()["oversized"]), so it isn't rebuilt on every rerun.
+        Returns value.
+        """
+        nbytes = approx_nbytes(value) if nbytes is None else nbytes
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            if nbytes > self.budget:
+                self.oversized += 1
+            self._data[key] = (value, nbytes)
+            self.nbytes += nbytes
+            self._evict()
+        return value
+
+    def get_or_create(self, key, factory):
+        """The artifact under key, building and storing it with factory() if missing."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        return self.put(key, factory())
+
+    def refresh(self, key, nbytes=None):
+        """
+        Re-measures a mutable artifact (an analyzer after update()), or takes
+        the caller's nbytes, and re-applies the budget.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self.put(key, entry[0], nbytes)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return default
+            self.nbytes -= entry[1]
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+    def set_budget(self, budget):
+        with self._lock:
+            self.budget = budget
+            self._evict()
+
+    def _evict(self):
+        # Oldest first, but never the entry that was just stored
+        while self.nbytes > self.budget and len(self._data) > 1:
+            _, (_, dropped) = self._data.popitem(last=False)
+            self.nbytes -= dropped
+            self.evictions += 1
+
+    def info(self):
+        with self._lock:
+            return {"entries": len(self._data), "nbytes": self.nbytes, "budget": self.budget,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "oversized": self.oversized}
+
+    def sizes(self):
+        """{key: nbytes}, most recently used last."""
+        with self._lock:
+            return {key: nbytes for key, (_, nbytes) in self._data.items()}
+
+def session_artifacts(state, budget=None):
+    """The SessionArtifacts kept in a session's state mapping (st.session_state)."""
+    artifacts = state.get(STATE_KEY) if hasattr(state, "get") else None
+    if artifacts is None:
+        artifacts = state[STATE_KEY] = SessionArtifacts(budget)
+    return artifacts
+
+def process_report():
+    """Totals over every live session store in this process."""
+    with _live_lock:
+        stores = list(_live)
+    infos = [s.info() for s in stores]
+    return {
+        "sessions": len(infos),
+        "nbytes": sum(i["nbytes"] for i in infos),
+        "max_session_nbytes": max((i["nbytes"] for i in infos), default=0),
+        "evictions": sum(i["evictions"] for i in infos),
+        "oversized": sum(i["oversized"] for i in infos),
+    }
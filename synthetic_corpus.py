@@ -0,0 +1,104 @@
+"""
+Seeded synthetic Kannada text for benchmarks, tests and demo models.
+
+    gen = KannadaCorpusGenerator(seed=7)
+    words = gen.words(1000)
+    roman = generate_romanized_text(1000, seed=7)
+
+Same seed, same text, so timings and trained models are reproducible.
+"""
+
+import random
+
+import nlp_utils
+
+DEFAULT_SEED = 15924
+
+# Consonants weighted roughly by how often they start an akshara in running text
+CONSONANT_WEIGHTS = {
+    'ನ': 9, 'ರ': 8, 'ದ': 7, 'ಕ': 7, 'ಲ': 6, 'ಗ': 5, 'ಮ': 5, 'ತ': 5, 'ವ': 5,
+    'ಯ': 4, 'ಸ': 4, 'ಪ': 3, 'ಡ': 3, 'ಬ': 3, 'ಟ': 2, 'ಳ': 2, 'ಹ': 2, 'ಜ': 2,
+    'ಚ': 2, 'ಶ': 1, 'ಷ': 1, 'ಣ': 1, 'ಭ': 1, 'ಧ': 1, 'ಥ': 1, 'ಖ': 1, 'ಘ': 1,
+    'ಫ': 1, 'ಛ': 1, 'ಠ': 1, 'ಢ': 1, 'ಝ': 1, 'ಞ': 1, 'ಙ': 1,
+}
+# '' stands for the inherent 'a'
+MATRA_WEIGHTS = {
+    '': 30, 'ಾ': 14, 'ಿ': 12, 'ು': 14, 'ೆ': 10, 'ೇ': 4, 'ೊ': 3, 'ೋ': 3,
+    'ೀ': 3, 'ೂ': 3, 'ೈ': 1, 'ೌ': 1, 'ೃ': 1,
+}
+VOWEL_WEIGHTS = {
+    'ಅ': 8, 'ಇ': 5, 'ಉ': 4, 'ಎ': 4, 'ಆ': 4, 'ಒ': 2, 'ಈ': 1, 'ಊ': 1, 'ಏ': 1,
+    'ಓ': 1, 'ಐ': 1, 'ಔ': 1, 'ಋ': 1,
+}
+VIRAMA = '್'
+YOGAVAHAS = ['ಂ', 'ಃ']
+
+def _weighted(table):
+    return list(table.keys()), list(table.values())
+
+class KannadaCorpusGenerator:
+    """
+    Seeded generator of well-formed synthetic Kannada text.
+    Each akshara is (C + Virama)* + C + (Matra)? + (Yogavaha)? or an
+    independent vowel, which is exactly what analyze_morphology segments.
+    """
+
+    def __init__(self, seed=DEFAULT_SEED, conjunct_rate=0.12, yogavaha_rate=0.07,
+                 word_vowel_rate=0.15, lexicon_rate=0.05):
+        self.rng = random.Random(seed)
+        self.conjunct_rate = conjunct_rate
+        self.yogavaha_rate = yogavaha_rate
+        self.word_vowel_rate = word_vowel_rate
+        self.lexicon_rate = lexicon_rate
+        self._consonants = _weighted(CONSONANT_WEIGHTS)
+        self._matras = _weighted(MATRA_WEIGHTS)
+        self._vowels = _weighted(VOWEL_WEIGHTS)
+        # Real words so classification/sentiment/stemming have something to find
+        self._lexicon = sorted({w for line in nlp_utils.markov_gen.corpus for w in line.split()} |
+                               {'ಕ್ರಿಕೆಟ್', 'ಸರ್ಕಾರ', 'ಸಿನಿಮಾ', 'ಕಂಪ್ಯೂಟರ್', 'ಸುಂದರ', 'ಕಷ್ಟ',
+                                'ಮನೆಯಲ್ಲಿ', 'ಕನ್ನಡಿಗರು', 'ಮತ್ತು'})
+
+    def _pick(self, table):
+        keys, weights = table
+        return self.rng.choices(keys, weights)[0]
+
+    def akshara(self):
+        if self.rng.random() < self.word_vowel_rate / 3:
+            out = self._pick(self._vowels)
+        else:
+            out = self._pick(self._consonants)
+            if self.rng.random() < self.conjunct_rate:
+                # Ottakshara: mostly doubled consonants, sometimes a different one
+                second = out if self.rng.random() < 0.5 else self._pick(self._consonants)
+                out += VIRAMA + second
+            out += self._pick(self._matras)
+        if self.rng.random() < self.yogavaha_rate:
+            out += self.rng.choice(YOGAVAHAS)
+        return out
+
+    def word(self):
+        if self.rng.random() < self.lexicon_rate:
+            return self.rng.choice(self._lexicon)
+        n = self.rng.choice([2, 3, 3, 4, 4, 5, 6])
+        parts = []
+        if self.rng.random() < self.word_vowel_rate:
+            parts.append(self._pick(self._vowels))
+            n -= 1
+        parts.extend(self.akshara() for _ in range(n))
+        return "".join(parts)
+
+    def words(self, n_words):
+        return [self.word() for _ in range(n_words)]
+
+ROMAN_ONSETS = ['k', 'g', 'ch', 'j', 't', 'd', 'th', 'dh', 'n', 'p', 'b', 'm',
+                'y', 'r', 'l', 'v', 'sh', 's', 'h', 'bh', 'kh']
+ROMAN_NUCLEI = ['a', 'a', 'a', 'aa', 'i', 'u', 'e', 'ee', 'o', 'oo', 'ai', 'au']
+
+def generate_romanized_text(n_words, seed=DEFAULT_SEED):
+    """Phonetic (English-keyboard) Kannada for the transliteration benchmark."""
+    rng = random.Random(seed)
+    words = []
+    for _ in range(n_words):
+        syllables = rng.choice([2, 3, 3, 4])
+        words.append("".join(rng.choice(ROMAN_ONSETS) + rng.choice(ROMAN_NUCLEI) for _ in range(syllables)))
+    return " ".join(words)
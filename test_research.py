@@ -56,9 +56,797 @@ def test_data_analysis():
         assert diff == 0
         print("[PASS] Latency Analysis")
 
+def test_translation_phrases():
+    print("\nTesting Phrase Translation...")
+    # Built-in lexicon still behaves word by word
+    out = nlp_utils.basic_translate_en_kn("hello world my name is Anagha.")
+    print("Basic:", out)
+    assert out == "ನಮಸ್ಕಾರ ಪ್ರಪಂಚ ನನ್ನ ಹೆಸರು ಇದೆ anagha"
+
+    # Longest phrase wins, and we fall back cleanly when a phrase is cut short
+    tr = nlp_utils.LexiconTranslator({
+        'good': 'ಒಳ್ಳೆಯ', 'good morning': 'ಶುಭೋದಯ',
+        'new': 'ಹೊಸ', 'new york city': 'ನ್ಯೂಯಾರ್ಕ್ ನಗರ'
+    })
+    assert tr.translate("Good morning") == "ಶುಭೋದಯ"
+    assert tr.translate("new york city") == "ನ್ಯೂಯಾರ್ಕ್ ನಗರ"
+    assert tr.translate("new york") == "ಹೊಸ york"
+    assert tr.translate_batch(["good", "good morning"]) == ["ಒಳ್ಳೆಯ", "ಶುಭೋದಯ"]
+    print("[PASS] Phrase Translation")
+
+def test_benchmark_corpus():
+    print("\nTesting Synthetic Benchmark Corpus...")
+    import benchmark
+    from synthetic_corpus import KannadaCorpusGenerator
+    gen_a = KannadaCorpusGenerator(seed=7)
+    gen_b = KannadaCorpusGenerator(seed=7)
+    # Same seed, same corpus
+    assert gen_a.words(200) == gen_b.words(200)
+
+    # Generated aksharas must segment back exactly as generated
+    gen = KannadaCorpusGenerator(seed=7)
+    aksharas = [gen.akshara() for _ in range(500)]
+    result = nlp_utils.analyze_morphology(" ".join(aksharas))
+    assert result['aksharas'] == aksharas
+
+    # Randomized cases draw from the payload's own RNG, never the global one
+    import random
+    state = random.getstate()
+    a, b = benchmark.build_payload(50), benchmark.build_payload(50)
+    gen = nlp_utils.markov_gen
+    assert gen.generate(length=8, rng=a['rng']) == gen.generate(length=8, rng=b['rng'])
+    assert random.getstate() == state
+
+    # Cases the baseline doesn't know are reported rather than skipped silently
+    report = {'results': {'a': {'10': {'best': 1.0}}, 'b': {'10': {'best': 1.0}}}}
+    assert benchmark.missing_from_baseline(report, {'results': {'a': {'10': {'best': 0.5}}}}) == [('b', '10')]
+    print("[PASS] Benchmark Corpus")
+
+def test_perf_monitor():
+    print("\nTesting Performance Instrumentation...")
+    import perf_monitor
+    original = nlp_utils.analyze_morphology
+    perf_monitor.enable()
+    try:
+        assert nlp_utils.analyze_morphology is not original
+        nlp_utils.get_chandassu_meter("ನಮಸ್ಕಾರ")
+        nlp_utils.analyze_morphology("ನಮಸ್ಕಾರ")
+        snap = perf_monitor.snapshot()
+        assert snap['nlp_utils.get_chandassu_meter']['calls'] >= 1
+        assert snap['nlp_utils.analyze_morphology']['p99_ms'] is not None
+    finally:
+        perf_monitor.disable()
+        perf_monitor.reset()
+    # Disabled means the original function objects are back
+    assert nlp_utils.analyze_morphology is original
+
+    # Concurrent enables (two reruns) wrap once, so disable still restores
+    import threading
+    threads = [threading.Thread(target=perf_monitor.enable) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert nlp_utils.analyze_morphology.__wrapped__ is original
+    perf_monitor.disable()
+    perf_monitor.reset()
+    assert nlp_utils.analyze_morphology is original
+    print("[PASS] Performance Instrumentation")
+
+def test_nlp_service():
+    print("\nTesting NLP Service Micro-batching...")
+    import asyncio
+    import nlp_service
+
+    async def run():
+        service = nlp_service.NLPService(workers=2, use_threads=True)
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            report = await nlp_service.load_test("127.0.0.1", port, concurrency=8, requests=80)
+            assert report['errors'] == 0 and report['requests'] == 80
+            assert service.health()['status'] == "ok"
+            ops = service.metrics()['operations']
+            assert sum(o['calls'] for o in ops.values()) == 80
+            # Batches were actually formed, not one pool call per request
+            assert sum(o['batches'] for o in ops.values()) < 80
+
+            # Bad Content-Length gets a 400 reply instead of a dropped socket
+            for length in ("abc", "-5", "1e3"):
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(f"POST /chandassu HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+                await writer.drain()
+                status = await reader.readline()
+                writer.close()
+                assert status.split()[1] == b"400", (length, status)
+        finally:
+            server.close()
+            await service.close()
+
+    asyncio.run(run())
+    print("[PASS] NLP Service")
+
+def test_corpus_stats_merge():
+    print("\nTesting Corpus Statistics Merge...")
+    import corpus_stats
+    lines = nlp_utils.markov_gen.corpus
+    whole = corpus_stats.CorpusStats().consume(lines)
+
+    # Tiny exact budget forces the sketch/heavy-hitter path, then round-trip and merge
+    part_a = corpus_stats.CorpusStats(max_exact=10, heavy_capacity=20).consume(lines[:6])
+    part_b = corpus_stats.CorpusStats(max_exact=10, heavy_capacity=20).consume(lines[6:])
+    part_b = corpus_stats.CorpusStats.from_dict(part_b.to_dict())
+    merged = part_a.merge(part_b)
+
+    assert merged.lines == whole.lines
+    assert merged.counters['words'].total == whole.counters['words'].total
+    assert merged.counters['words'].saturated
+    # Count-min never underestimates
+    for word, count in whole.top_k('words', 5):
+        assert merged.counters['words'].get(word) >= count
+    print("Top words:", whole.top_k('words', 3))
+
+    # A key one shard counts exactly and the other has spilled into its sketch
+    left = corpus_stats.BoundedCounter(max_exact=3, heavy_capacity=2)
+    left.update({"x": 2})
+    right = corpus_stats.BoundedCounter(max_exact=3, heavy_capacity=2)
+    right.update({"a": 1, "b": 1, "c": 1})
+    right.update({"x": 3, "d": 1, "e": 4})
+    assert left.merge(right).get("x") >= 5
+    assert left.merge(corpus_stats.BoundedCounter()).get("x") >= 5
+
+    # Keys the other shard never saw keep their exact counts (no sketch noise)
+    mine = corpus_stats.BoundedCounter(max_exact=100)
+    mine.update({f"m{i}": 1 for i in range(50)})
+    theirs = corpus_stats.BoundedCounter(max_exact=10)
+    theirs.update({f"t{i}": i + 1 for i in range(5000)})
+    mine.merge(theirs)
+    assert all(mine.exact.get(f"m{i}") == 1 for i in range(50))
+    # With a narrow sketch some keys collide: those turn approximate, none gets a wrong exact count
+    mine = corpus_stats.BoundedCounter(max_exact=100, sketch_width=1024)
+    mine.update({f"m{i}": 1 for i in range(50)})
+    theirs = corpus_stats.BoundedCounter(max_exact=10, sketch_width=1024)
+    theirs.update({f"t{i}": i + 1 for i in range(5000)})
+    mine.merge(theirs)
+    assert all(mine.exact.get(f"m{i}", 1) == 1 and mine.get(f"m{i}") >= 1 for i in range(50))
+    assert 0 < sum(f"m{i}" in mine.exact for i in range(50)) < 50
+    assert "x" not in left.exact  # x may be in right's sketch, so it's approximate now
+
+    # Heavy hitters keep the strongest keys once the table is full
+    bc = corpus_stats.BoundedCounter(max_exact=0, heavy_capacity=3)
+    for i, n in enumerate([5, 1, 3, 2, 9, 1, 7]):
+        bc.update({f"k{i}": n})
+    assert set(bc.heavy) == {"k0", "k4", "k6"} and bc._heavy_min == min(bc.heavy.values())
+    print("[PASS] Corpus Statistics Merge")
+
+def test_compact_aksharas():
+    print("\nTesting Compact Akshara Spans...")
+    text = "ನಮಸ್ಕಾರ ಕನ್ನಡ, ಇವನಾರವ ಇವನಾರವ!"
+    classic = nlp_utils.analyze_morphology(text)
+    compact = nlp_utils.analyze_morphology(text, compact=True)
+    spans = compact['aksharas']
+
+    assert compact['stats'] == classic['stats']
+    assert spans == classic['aksharas']
+    assert spans.to_list() == classic['aksharas']
+    assert list(spans) == classic['aksharas']
+    assert spans[2] == "ಸ್ಕಾ" and spans.view(2).is_conjunct
+    assert spans[1:3].to_list() == classic['aksharas'][1:3]
+    print("Spans:", spans, "bytes:", spans.nbytes)
+    print("[PASS] Compact Akshara Spans")
+
+def test_incremental_morphology():
+    print("\nTesting Incremental Re-analysis...")
+    analyzer = nlp_utils.IncrementalMorphology()
+    edits = [
+        "ಮಂಕುತಿಮ್ಮನ ಕಗ್ಗ",
+        "ಮಂಕುತಿಮ್ಮನ ಕಗ್ಗ ಸತ್ಯ",
+        "ಮಂಕುತಿಮ್ಮನ ಕ್ಕಗ್ಗ ಸತ್ಯ",     # conjunct inserted mid-word
+        "ಮಂಕುತಿಮ್ಮನ ಸತ್ಯ",
+        "ಸ  ಮಂಕುತಿಮ್ಮನ ಸತ್ಯ ",
+        "",
+        "ಇವನಾರವ",
+    ]
+    for text in edits:
+        result = analyzer.update(text)
+        assert result == nlp_utils.analyze_morphology(text), text
+        assert analyzer.meter() == nlp_utils.get_chandassu_meter(text), text
+
+    # Only the touched word is re-segmented in a long passage
+    long_text = " ".join(["ನಮಸ್ಕಾರ ಕನ್ನಡ"] * 200)
+    analyzer.update(long_text)
+    edited = long_text[:700] + "ಅ" + long_text[700:]
+    analyzer.update(edited)
+    left, right = analyzer.last_region
+    assert right - left < 20
+    assert analyzer.result() == nlp_utils.analyze_morphology(edited)
+    print("Dirty region:", analyzer.last_region)
+    print("[PASS] Incremental Re-analysis")
+
+def test_memo_cache():
+    print("\nTesting Memoization Layer...")
+    nlp_utils.invalidate_caches()
+    before = nlp_utils.cache_stats()['analyze_morphology']
+    first = nlp_utils.analyze_morphology("ಕನ್ನಡ  ನಾಡು")
+    second = nlp_utils.analyze_morphology(" ಕನ್ನಡ ನಾಡು")   # same normalized key
+    after = nlp_utils.cache_stats()['analyze_morphology']
+    assert after['hits'] == before['hits'] + 1
+    assert first['aksharas'] == second['aksharas'] and first['aksharas'] is not second['aksharas']
+    assert second['text_len'] == len(" ಕನ್ನಡ ನಾಡು")
+
+    # Mutating a returned result must not leak into the cache
+    second['aksharas'].clear()
+    assert nlp_utils.analyze_morphology("ಕನ್ನಡ ನಾಡು")['aksharas'] == first['aksharas']
+
+    # Entry-count and byte bounds both evict least-recently-used first
+    cache = nlp_utils.MemoCache("t", max_entries=2, max_bytes=10_000)
+    for k in "abc":
+        cache.put(k, k * 10)
+    assert cache.get("a") == (False, None) and cache.get("c") == (True, "cccccccccc")
+    cache.put("big", "x" * 9_800)
+    assert cache.info().evictions == 3 and cache.info().nbytes <= 10_000
+
+    # Keyword calls keep working and share the positional call's entry
+    hits = nlp_utils.cache_stats()['analyze_morphology']['hits']
+    assert nlp_utils.analyze_morphology(text="ಕನ್ನಡ", compact=False) == nlp_utils.analyze_morphology("ಕನ್ನಡ", False)
+    assert nlp_utils.cache_stats()['analyze_morphology']['hits'] == hits + 1
+
+    # Bulk callers bypass the cache entirely
+    misses = nlp_utils.cache_stats()['analyze_morphology']['misses']
+    bulk = nlp_utils.analyze_morphology.uncached("ಹೊಸ ಸಾಲು")
+    assert bulk['aksharas'] == ['ಹೊ', 'ಸ', 'ಸಾ', 'ಲು'] and bulk['text_len'] == len("ಹೊಸ ಸಾಲು")
+    nlp_utils.get_chandassu_meter.uncached("ಹೊಸ ಸಾಲು ಇದು")  # nor through the meter's inner call
+    import kannada_pandas  # noqa: F401
+    classified = nlp_utils.cache_stats()['classify_text']['misses']
+    pd.Series(["ಹೊಸ ಸಾಲು", "ಕ್ರಿಕೆಟ್ ಪಂದ್ಯ"]).kn.classify()  # nor the .kn accessor
+    stats = nlp_utils.cache_stats()
+    assert stats['analyze_morphology']['misses'] == misses and stats['classify_text']['misses'] == classified
+
+    # Compact results are sized by their text and offset arrays, not the slot object
+    text = "ಕನ್ನಡ ನಾಡು " * 1000
+    spans = nlp_utils.AksharaSpans.from_text(text)
+    assert nlp_utils.approx_nbytes(spans) >= spans.nbytes + len(spans.source)
+
+    nlp_utils.invalidate_caches('analyze_morphology')
+    assert nlp_utils.cache_stats()['analyze_morphology']['currsize'] == 0
+    print("Stats:", nlp_utils.cache_stats()['analyze_morphology'])
+    print("[PASS] Memoization Layer")
+
+def test_lexicon_bundle():
+    print("\nTesting Lexicon Bundle...")
+    import shutil
+    import tempfile
+    import lexicon_bundle
+
+    bundle = nlp_utils.LEXICONS
+    assert 'ಮತ್ತು' in bundle['stopwords'] and 'ಕನ್ನಡ' not in bundle['stopwords']
+    assert bundle['en_kn'].get('hello') == 'ನಮಸ್ಕಾರ'
+    assert nlp_utils.BASIC_EN_KN_LEXICON['kannada'] == 'ಕನ್ನಡ'
+    assert list(bundle['vachana_corpus']) == list(nlp_utils.markov_gen.corpus)
+    # Importing nlp_utils compiled into the cache directory, not the source tree
+    assert bundle.path == lexicon_bundle.bundle_path() and not os.path.exists(
+        os.path.join(lexicon_bundle.SOURCE_DIR, 'lexicons.bin'))
+
+    # Editing a source file makes the next load recompile the bundle
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'lexicons')
+        shutil.copytree(lexicon_bundle.SOURCE_DIR, src, ignore=shutil.ignore_patterns('*.bin'))
+        path = os.path.join(src, 'lexicons.bin')
+        umask = os.umask(0o027)
+        try:
+            first = lexicon_bundle.load_bundle(path, src)
+        finally:
+            os.umask(umask)
+        # Published with the usual open() mode (0o666 minus umask), not mkstemp's 0600
+        assert os.stat(path).st_mode & 0o777 == 0o640
+        assert first['en_kn'].get('river') is None
+        with open(os.path.join(src, 'en_kn.tsv'), 'a', encoding='utf-8') as f:
+            f.write('river\tನದಿ\n')
+        second = lexicon_bundle.load_bundle(path, src)
+        assert second.digest != first.digest and second['en_kn'].get('river') == 'ನದಿ'
+        assert len(second['en_kn']) == len(first['en_kn']) + 1
+        # An unchanged bundle is opened without hashing the sources
+        digest = lexicon_bundle.source_digest
+        lexicon_bundle.source_digest = None
+        try:
+            assert lexicon_bundle.load_bundle(path, src).digest == second.digest
+        finally:
+            lexicon_bundle.source_digest = digest
+        # Touched but identical sources keep the digest and refresh the stamps
+        os.utime(os.path.join(src, 'en_kn.tsv'))
+        third = lexicon_bundle.load_bundle(path, src)
+        assert third.digest == second.digest and third.stamps == lexicon_bundle.source_stamps(src)
+        # Phrase translation straight off the mapped table, with added entries on top
+        with open(os.path.join(src, 'en_kn.tsv'), 'a', encoding='utf-8') as f:
+            f.write('new\tಹೊಸ\nnew york city\tನ್ಯೂಯಾರ್ಕ್ ನಗರ\n')
+        tr = nlp_utils.LexiconTranslator(table=lexicon_bundle.load_bundle(path, src)['en_kn'])
+        assert tr.translate("New York City river") == "ನ್ಯೂಯಾರ್ಕ್ ನಗರ ನದಿ"
+        assert tr.translate("new york") == "ಹೊಸ york"
+        tr.add("river", "ತೊರೆ")
+        assert tr.translate("hello river") == "ನಮಸ್ಕಾರ ತೊರೆ"
+    print("Tables:", bundle.info())
+    print("[PASS] Lexicon Bundle")
+
+def test_topic_model():
+    print("\nTesting Naive Bayes Topic Model...")
+    import tempfile
+    import topic_model
+
+    # Public helpers hand out copies, so callers can't edit classify_text's lexicon
+    keywords = nlp_utils.topic_keywords()
+    keywords["Sports"].append("ಪರೀಕ್ಷೆ")
+    assert "ಪರೀಕ್ಷೆ" not in nlp_utils.topic_keywords()["Sports"]
+    starts, ends = nlp_utils.akshara_spans("ಕನ್ನಡ ನಾಡು")
+    assert list(zip(starts, ends)) == [(0, 1), (1, 4), (4, 5), (6, 8), (8, 10)]
+
+    texts, labels = topic_model.make_synthetic_corpus(800, seed=7)
+    report = topic_model.evaluate(texts, labels, n_features=1 << 14)
+    matrix = report['matrix']
+    assert sum(map(sum, matrix)) == report['test_docs'] == 200
+    assert report['accuracy'] > 0.6
+
+    model = topic_model.NaiveBayesTopicModel(n_features=1 << 14).fit(texts, labels)
+    probe = ["ಕ್ರಿಕೆಟ್ ಪಂದ್ಯದಲ್ಲಿ ಆಟ", "ಚುನಾವಣೆ ಸರ್ಕಾರ ಮಂತ್ರಿ", ""]
+    assert model.predict(probe)[:2] == ["Sports", "Politics"]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = model.save(os.path.join(tmp, "model.npz"))
+        loaded = topic_model.NaiveBayesTopicModel.load(path)
+    assert (abs(loaded.decision_function(probe) - model.decision_function(probe)) < 1e-6).all()
+    print("Accuracy:", round(report['accuracy'], 3))
+    print("[PASS] Naive Bayes Topic Model")
+
+def test_script_detect():
+    print("\nTesting Script Detection...")
+    import script_detect
+
+    assert script_detect.script_of('ಕ') == 'Knda'
+    assert script_detect.script_of('क') == 'Deva'
+    assert script_detect.script_of('A') == 'Latn' and script_detect.script_of('7') == 'Zyyy'
+    runs = script_detect.split_by_script("ನಮಸ್ಕಾರ ಕನ್ನಡ hello नमस्ते")
+    assert [r.script for r in runs] == ['Knda', 'Zyyy', 'Latn', 'Zyyy', 'Deva']
+    assert runs[0].text == "ನಮಸ್ಕಾರ ಕನ್ನಡ"
+    assert "".join(r.text for r in runs) == "ನಮಸ್ಕಾರ ಕನ್ನಡ hello नमस्ते"
+
+    routed = script_detect.route("ಕನ್ನಡ abc", {'Knda': nlp_utils.get_chandassu_meter})
+    assert routed[0][1] == nlp_utils.get_chandassu_meter("ಕನ್ನಡ") and routed[-1][1] is None
+
+    props = script_detect.script_proportions(["ಕನ್ನಡ", "abcd ಕ", "12 !"])
+    assert props.loc[0, 'Knda'] == 1.0 and props.loc[1, 'Latn'] == 0.8
+    assert props.loc[2].sum() == 0
+    print("Corpus shares:", props.attrs['corpus'])
+    print("[PASS] Script Detection")
+
+def test_akshara_lm():
+    print("\nTesting Akshara Language Model...")
+    import tempfile
+    import akshara_lm
+
+    lines = list(nlp_utils.markov_gen.corpus)
+    lm = akshara_lm.AksharaLM(order=3).train(lines, chunk_lines=4)
+    whole = akshara_lm.AksharaLM(order=3).train(lines)
+    for k in range(3):
+        assert (lm.keys[k] == whole.keys[k]).all() and (lm.counts[k] == whole.counts[k]).all()
+
+    # Seen text scores better than the same aksharas shuffled
+    seen = "ನುಡಿದರೆ ಮುತ್ತಿನ ಹಾರದಂತಿರಬೇಕು"
+    shuffled = "ರಬೇ ಹಾದಂ ಕುತಿನ ತ್ತಿಮು ನುರೆಡಿ"
+    ppl = lm.perplexity([seen, shuffled, ""])
+    assert ppl[0] < ppl[1] and len(ppl) == 3
+    # Empty batches are valid and give empty arrays
+    assert len(lm.score([])) == len(lm.perplexity([])) == len(lm.token_logprobs([])[0]) == 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        loaded = akshara_lm.AksharaLM.load(lm.save(os.path.join(tmp, "lm.npz")))
+    assert (loaded.score([seen, shuffled]) == lm.score([seen, shuffled])).all()
+    print("Model:", lm, "perplexities:", ppl.round(2))
+    print("[PASS] Akshara Language Model")
+
+def test_retrieval():
+    print("\nTesting BM25 Retrieval...")
+    import tempfile
+    import numpy as np
+    import retrieval
+
+    values = np.array([0, 1, 127, 128, 300, 2**40, 2**63 + 5], dtype=np.uint64)
+    assert (retrieval.decode_varints(retrieval.encode_varints(values)) == values).all()
+
+    passages = list(nlp_utils.markov_gen.corpus) + [("ಕಾಯಕವೇ ಕೈಲಾಸ — Work is Worship", "Basavanna")]
+    with tempfile.TemporaryDirectory() as tmp:
+        index = retrieval.RetrievalIndex(tmp)
+        index.add(passages[:5])
+        index.commit()
+        index.add(passages[5:])  # still buffered, but searchable
+        hits = index.search("ನುಡಿದರೆ", k=3)
+        assert len(hits) == 3 and all("ನುಡಿದರೆ" in h.text for h in hits)
+
+        # Stemming conflates case endings; the uncommitted passage is found too
+        hits = index.search("ಕೈಲಾಸದ work")
+        assert hits[0].source == "Basavanna" and hits[0].doc_id == len(passages) - 1
+
+        index.commit()
+        reopened = retrieval.RetrievalIndex(tmp)
+        assert len(reopened) == len(passages) and len(reopened.segments) == 2
+        before = index.search("ನುಡಿದರೆ ಮುತ್ತಿನ", k=4)
+        reopened.merge_segments()
+        assert len(reopened.segments) == 1
+        assert retrieval.RetrievalIndex(tmp).search("ನುಡಿದರೆ ಮುತ್ತಿನ", k=4) == before
+    print("Top hit:", before[0].text, round(before[0].score, 3))
+    print("[PASS] BM25 Retrieval")
+
+def test_corpus_store():
+    print("\nTesting Corpus Store...")
+    import tempfile
+    import numpy as np
+    import corpus_store
+
+    lines = list(nlp_utils.markov_gen.corpus)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.txt")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write("# header\n" + "\r\n\n".join(lines))  # CRLF, blank lines, no final newline
+
+        with corpus_store.CorpusStore(path, comment="#") as store:
+            assert store.index_rebuilt and list(store) == lines
+            assert store[-1] == lines[-1] and store[2:4] == lines[2:4]
+            assert sorted(store.sample(len(lines) + 5, rng=0)) == sorted(lines)
+            chunks = [[bytes(m).decode() for m in store.iter_byte_range(a, b)] for a, b in store.byte_ranges(3)]
+            assert sum(chunks, []) == lines
+
+            # Stratified: one line from each third of the file / each label
+            picks = store.stratified_sample(3, rng=1)
+            assert [lines.index(p) * 3 // len(lines) for p in picks] == [0, 1, 2]
+            labels = np.arange(len(lines)) % 2
+            picks = store.stratified_sample(4, strata=labels, allocation="equal", rng=2)
+            assert sorted(lines.index(p) % 2 for p in picks) == [0, 0, 1, 1]
+
+            gen = nlp_utils.MarkovGenerator()
+            gen.chain = {}
+            gen.train(store.iter_lines())
+            assert "ನುಡಿದರೆ" in gen.chain
+
+        reopened = corpus_store.CorpusStore(path, comment="#")
+        assert not reopened.index_rebuilt and reopened[0] == lines[0]
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\nಹೊಸ ಸಾಲು\n")
+        assert corpus_store.CorpusStore(path, comment="#")[-1] == "ಹೊಸ ಸಾಲು"
+
+    quote = corpus_store.parse_quote(corpus_store.wisdom_quotes()[0])
+    assert quote["author"] == "Basavanna"
+    print("[PASS] Corpus Store")
+
+def test_pipeline():
+    print("\nTesting kn_pipeline...")
+    import io
+    import json
+    import kn_pipeline
+
+    lines = [json.dumps({"id": i, "body": t}, ensure_ascii=False)
+             for i, t in enumerate(list(nlp_utils.markov_gen.corpus) * 3)]
+    lines.insert(4, "{not json")
+    outputs = []
+    for workers in (0, 2):
+        out = io.StringIO()
+        report = kn_pipeline.run_pipeline(lines, out, "normalize,stem,sentiment", "jsonl", "body",
+                                          workers=workers, batch_size=4, max_inflight=2)
+        outputs.append(out.getvalue())
+        assert report["records"] == len(lines) and report["errors"] == 1
+    assert outputs[0] == outputs[1]  # worker output comes back in input order
+    words = ["ಕ" * i for i in range(20)]
+    assert list(kn_pipeline.ordered_map(len, words, workers=2, max_inflight=3)) == list(zip(words, range(20)))
+
+    records = [json.loads(line) for line in outputs[0].splitlines()]
+    assert "error" in records[4] and [r["id"] for r in records[5:8]] == [4, 5, 6]
+    assert records[0]["stems"] == [nlp_utils.simple_kannada_stemmer(t) for t in records[0]["body"].split()]
+    assert "text" not in records[0]  # --field is processed in place, not renamed
+
+    out = io.StringIO()
+    kn_pipeline.run_pipeline(['{"id": 1, "text": "orig", "body": " ಕನ್ನಡ  ನಾಡು"}'], out, "normalize,tokenize",
+                             "jsonl", "body", workers=0)
+    record = json.loads(out.getvalue())
+    assert record["text"] == "orig" and record["body"] == "ಕನ್ನಡ ನಾಡು" and record["tokens"] == ["ಕನ್ನಡ", "ನಾಡು"]
+    try:
+        kn_pipeline.parse_stages("normalize,lemmatize")
+        assert False, "unknown stage accepted"
+    except ValueError:
+        pass
+    print("[PASS] kn_pipeline")
+
+def test_incremental_transliteration():
+    print("\nTesting Incremental Transliteration...")
+    from transliterate import transliterate, IncrementalTransliterator
+
+    typer = IncrementalTransliterator()
+    text = ""
+    for ch in "namaskaara, naanu kannada bhaashe maataaDuttene. s":
+        text += ch
+        assert typer.update(text) == transliterate(text), text
+    # A trailing "s" turns into "sh" and then "shh"
+    for text in (text + "h", text + "hh", text + "hha"):
+        assert typer.update(text) == transliterate(text), text
+    assert typer.last_region[0] >= len(text) - 8
+    # Appending writes into the offset buffers in place (no copy of the whole document)
+    buffer = typer._sbuf
+    assert typer.update(text + "a") == transliterate(text + "a") and typer._sbuf is buffer
+    typer.update(text)
+
+    # Edits in the middle re-parse only around the edit
+    edited = text.replace("kannada", "kannadaa")
+    assert typer.update(edited) == transliterate(edited)
+    assert typer.last_region[1] < len(edited) - 20
+    for edited in ("", "a", edited[5:], "namaste"):
+        assert typer.update(edited) == transliterate(edited), edited
+    print("Output:", typer.output)
+    print("[PASS] Incremental Transliteration")
+
+def test_completion():
+    print("\nTesting Word Completion...")
+    import tempfile
+    from collections import Counter
+    import completion
+    from transliterate import transliterate
+
+    assert completion.romanize("ನಮಸ್ಕಾರ") == "namaskaara"
+    assert transliterate(completion.romanize("ಭಾಷೆ")) == "ಭಾಷೆ"
+
+    counts = Counter({"ನಮಸ್ಕಾರ": 50, "ನಮನ": 5, "ನಮ್ಮ": 80, "ನಾಡು": 20, "ಕನ್ನಡ": 100})
+    counts.update(f"ನ{chr(0x0C95 + i % 20)}ರ{i}" for i in range(2000))  # a heavy "na" range
+    with tempfile.TemporaryDirectory() as tmp:
+        index = completion.CompletionIndex.load(completion.build_index(counts, os.path.join(tmp, "c.bin")))
+        assert [c.word for c in index.complete("nama", 3)] == ["ನಮಸ್ಕಾರ", "ನಮನ"]
+        assert [c.word for c in index.complete("na", 2)] == ["ನಮ್ಮ", "ನಮಸ್ಕಾರ"]  # precomputed top list
+        assert index.complete("namaskara")[0].word == "ನಮಸ್ಕಾರ"  # loose match: single vowels
+        assert [c.word for c in index.complete("ನಮ", 2)] == ["ನಮ್ಮ", "ನಮಸ್ಕಾರ"]
+        assert index.complete("zzz") == [] and index.complete("") == []
+        print("Completions for 'nam':", [(c.word, c.count) for c in index.complete("nam")])
+    print("[PASS] Word Completion")
+
+def test_sandhi():
+    print("\nTesting Sandhi Splitter...")
+    import sandhi
+
+    assert sandhi.split_word("ಇವನಾರವನೆಂದೆನಿಸದಿರಯ್ಯಾ") == ("ಇವನು", "ಆರವನು", "ಎಂದು", "ಎನಿಸದಿರು", "ಅಯ್ಯಾ")
+    cases = {
+        "ಮನೆಯಲ್ಲಿ": (("ಮನೆ", "ಅಲ್ಲಿ"), ("agama",)),
+        "ಮಳೆಗಾಲ": (("ಮಳೆ", "ಕಾಲ"), ("adesha",)),
+        "ಸೂರ್ಯೋದಯ": (("ಸೂರ್ಯ", "ಉದಯ"), ("guna",)),
+        "ವಿದ್ಯಾಲಯ": (("ವಿದ್ಯಾ", "ಆಲಯ"), ("savarna",)),
+        "ಕನ್ನಡ": (("ಕನ್ನಡ",), ()),          # a known word stays whole
+        "ಅರಮನೆ": (("ಅರಮನೆ",), ()),          # ...even when it could be split
+        "ಮಾಣಿಕ್ಯದ": (("ಮಾಣಿಕ್ಯದ",), ()),    # no one-akshara unknown leftovers
+    }
+    for word, (parts, joins) in cases.items():
+        split = sandhi.splitter.segment(word)
+        assert (split.parts, split.joins) == (parts, joins), (word, split)
+    assert sandhi.split_word("hello") == ("hello",)
+
+    lines = ["ನುಡಿದರೆ ಮುತ್ತಿನ ಹಾರದಂತಿರಬೇಕು", "ಇವನಾರವ ಇವನಾರವ"]
+    assert sandhi.split_many(lines) == [sandhi.split_text(line) for line in lines]
+    assert sandhi.split_many(lines)[1] == "ಇವನು ಆರವ ಇವನು ಆರವ"
+    print("Split:", sandhi.split_many(lines)[0])
+
+    # Scraped runs without spaces neither recurse nor blow up; past the cap they stay whole
+    run = "ಇವನಾರವ" * 400
+    assert sandhi.split_many([run]) == [run]
+    near_cap = "ಇವನಾರವ" * (sandhi.MAX_AKSHARAS // 5)
+    assert sandhi.splitter.segment(near_cap).parts == ("ಇವನು", "ಆರವ") * (sandhi.MAX_AKSHARAS // 5)
+    # Words starting with a stray sign (common in scraped text) don't crash
+    for word in ("ಂಕ", "ಾಕ", "ಿ", "ಃಏ", "ಕಂಂ"):
+        assert "".join(sandhi.splitter.segment(word).parts) == word
+    assert len(sandhi.split_many(["ಂಕ ಇವನಾರವ", "ಿ"])) == 2
+    print("[PASS] Sandhi Splitter")
+
+def test_indic_scripts():
+    print("\nTesting Multi-Script Akshara Engine...")
+    assert {"Knda", "Telu", "Deva", "Taml", "Mlym", "Beng", "Sinh"} <= set(nlp_utils.SCRIPT_CLASSES)
+    assert "Tibt" not in nlp_utils.SCRIPT_CLASSES  # stacks subjoined letters, no virama conjuncts
+
+    assert nlp_utils.analyze_morphology("नमस्ते दुनिया")['aksharas'] == ['न', 'म', 'स्ते', 'दु', 'नि', 'या']
+    assert nlp_utils.analyze_morphology("తెలుగు భాష")['aksharas'] == ['తె', 'లు', 'గు', 'భా', 'ష']
+    assert nlp_utils.analyze_morphology("சத்யம்")['stats']['Ottaksharas'] == 1
+    assert nlp_utils.get_chandassu_meter("रामायण") == ['-', '-', 'U', 'U']
+    assert nlp_utils.get_chandassu_meter("సత్యం") == ['-', '-']     # conjunct next + anusvara
+    # Short e/o where the script also has long ee/oo, long where it doesn't (Sanskrit)
+    assert nlp_utils.get_chandassu_meter("ಎ ಒ ಇ") == ['U', 'U', 'U']
+    assert nlp_utils.get_chandassu_meter("ए ओ") == ['-', '-']
+
+    mixed = "ಕನ್ನಡ नमस्ते తెలుగు മലയാളം ক্ষমা ශ්‍රී abc"
+    assert nlp_utils.morphology_stats_vectorized(mixed) == nlp_utils.analyze_morphology(mixed)['stats']
+    cleaned = nlp_utils.normalize_kannada(mixed)
+    starts, ends = nlp_utils.segment_spans_vectorized([ord(c) for c in cleaned])
+    assert [cleaned[s:e] for s, e in zip(starts, ends)] == nlp_utils.analyze_morphology(mixed)['aksharas']
+    print("[PASS] Multi-Script Akshara Engine")
+
+def test_session_memory():
+    print("\nTesting Session Memory Budget...")
+    import sys
+    import session_memory
+    import numpy as np
+
+    store = session_memory.SessionArtifacts(budget=3000)
+    store.put("a", "x" * 1000)
+    store.put("b", "y" * 1000)
+    assert store.get("a") is not None  # a is now the most recent
+    store.put("c", "z" * 1000)         # over budget: b goes first
+    assert "b" not in store and "a" in store and "c" in store
+    assert store.nbytes <= store.budget and store.evictions == 1
+    # The newest artifact stays even when it alone is over budget
+    assert store.put("huge", "w" * 10000) == "w" * 10000 and store.keys() == ["huge"]
+    assert store.info()["oversized"] == 1 and store.evictions == 3
+
+    store.set_budget(1 << 20)
+    analyzer = store.get_or_create("morph", nlp_utils.IncrementalMorphology)
+    assert store.get_or_create("morph", list) is analyzer
+    before = store.sizes()["morph"]
+    analyzer.update("ಕನ್ನಡ ನಾಡು " * 20)
+    store.refresh("morph")
+    assert store.sizes()["morph"] > before
+    # Analyzers size themselves, close to what walking their state gives
+    aksharas = sum(sys.getsizeof(a) for a in analyzer._aksharas)
+    assert aksharas < store.sizes()["morph"] < aksharas + 10000
+    store.refresh("morph", nbytes=123)
+    assert store.sizes()["morph"] == 123
+
+    # Shared modules aren't charged; a view is charged its buffer's owner once
+    base = np.zeros(100000)
+    assert nlp_utils.approx_nbytes({"mod": nlp_utils}) < 1000
+    assert base.nbytes < nlp_utils.approx_nbytes([base[:10], base[10:]]) < base.nbytes + 1000
+
+    state = {}
+    assert session_memory.session_artifacts(state) is session_memory.session_artifacts(state)
+    assert session_memory.process_report()["sessions"] >= 2
+    print("[PASS] Session Memory Budget")
+
+def test_metered_generation():
+    print("\nTesting Meter-Constrained Generation...")
+    from benchmark import build_payload
+    gen = nlp_utils.MarkovGenerator()
+    for line in gen.corpus:
+        meter = nlp_utils.get_chandassu_meter(line)
+        assert line in gen.generate_metered(meter, count=20)
+
+    gen.train(build_payload(20000)["sentences"])
+    meter = "UUU-UU"
+    lines = gen.generate_metered(meter, count=10, beam_width=32)
+    assert len(lines) >= 5 and len(set(lines)) == len(lines)
+    assert all("".join(nlp_utils.get_chandassu_meter(l)) == meter for l in lines)
+    best = gen.generate_metered(meter, count=3, temperature=0)
+    assert best == gen.generate_metered(list(meter), count=3, temperature=0)
+    assert all(l.split()[0] == "ನುಡಿದರೆ" for l in gen.generate_metered("UUUU-", start_word="ನುಡಿದರೆ"))
+    assert gen.generate_metered("-" * 200) == []
+    try:
+        gen.generate_metered("UXU")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    print("[PASS] Meter-Constrained Generation")
+
+def test_unicode_validator():
+    print("\nTesting Unicode Well-Formedness Scanner...")
+    import io
+    import json
+    import tempfile
+    import unicodedata
+    import kn_validate
+
+    cases = {
+        "ಕನ್್ನಡ": [(3, "double_virama")],
+        "ಅಿ ಾಕ": [(1, "orphan_matra"), (3, "orphan_matra")],
+        "ಕಾೆ ಕಿ್ ಂಕ": [(2, "double_matra"), (6, "orphan_virama"), (8, "orphan_sign")],
+        "ಕ\u200dನ ಕ\u200c": [(1, "stray_joiner"), (5, "stray_joiner")],
+        "ಕನ್నಡ": [(3, "mixed_script")],
+        "ಕ\ufffdಡ": [(1, "invalid_utf8")],
+    }
+    for text, expected in cases.items():
+        assert [(v.offset, v.kind) for v in kn_validate.validate(text)] == expected, text
+    # Well-formed text, decomposed signs, joiner conjuncts and whole words in other scripts pass
+    for text in list(nlp_utils.markov_gen.corpus) + [unicodedata.normalize("NFD", "ಕೊ ಕೋ ಕೇ"), "ಕ್\u200dಷ", "ನಮಸ್ತೇ नमस्ते తెలుగు"]:
+        assert kn_validate.is_valid(text), text
+
+    assert kn_validate.repair("ಕನ್್ನಡ")[0] == "ಕನ್ನಡ"
+    assert kn_validate.repair("ಕನ್నడ")[0] == "ಕನ್ನಡ"        # the whole Telugu run is mapped
+    assert kn_validate.repair("ಕ್್ಿ ಅ\u200d")[0] == "ಕ್ ಅ"  # repeated until stable
+
+    lines = list(nlp_utils.markov_gen.corpus) + ["ಕನ್್ನಡ", "", "ಾಕ ಕನ್నಡ"]
+    n = len(lines)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "in.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        summaries = []
+        for workers in (0, 2):
+            report, output = io.StringIO(), io.StringIO()
+            summaries.append(kn_validate.run_validation([path], report, output, fix=True,
+                                                        workers=workers, batch_size=3))
+            records = [json.loads(line) for line in report.getvalue().splitlines()]
+            assert [(r["line"], r["offset"], r["kind"]) for r in records] == \
+                [(n - 2, 3, "double_virama"), (n, 0, "orphan_matra"), (n, 6, "mixed_script")]
+            assert output.getvalue().splitlines() == lines[:-3] + ["ಕನ್ನಡ", "", "ಕ ಕನ್ನಡ"]
+        assert summaries[0]["violations"] == summaries[1]["violations"] == 3
+        assert summaries[0]["unrepaired"] == 0 and summaries[0]["lines"] == n
+    print("[PASS] Unicode Well-Formedness Scanner")
+
+def test_vectorized_stats():
+    print("\nTesting Vectorized Morphology Stats...")
+    samples = [
+        "ನಮಸ್ಕಾರ ಕನ್ನಡ",
+        "ಇವನಾರವ ಇವನಾರವ ಇವನಾರವನೆಂದೆನಿಸದಿರಯ್ಯಾ",
+        "ಕ್\u200dಷ ದುಃಖ ಸಂತೋಷ",            # ZWJ inside a conjunct
+        "\u0ccA\u0cd5 \u0cc6\u0cd6 abc 123", # decomposed vowel signs (NFC composes these)
+        "\u0c95\u0cc6\u0cc2\u0cd5 \u0c95\u0cc6\u0cc2", # fully decomposed ಕೋ ಕೊ (chained compositions)
+        "e\u0301\u0323 \u0c95\u0cbc\u0ccd",  # marks NFC reorders / composes
+        "ಸ್ \u0c95 ್್ಕ",                    # virama before a space does not make a conjunct
+        "",
+    ]
+    for text in samples:
+        assert nlp_utils.morphology_stats_vectorized(text) == nlp_utils.analyze_morphology(text)['stats'], text
+        cleaned = nlp_utils.normalize_kannada(text)
+        starts, ends = nlp_utils.segment_spans_vectorized([ord(c) for c in cleaned])
+        assert [cleaned[s:e] for s, e in zip(starts, ends)] == nlp_utils.analyze_morphology(text)['aksharas'], text
+    print("[PASS] Vectorized Morphology Stats")
+
+def test_pandas_accessor():
+    print("\nTesting pandas .kn Accessor...")
+    import kannada_pandas  # registers .kn
+    s = pd.Series(["ಮನೆಯಲ್ಲಿ", None, "ಕನ್ನಡಿಗರು", "ಮನೆಯಲ್ಲಿ", "ಈ ಚಲನಚಿತ್ರ ತುಂಬಾ ಚೆನ್ನಾಗಿದೆ"] * 3)
+
+    stems = s.kn.stem(chunk_size=4)
+    assert stems.dtype == "string"
+    assert stems.isna().sum() == 3
+    expected = [None if pd.isna(v) else nlp_utils.simple_kannada_stemmer(v) for v in s]
+    assert [None if pd.isna(v) else v for v in stems] == expected
+
+    sent = s.kn.sentiment()
+    assert str(sent['score'].dtype) == "Int64"
+    assert sent['label'].iloc[4] == nlp_utils.analyze_sentiment(s.iloc[4])[0]
+    assert s.kn.classify().dtype == "category"
+    assert s.kn.tokenize().iloc[4] == nlp_utils.preprocess_text(s.iloc[4])
+    print("[PASS] pandas .kn Accessor")
+
+def test_script_search():
+    print("\nTesting Script Search Index...")
+    df = analyze_scripts.load_dataset()
+    if df is None:
+        print("[SKIP] Dataset not found")
+        return
+    index = analyze_scripts.build_script_index(df)
+    assert index.autocomplete("knda")[0][0] == 'Knda'
+    assert index.autocomplete("Kannara")[0][0] == 'Knda'      # French name
+    assert index.autocomplete("devanagari")[0][0] == 'Deva'
+    assert index.autocomplete("nepala")[0][0] == 'Newa'       # accent-insensitive
+    assert index.autocomplete("telgu")[0][0] == 'Telu'        # trigram fallback
+    assert index.autocomplete("") == []
+    # The TSV's repeated header row isn't a script
+    assert all(code != "Code" for code, _ in index.autocomplete("code") + index.autocomplete("english name"))
+    print("[PASS] Script Search Index")
+
 if __name__ == "__main__":
     test_morphology()
     test_data_analysis()
+    test_translation_phrases()
+    test_benchmark_corpus()
+    test_perf_monitor()
+    test_nlp_service()
+    test_corpus_stats_merge()
+    test_compact_aksharas()
+    test_incremental_morphology()
+    test_memo_cache()
+    test_lexicon_bundle()
+    test_topic_model()
+    test_script_detect()
+    test_akshara_lm()
+    test_retrieval()
+    test_corpus_store()
+    test_pipeline()
+    test_incremental_transliteration()
+    test_completion()
+    test_sandhi()
+    test_indic_scripts()
+    test_session_memory()
+    test_metered_generation()
+    test_unicode_validator()
+    test_vectorized_stats()
+    test_pandas_accessor()
+    test_script_search()
 
     print("\nTesting Advanced Features...")
     
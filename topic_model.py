@@ -0,0 +1,304 @@
+"""
+Multinomial Naive Bayes topic classifier over the classify_text categories.
+
+Documents become hashed sparse count vectors: every token's stem plus the
+akshara bigrams and trigrams inside each word, hashed with CRC-32 into a
+fixed number of buckets (stable across processes, unlike hash()). A batch is
+held as CSR-style arrays (indptr, indices, counts), so training is a single
+bincount and prediction is one gather + cumulative sum over all documents.
+
+    model = NaiveBayesTopicModel().fit(texts, labels)
+    model.predict(["ಕ್ರಿಕೆಟ್ ಪಂದ್ಯ ಇಂದು"])
+    model.save("topic_model.npz")
+
+    python topic_model.py evaluate                 # synthetic held-out set
+    python topic_model.py evaluate --data labeled.tsv
+    python topic_model.py train --data labeled.tsv
+
+`evaluate` writes topic_eval.json (confusion matrix, accuracy, per-class
+precision/recall, throughput), which the app's Model Evaluation expander shows.
+Labeled TSV files are label<TAB>text per line.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import zlib
+
+import numpy as np
+
+import nlp_utils
+from synthetic_corpus import KannadaCorpusGenerator
+
+CATEGORIES = ["Sports", "Politics", "Cinema", "Technology", "General / Unclassified"]
+DEFAULT_N_FEATURES = 1 << 18
+DEFAULT_MODEL = "topic_model.npz"
+DEFAULT_EVAL = "topic_eval.json"
+DEFAULT_SEED = 15924
+FORMAT_VERSION = 1
+
+# --- Features ---
+
+def document_features(text):
+    """Stem and in-word akshara 2/3-gram feature strings for one document."""
+    cleaned = nlp_utils.normalize_kannada(text)
+    feats = ["s:" + nlp_utils.simple_kannada_stemmer(tok) for tok in cleaned.split()]
+    starts, ends = nlp_utils.akshara_spans(cleaned)
+    aksharas = [cleaned[s:e] for s, e in zip(starts, ends)]
+    for i in range(1, len(aksharas)):
+        # Only n-grams whose aksharas touch, i.e. inside one word
+        if starts[i] != ends[i - 1]:
+            continue
+        feats.append("b:" + aksharas[i - 1] + aksharas[i])
+        if i >= 2 and starts[i - 1] == ends[i - 2]:
+            feats.append("t:" + aksharas[i - 2] + aksharas[i - 1] + aksharas[i])
+    return feats
+
+def hash_features(texts, n_features=DEFAULT_N_FEATURES):
+    """
+    Hashes a batch into CSR arrays (indptr, indices, counts): document d owns
+    indices[indptr[d]:indptr[d + 1]], sorted, with their counts.
+    """
+    mask = n_features - 1
+    doc_ids = []
+    buckets = []
+    for d, text in enumerate(texts):
+        hashed = [zlib.crc32(f.encode("utf-8")) & mask for f in document_features(text)]
+        buckets.extend(hashed)
+        doc_ids.extend([d] * len(hashed))
+    n_docs = len(texts)
+    keys = np.asarray(doc_ids, dtype=np.int64) * n_features + np.asarray(buckets, dtype=np.int64)
+    keys, counts = np.unique(keys, return_counts=True)
+    indptr = np.searchsorted(keys, np.arange(n_docs + 1, dtype=np.int64) * n_features)
+    return indptr, keys % n_features, counts.astype(np.float64)
+
+# --- Model ---
+
+class NaiveBayesTopicModel:
+    """Multinomial NB with Laplace/Lidstone smoothing over hashed features."""
+
+    def __init__(self, categories=None, n_features=DEFAULT_N_FEATURES, alpha=1.0):
+        if n_features & (n_features - 1):
+            raise ValueError("n_features must be a power of two")
+        self.categories = list(categories or CATEGORIES)
+        self.n_features = n_features
+        self.alpha = alpha
+        self.feature_counts = np.zeros((len(self.categories), n_features), dtype=np.float64)
+        self.class_counts = np.zeros(len(self.categories), dtype=np.float64)
+        self._log_prior = self._log_prob = None
+
+    def _label_ids(self, labels):
+        index = {c: i for i, c in enumerate(self.categories)}
+        try:
+            return np.array([index[label] for label in labels], dtype=np.int64)
+        except KeyError as e:
+            raise ValueError(f"unknown category {e.args[0]!r}") from None
+
+    def partial_fit(self, texts, labels):
+        """Adds one batch of labeled documents to the counts."""
+        texts = list(texts)
+        y = self._label_ids(labels)
+        indptr, indices, counts = hash_features(texts, self.n_features)
+        rows = np.repeat(y, np.diff(indptr))
+        n_cells = len(self.categories) * self.n_features
+        self.feature_counts += np.bincount(rows * self.n_features + indices, weights=counts,
+                                           minlength=n_cells).reshape(self.feature_counts.shape)
+        self.class_counts += np.bincount(y, minlength=len(self.categories))
+        self._log_prior = self._log_prob = None
+        return self
+
+    def fit(self, texts, labels, batch_size=2000):
+        texts, labels = list(texts), list(labels)
+        for lo in range(0, len(texts), batch_size):
+            self.partial_fit(texts[lo:lo + batch_size], labels[lo:lo + batch_size])
+        return self
+
+    def _refresh(self):
+        if self._log_prob is None:
+            smoothed = self.feature_counts + self.alpha
+            self._log_prob = np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+            total = self.class_counts.sum()
+            self._log_prior = np.log((self.class_counts + 1) / (total + len(self.categories)))
+
+    def decision_function(self, texts):
+        """(n_docs, n_classes) joint log-likelihoods."""
+        self._refresh()
+        indptr, indices, counts = hash_features(list(texts), self.n_features)
+        gathered = self._log_prob[:, indices] * counts          # (classes, nnz)
+        csum = np.zeros((len(self.categories), len(indices) + 1))
+        np.cumsum(gathered, axis=1, out=csum[:, 1:])
+        per_doc = csum[:, indptr[1:]] - csum[:, indptr[:-1]]  # (classes, docs)
+        return (per_doc + self._log_prior[:, None]).T
+
+    def predict_ids(self, texts, batch_size=2000):
+        texts = list(texts)
+        out = [np.argmax(self.decision_function(texts[lo:lo + batch_size]), axis=1)
+               for lo in range(0, len(texts), batch_size)]
+        return np.concatenate(out) if out else np.zeros(0, dtype=np.int64)
+
+    def predict(self, texts, batch_size=2000):
+        return [self.categories[i] for i in self.predict_ids(texts, batch_size)]
+
+    def save(self, path=DEFAULT_MODEL):
+        """Stores only the non-zero counts, so the file stays small."""
+        cls_idx, feat_idx = np.nonzero(self.feature_counts)
+        np.savez_compressed(
+            path,
+            format_version=FORMAT_VERSION,
+            categories=np.array(self.categories),
+            n_features=self.n_features,
+            alpha=self.alpha,
+            class_counts=self.class_counts,
+            cls_idx=cls_idx.astype(np.uint8),
+            feat_idx=feat_idx.astype(np.uint32),
+            values=self.feature_counts[cls_idx, feat_idx].astype(np.float32),
+        )
+        return path
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL):
+        with np.load(path) as data:
+            if int(data["format_version"]) != FORMAT_VERSION:
+                raise ValueError(f"unsupported model format in {path}")
+            model = cls(data["categories"].tolist(), int(data["n_features"]), float(data["alpha"]))
+            model.class_counts = data["class_counts"].astype(np.float64)
+            model.feature_counts[data["cls_idx"], data["feat_idx"]] = data["values"]
+        return model
+
+# --- Data ---
+
+# Case endings glued onto topic words so the n-gram features have to generalize
+_INFLECTIONS = ["", "", "", "ದಲ್ಲಿ", "ಗಳು", "ವನ್ನು", "ದ", "ಕ್ಕೆ", "ದಿಂದ"]
+
+def make_synthetic_corpus(n_docs, seed=DEFAULT_SEED, topic_rate=0.25, noise_rate=0.05):
+    """
+    Seeded labeled documents built from the topic keyword lexicon and
+    synthetic filler words. A share of topic words comes from other
+    categories so the task isn't trivially separable. Returns (texts, labels).
+    """
+    gen = KannadaCorpusGenerator(seed=seed)
+    rng = random.Random(seed)
+    keywords = nlp_utils.topic_keywords()
+    topical = [c for c in CATEGORIES if c in keywords]
+    texts, labels = [], []
+    for _ in range(n_docs):
+        label = rng.choice(CATEGORIES)
+        words = []
+        for _ in range(rng.randint(6, 20)):
+            r = rng.random()
+            if label in keywords and r < topic_rate:
+                words.append(rng.choice(keywords[label]) + rng.choice(_INFLECTIONS))
+            elif r > 1 - noise_rate:
+                words.append(rng.choice(keywords[rng.choice(topical)]) + rng.choice(_INFLECTIONS))
+            else:
+                words.append(gen.word())
+        texts.append(" ".join(words))
+        labels.append(label)
+    return texts, labels
+
+def load_labeled_tsv(path):
+    """Reads label<TAB>text lines ('#' comments allowed)."""
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#") or "\t" not in line:
+                continue
+            label, text = line.split("\t", 1)
+            labels.append(label)
+            texts.append(text)
+    return texts, labels
+
+def train_test_split(texts, labels, test_size=0.25, seed=DEFAULT_SEED):
+    order = list(range(len(texts)))
+    random.Random(seed).shuffle(order)
+    cut = len(order) - int(len(order) * test_size)
+    pick = lambda seq, idx: [seq[i] for i in idx]
+    return (pick(texts, order[:cut]), pick(labels, order[:cut]),
+            pick(texts, order[cut:]), pick(labels, order[cut:]))
+
+# --- Evaluation ---
+
+def confusion_matrix(true_ids, pred_ids, n_classes):
+    """Rows are true classes, columns predictions."""
+    flat = np.asarray(true_ids, dtype=np.int64) * n_classes + np.asarray(pred_ids, dtype=np.int64)
+    return np.bincount(flat, minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+
+def evaluate(texts=None, labels=None, n_docs=6000, test_size=0.25, seed=DEFAULT_SEED,
+             n_features=DEFAULT_N_FEATURES, model_path=None):
+    """
+    Trains on a split, scores the held-out part and returns a JSON-ready
+    report. Without texts a synthetic corpus of n_docs is used.
+    """
+    source = "labeled"
+    if texts is None:
+        texts, labels = make_synthetic_corpus(n_docs, seed=seed)
+        source = "synthetic"
+    train_x, train_y, test_x, test_y = train_test_split(texts, labels, test_size, seed)
+
+    t0 = time.perf_counter()
+    model = NaiveBayesTopicModel(n_features=n_features).fit(train_x, train_y)
+    train_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    pred = model.predict_ids(test_x)
+    predict_s = time.perf_counter() - t0
+    if model_path:
+        model.save(model_path)
+
+    n = len(model.categories)
+    matrix = confusion_matrix(model._label_ids(test_y), pred, n)
+    support = matrix.sum(axis=1)
+    predicted = matrix.sum(axis=0)
+    diag = np.diag(matrix)
+    return {
+        "categories": model.categories,
+        "matrix": matrix.tolist(),
+        "accuracy": float(diag.sum() / max(matrix.sum(), 1)),
+        "precision": [float(d / p) if p else None for d, p in zip(diag, predicted)],
+        "recall": [float(d / s) if s else None for d, s in zip(diag, support)],
+        "train_docs": len(train_x),
+        "test_docs": len(test_x),
+        "train_docs_per_sec": len(train_x) / train_s if train_s else None,
+        "predict_docs_per_sec": len(test_x) / predict_s if predict_s else None,
+        "source": source,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train / evaluate the Naive Bayes topic classifier.")
+    parser.add_argument("command", choices=["train", "evaluate"])
+    parser.add_argument("--data", help="Labeled TSV (label<TAB>text). Default: synthetic corpus.")
+    parser.add_argument("--docs", type=int, default=6000, help="Synthetic corpus size.")
+    parser.add_argument("--test-size", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--features", type=int, default=DEFAULT_N_FEATURES)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--output", default=DEFAULT_EVAL, help="Where evaluate writes its JSON report.")
+    args = parser.parse_args(argv)
+
+    if args.data:
+        texts, labels = load_labeled_tsv(args.data)
+    else:
+        texts, labels = make_synthetic_corpus(args.docs, seed=args.seed)
+
+    if args.command == "train":
+        t0 = time.perf_counter()
+        NaiveBayesTopicModel(n_features=args.features).fit(texts, labels).save(args.model)
+        print(f"Trained on {len(texts)} docs in {time.perf_counter() - t0:.2f}s -> {args.model}")
+        return 0
+
+    report = evaluate(texts, labels, test_size=args.test_size, seed=args.seed,
+                      n_features=args.features, model_path=args.model)
+    report["source"] = args.data or "synthetic"
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Accuracy {report['accuracy']:.3f} on {report['test_docs']} held-out docs "
+          f"({report['predict_docs_per_sec']:.0f} docs/s predict, "
+          f"{report['train_docs_per_sec']:.0f} docs/s train)")
+    print(f"Report written to {args.output}, model to {args.model}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())